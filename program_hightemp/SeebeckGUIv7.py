@@ -21,13 +21,18 @@ matplotlib.use('WXAgg') # The recommended way to use wx with mpl is with WXAgg b
 from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg
 from matplotlib.figure import Figure
 from matplotlib.pyplot import gcf, setp
-import matplotlib.animation as animation # For plotting
 import pylab
 import numpy as np
 import matplotlib.pyplot as plt
-import minimalmodbus as modbus # For communicating with the cn7500s
-import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
-import visa # pyvisa, essential for communicating with the Keithley
+import instrument_sim
+if instrument_sim.enabled:
+    # SEEBECK_SIMULATE=1 runs against simulated instruments
+    modbus = omegacn7500 = visa = instrument_sim
+else:
+    import minimalmodbus as modbus # For communicating with the cn7500s
+    import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
+    import visa # pyvisa, essential for communicating with the Keithley
+#end if
 from threading import Thread # For threading the processes going on behind the GUI
 import time
 from datetime import datetime # for getting the current date and time
@@ -35,6 +40,21 @@ from datetime import datetime # for getting the current date and time
 import exceptions
 import sys
 from logging_utils import setup_logging_to_file, log_exception
+# Minimum-interval pacing for the Keithley and the cn7500s
+from instrument_pacing import Pacer, wait_until_ready
+from pid_bus import PIDBus
+from acquisition import AcquisitionScheduler
+from ring_buffer import RingBuffer
+from decimate import minmax_decimate
+from thermocouple import voltage_correction
+from regression import fit_seebeck
+from plot_queue import PlotQueue
+from raw_store import RawStore, indicators, last_time
+import run_state
+import schedule
+from stability import Stability
+import settling
+from settling import Settling
 
 # for a fancy status bar:
 import EnhancedStatusBar as ESB
@@ -58,14 +78,24 @@ APP_EXIT = 1 # id for File\Quit
 
 
 stability_threshold = 0.25/60
+stability_window = 60 # s of sample temperatures in the stability fit
 oscillation = 8 # Degree range that the PID will oscillate in
 tolerance = (oscillation/5) # This must be set to less than oscillation
 measureList = []
 #dTlist = [0,-2,-4,-6,-8,-6,-4,-2,0,2,4,6,8,6,4,2,0]
 dTlist = [0,-4,-8,-4,0,4,8,4,0]
+measurements_per_dT = 4 # Seebeck measurements taken at each dT
+seebeck_target = 0 # uV/K, stop the dT sweep once both Seebeck fits are this good (0 measures every dT)
 
 maxLimit = 650 # Restricts the user to a max temperature
 
+# Heating/cooling rates for ordering the measurements, see schedule.py
+rate_model_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rate_model.json')
+
+# Minimum time between instrument transactions (s)
+keithley_min_interval = 0.02 # GPIB
+pid_min_interval = 0.01 # Modbus inter-frame gap on the shared cn7500 bus
+
 abort_ID = 0 # Abort method
 
 # Global placers for instruments
@@ -74,6 +104,7 @@ sampleApid = ''
 sampleBpid = ''
 blockApid = ''
 blockBpid = ''
+pidbus = ''
 
 tc_type = "k-type" # Set the thermocouple type in order to use the correct voltage correction
 
@@ -90,19 +121,16 @@ filePath = 'global file path'
 myfile = 'global file'
 rawfile = 'global file'
 processfile = 'global file'
+rawstore = 'global file' # full precision copy of rawfile
+datastore = 'global file' # full precision copy of myfile
 
-# Placers for the GUI plots:
-chromelV_list = []
-tchromelV_list = []
-alumelV_list=[]
-talumelV_list = []
-sampletempA_list = []
-tsampletempA_list = []
-sampletempB_list = []
-tsampletempB_list = []
-tblocktemp_list = []
-blocktempA_list = []
-blocktempB_list = []
+# Ring buffers for the GUI plots, rows of (time, value):
+plot_buffer_size = 131072 # points kept per trace, about three days at one point every 2 s
+chromelV_buffer = RingBuffer(plot_buffer_size)
+alumelV_buffer = RingBuffer(plot_buffer_size)
+sampletempA_buffer = RingBuffer(plot_buffer_size)
+sampletempB_buffer = RingBuffer(plot_buffer_size)
+blocktemp_buffer = RingBuffer(plot_buffer_size, columns=3) # (time, block A, block B)
 
 timecalclist = []
 Vchromelcalclist = []
@@ -119,32 +147,81 @@ class Keithley_2700:
     #--------------------------------------------------------------------------
     def __init__(self, instr):
         self.ctrl = ResourceManager.open_resource(instr)
+        self.pacer = Pacer(keithley_min_interval)
 
     #end init
 
     #--------------------------------------------------------------------------
-    def fetch(self, channel):
+    def configure_scan(self, channels, passes=2):
         """
-        Scan the channel and take a reading
+        Program the internal scan list once so that a single trigger reads
+        every channel 'passes' times into the buffer.
         """
-        measure = False
-        while (not measure):
+        self.scan_channels = channels
+        self.scan_count = len(channels)*passes
+        self.ctrl.write(":INITiate:CONTinuous OFF")
+        self.ctrl.write(":TRIGger:SOURce IMMediate")
+        self.ctrl.write(":TRIGger:COUNt 1")
+        self.ctrl.write(":SAMPle:COUNt %d" % (self.scan_count)) # One sample per channel per pass
+        self.ctrl.write(":ROUTe:SCAN:INTernal (@ %s)" % (','.join(channels))) # Specify Channels
+        self.ctrl.write(":ROUTe:SCAN:TSOurce IMMediate")
+        self.ctrl.write(":ROUTe:SCAN:LSELect INTernal") # Use the internal scan list
+        self.ctrl.write(":FORMat:ELEMents READing, TSTamp, CHANnel")
+        self.ctrl.write(":TRACe:TSTamp:FORMat ABSolute") # Timestamps relative to first reading
+        self.ctrl.write(":TRACe:POINts %d" % (self.scan_count))
+        self.ctrl.write(":TRACe:FEED SENSe1")
+    #end def
+
+    #--------------------------------------------------------------------------
+    def scan(self):
+        """
+        Trigger the scan list once and read the whole buffer.
+        Returns a dictionary of channel: [(timestamp, reading), ...] with the
+        timestamps in seconds from the first reading of the scan.
+        """
+        while True:
             try:
-                self.ctrl.write(":ROUTe:SCAN:INTernal (@ %s)" % (channel)) # Specify Channel
-                #keithley.write(":SENSe1:FUNCtion 'TEMPerature'") # Specify Data type
-                self.ctrl.write(":ROUTe:SCAN:LSELect INTernal") # Scan Selected Channel
-                time.sleep(.1)
-                self.ctrl.write(":ROUTe:SCAN:LSELect NONE") # Stop Scan
-                time.sleep(.1)
-                data = self.ctrl.query(":FETCh?")
-                time.sleep(.1)
-                data = float(str(data)[0:15])
-                measure = True
+                with self.pacer:
+                    self.ctrl.write(":TRACe:CLEar")
+                    self.ctrl.write(":TRACe:FEED:CONTrol NEXT")
+                    self.ctrl.write(":INITiate") # Trigger the scan
+                    wait_until_ready(self.ctrl, self.pacer.min_interval) # Poll until the scan has completed
+                    data = self.ctrl.query(":TRACe:DATA?")
+                readings = self.parse_scan(data)
+                break
             except exceptions.ValueError as VE:
                 print(VE)
-                measure = False
         #end while
-        return data # Fetches Reading
+        return readings
+    #end def
+
+    #--------------------------------------------------------------------------
+    def parse_scan(self, data):
+        """
+        Split the buffer into (reading, timestamp, channel) triplets. Each
+        element has its units appended (e.g. '+1.2E-06VDC,+0.412SECS,107INTCHAN')
+        """
+        elements = str(data).strip().split(',')
+        if len(elements) != 3*self.scan_count:
+            raise ValueError('incomplete scan: %d elements' % (len(elements)))
+        #end if
+        readings = {}
+        for channel in self.scan_channels:
+            readings[channel] = []
+        #end for
+        for n in range(0, len(elements), 3):
+            value = float(self.strip_units(elements[n]))
+            stamp = float(self.strip_units(elements[n+1]))
+            channel = str(int(self.strip_units(elements[n+2])))
+            readings[channel].append((stamp, value))
+        #end for
+        return readings
+    #end def
+
+    #--------------------------------------------------------------------------
+    def strip_units(self, element):
+        """ Remove the unit suffix (VDC, C, SECS, INTCHAN) from a buffer element """
+        return element.strip().rstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ#')
     #end def
 
     #--------------------------------------------------------------------------
@@ -179,6 +256,16 @@ class PID(omegacn7500.OmegaCN7500):
     heatingCoolingControl = 4102 # Register for Heating/Cooling control selection
     heating = 0 # Value for Heating setting
 
+    # All four controllers share one serial bus, so they share one pacer
+    bus = Pacer(pid_min_interval)
+
+    #--------------------------------------------------------------------------
+    def _performCommand(self, functioncode, payloadToSlave):
+        """ Every minimalmodbus transaction passes through here; pace it. """
+        with PID.bus:
+            return omegacn7500.OmegaCN7500._performCommand(self, functioncode, payloadToSlave)
+    #end def
+
 #end class
 ###############################################################################
 
@@ -196,6 +283,7 @@ class Setup:
         global sampleBpid
         global blockApid
         global blockBpid
+        global pidbus
 
         # Define Keithley instrument port:
         self.k2700 = k2700 = Keithley_2700('GPIB0::1::INSTR')
@@ -204,6 +292,9 @@ class Setup:
         self.sampleBpid = sampleBpid = PID('/dev/cu.usbserial', 2) # Bottom heater
         self.blockApid = blockApid = PID('/dev/cu.usbserial', 3) # Top block
         self.blockBpid = blockBpid = PID('/dev/cu.usbserial', 4) # Top block
+        # All four controllers share one serial line:
+        self.pidbus = pidbus = PIDBus([('sampleA', sampleApid), ('sampleB', sampleBpid),
+                                       ('blockA', blockApid), ('blockB', blockBpid)])
 
 
         """
@@ -222,6 +313,10 @@ class Setup:
         self.k2700.ctrl.write(":SENSe1:VOLTage:DC:NPLCycles 4, (@ 107,108)") # Sets integration period based on frequency
         #self.k2700.ctrl.write(":SENSe1:TEMPerature:NPLCycles 4, (@ 109,110)")
 
+        # Scan chromel, alumel, alumel, chromel per trigger: the paired readings
+        # share one time centre, so a linear drift cancels in their averages
+        self.k2700.configure_scan([chromelChannel, alumelChannel, alumelChannel, chromelChannel], passes=1)
+
         """
         Prepare the PID for operation:
         """
@@ -258,9 +353,10 @@ class ProcessThread(Thread):
     """
 
     #--------------------------------------------------------------------------
-    def __init__(self):
+    def __init__(self, state=None):
         """ Init Worker Thread Class """
         Thread.__init__(self)
+        self.state = state # saved run_state when resuming a run
         self.start()
 
     #end init
@@ -269,7 +365,7 @@ class ProcessThread(Thread):
     def run(self):
         """ Run Worker Thread """
         #Setup()
-        td=TakeData()
+        td=TakeData(self.state)
         #td = TakeDataTest()
     #end def
 
@@ -288,40 +384,48 @@ class InitialCheck:
         self.sampleBpid = sampleBpid
         self.blockApid = blockApid
         self.blockBpid = blockBpid
+        self.pidbus = pidbus
+
+        self.frame = {}
 
         self.take_temperature_Data()
 
         self.take_voltage_Data()
 
+        self.publish(stamp="Telemetry Init")
+
         #end init
 
+    #--------------------------------------------------------------------------
+    def read_pid(self):
+        """ Reads the process values and sample setpoints of all four PIDs,
+            one register read per controller.
+        """
+        snapshot = self.pidbus.snapshot()
+        self.sampletempA = snapshot.pv['sampleA']
+        self.sampletempB = snapshot.pv['sampleB']
+        self.blocktempA = snapshot.pv['blockA']
+        self.blocktempB = snapshot.pv['blockB']
+        self.samplesetpointA = snapshot.setpoint['sampleA']
+        self.samplesetpointB = snapshot.setpoint['sampleB']
+    #end def
+
     #--------------------------------------------------------------------------
     def take_temperature_Data(self):
         """ Takes data from the PID
         """
 
         # Take Data and time stamps:
-        self.sampletempA = float(self.sampleApid.get_pv())
-        time.sleep(0.1)
-        self.sampletempB = float(self.sampleBpid.get_pv())
-        time.sleep(0.1)
-        self.blocktempA = float(self.blockApid.get_pv())
-        time.sleep(0.1)
-        self.blocktempB = float(self.blockBpid.get_pv())
-        time.sleep(0.1)
-        self.samplesetpointA = float(self.sampleApid.get_setpoint())
-        time.sleep(0.1)
-        self.samplesetpointB = float(self.sampleBpid.get_setpoint())
-        time.sleep(0.1)
-
-        self.updateGUI(stamp="Sample Temp A Init", data=self.sampletempA)
-        self.updateGUI(stamp="Sample Temp B Init", data=self.sampletempB)
-
-        self.updateGUI(stamp="Setpoint A Init", data=self.samplesetpointA)
-        self.updateGUI(stamp="Setpoint B Init", data=self.samplesetpointB)
-
-        self.updateGUI(stamp="Block Temp A Init", data=self.blocktempA)
-        self.updateGUI(stamp="Block Temp B Init", data=self.blocktempB)
+        self.read_pid()
+
+        self.record("Sample Temp A", self.sampletempA)
+        self.record("Sample Temp B", self.sampletempB)
+
+        self.record("Setpoint A", self.samplesetpointA)
+        self.record("Setpoint B", self.samplesetpointB)
+
+        self.record("Block Temp A", self.blocktempA)
+        self.record("Block Temp B", self.blocktempB)
 
         print "\nsample temp A: %f C\nblock temp A: %f C\nsample temp B: %f C\nblock temp B: %f C" % (self.sampletempA, self.blocktempA, self.sampletempB, self.blocktempB)
 
@@ -331,13 +435,14 @@ class InitialCheck:
     def take_voltage_Data(self):
         """ Takes data from the PID
         """
-        self.Vchromelraw = float(self.k2700.fetch(chromelChannel))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
-        self.Valumelraw = float(self.k2700.fetch(alumelChannel))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
+        readings = self.k2700.scan()
+        self.Vchromelraw = float(readings[chromelChannel][0][1])*10**6
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel', tc_type)
+        self.Valumelraw = float(readings[alumelChannel][0][1])*10**6
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel', tc_type)
 
-        self.updateGUI(stamp="Chromel Voltage Init", data=float(self.Vchromelcalc))
-        self.updateGUI(stamp="Alumel Voltage Init", data=float(self.Valumelcalc))
+        self.record("Chromel Voltage", float(self.Vchromelcalc))
+        self.record("Alumel Voltage", float(self.Valumelcalc))
 
         print "\nvoltage (Chromel): %f uV\nvoltage (Alumel): %f uV" % (self.Vchromelcalc, self.Valumelcalc)
 
@@ -345,94 +450,24 @@ class InitialCheck:
 
 
     #--------------------------------------------------------------------------
-    def voltage_Correction(self, raw_voltage, tempA, tempB, side):
-        ''' raw_data must be in uV '''
-        # Kelvin conversion for polynomial correction.
-        dT = tempA - tempB
-        avgT = (tempA + tempB)/2 + 273.15
-
-        # Correction for effect from Thermocouple Seebeck
-        out = self.alpha(avgT, side)*dT - raw_voltage
-
-        return out
+    def record(self, field, value, t=None):
+        """
+        Adds a value and its time stamp to the telemetry frame; the frame is
+        sent to the GUI in one message by publish.
+        """
+        self.frame.setdefault(field, []).append((t, value))
     #end def
-    #--------------------------------------------------------------------------
-    def alpha(self, x, side):
-        ''' x = avgT
-            alpha in uV/K
-        '''
-        global tc_type
-
-        if tc_type == "k-type":
-
-            ### If Chromel, taken from Chromel_Seebeck.txt
-            if side == 'chromel':
-                if ( x >= 270 and x < 700):
-                    alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                            -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                            -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                            -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                            -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                            -4.30421084091e-24*x**10
-
-                #end if
-
-                elif ( x >= 700 and x < 1599):
-                    alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                            0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                            9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                            5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                            4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-
-                #end if
 
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Chromel)
-
-            ### If Alumel, taken from Alumel_Seebeck.txt
-            elif side == 'alumel':
-                if ( x >= 270 and x < 570):
-                    alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                            -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                            -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                            -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                            -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-
-                #end if
-
-                elif ( x >= 570 and x < 1599):
-                    alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                            0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                            1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                            4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                            1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-
-                #end if
-
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Alumel)
-
-            else:
-                print "Error in voltage correction."
-
-        #end if (K-type)
-
-        return alpha
-
-    #end def
     #--------------------------------------------------------------------------
-    def updateGUI(self, stamp, data):
+    def publish(self, stamp="Telemetry"):
         """
-        Sends data to the GUI (main thread), for live updating while the process is running
-        in another thread.
+        Sends the telemetry frame to the GUI (main thread), for live updating while
+        the process is running in another thread.
         """
-        time.sleep(0.1)
-        wx.CallAfter(pub.sendMessage, stamp, msg=data)
-
+        if self.frame:
+            wx.CallAfter(pub.sendMessage, stamp, msg=self.frame)
+            self.frame = {}
+        #end if
     #end def
 
 #end class
@@ -442,13 +477,18 @@ class InitialCheck:
 class TakeData:
     ''' Takes measurements and saves them to file. '''
     #--------------------------------------------------------------------------
-    def __init__(self):
+    def __init__(self, state=None):
+        """
+        Runs the measurement profile, or with the saved state of an
+        interrupted run, carries on from where it stopped.
+        """
         global abort_ID
         global k2700
         global sampleApid
         global sampleBpid
         global blockApid
         global blockBpid
+        global pidbus
 
         global tolerance
         global stability_threshold
@@ -456,6 +496,7 @@ class TakeData:
 
         global measureList
         global dTlist
+        global seebeck_target
 
         global timecalclist, Vchromelcalclist, Valumelcalclist, dTcalclist, avgTcalclist
 
@@ -464,28 +505,53 @@ class TakeData:
         self.sampleBpid = sampleBpid
         self.blockApid = blockApid
         self.blockBpid = blockBpid
+        self.pidbus = pidbus
 
         self.tolerance = tolerance
         self.stability_threshold = stability_threshold
+        self.seebeck_target = seebeck_target
+        self.trendA = Stability(stability_window)
+        self.trendB = Stability(stability_window)
+        self.settleA = Settling()
+        self.settleB = Settling()
 
         self.tol = 'NO'
         self.stable = 'NO'
         self.measurement = 'OFF'
         self.measurement_indicator = 'none'
-        self.updateGUI(stamp='Measurement', data=self.measurement)
 
         self.plotnumber = 0
+        self.plots = PlotQueue()
 
         self.exception_ID = 0
 
         self.updateGUI(stamp='Status Bar', data='Running')
 
+        # Separate worker threads for the Modbus and GPIB buses
+        self.acquisition = AcquisitionScheduler(['pid', 'keithley'])
+
         self.start = time.time()
+        resume = (0, 0, 0) # avgtemp index, dT index, measurements taken
+        if state is not None:
+            # time stamps carry on from the last row written: status rows keep
+            # coming after the state is saved, e.g. for hours of a ramp
+            self.start -= max(state['elapsed'], last_time(rawstore.path), last_time(datastore.path))
+            self.plotnumber = state['plotnumber']
+            resume = run_state.next_step(state, measurements_per_dT)
+            print "resume run at avgtemp %d, dT %d, measurement %d" % resume
+        #end if
+        self.frame = {} # telemetry for the GUI, published once per cycle
+        self.record('Measurement', self.measurement)
+        self.publish()
         print "start take data"
 
         try:
             while abort_ID == 0:
-                for avgtemp in measureList:
+                for self.avgtemp_index, avgtemp in enumerate(measureList):
+                    if self.avgtemp_index < resume[0]:
+                        continue
+                    #end if
+                    resumed = (state is not None and self.avgtemp_index == resume[0] and resume[1:] != (0, 0))
                     self.avgtemp = avgtemp
                     self.dT = 0
                     print "Set avg temp to %f" %(self.avgtemp)
@@ -505,39 +571,54 @@ class TakeData:
                         except IOError:
                             print 'IOError: communication failure'
                     #end while
-                    self.plotnumber +=1
-                    timecalclist = []
-                    Vchromelcalclist = []
-                    Valumelcalclist = []
-                    dTcalclist = []
-                    avgTcalclist = []
-
-                    self.recenttempA = []
-                    self.recenttempAtime=[]
-                    self.recenttempB = []
-                    self.recenttempBtime=[]
+                    if resumed:
+                        # data taken at this avgtemp before the run stopped
+                        timecalclist = state['timecalclist']
+                        Vchromelcalclist = state['Vchromelcalclist']
+                        Valumelcalclist = state['Valumelcalclist']
+                        dTcalclist = state['dTcalclist']
+                        avgTcalclist = state['avgTcalclist']
+                    #end if
+                    else:
+                        self.plotnumber +=1
+                        timecalclist = []
+                        Vchromelcalclist = []
+                        Valumelcalclist = []
+                        dTcalclist = []
+                        avgTcalclist = []
+                    #end else
+
+                    self.trendA.reset()
+                    self.trendB.reset()
                     self.stabilityA = '-'
                     self.stabilityB = '-'
-                    self.updateGUI(stamp="Stability A", data=self.stabilityA)
-                    self.updateGUI(stamp="Stability B", data=self.stabilityB)
+                    self.record("Stability A", self.stabilityA)
+                    self.record("Stability B", self.stabilityB)
 
-                    self.take_temperature_Data()
-                    self.take_voltage_Data()
+                    self.take_data()
                     self.check_tolerance()
 
-                    condition = False
+                    # a resumed avgtemp goes straight back to its dT
+                    condition = resumed
                     print 'start tolerance and stability loop'
                     while (not condition):
-                        self.take_temperature_Data()
-                        self.take_voltage_Data()
+                        self.take_data()
                         self.check_tolerance()
                         if abort_ID == 1: break
                         condition = (self.tol == 'OK' and self.stable == 'OK')
+                        if not condition:
+                            self.wait_to_settle()
+                        #end if
                     #end while
                     if abort_ID == 1: break
                     # vary dT
-                    self.measurement_indicator = 'start'
-                    for dT in dTlist:
+                    if not resumed:
+                        self.measurement_indicator = 'start'
+                    #end if
+                    for self.dT_index, dT in enumerate(dTlist):
+                        if resumed and self.dT_index < resume[1]:
+                            continue
+                        #end if
                         self.dT = dT
                         print "Set dT to %f" %(self.dT)
                         # ramp to correct dT
@@ -558,34 +639,39 @@ class TakeData:
                                 print 'IOError: communication failure'
                         #end while
                         print 'reset stability'
-                        self.recenttempA = []
-                        self.recenttempAtime=[]
-                        self.recenttempB = []
-                        self.recenttempBtime=[]
+                        self.trendA.reset()
+                        self.trendB.reset()
                         self.stabilityA = '-'
                         self.stabilityB = '-'
-                        self.updateGUI(stamp="Stability A", data=self.stabilityA)
-                        self.updateGUI(stamp="Stability B", data=self.stabilityB)
+                        self.record("Stability A", self.stabilityA)
+                        self.record("Stability B", self.stabilityB)
 
                         condition = False
                         print 'start tolerance and stability loop'
                         while (not condition):
-                            self.take_temperature_Data()
-                            self.take_voltage_Data()
+                            self.take_data()
                             self.check_tolerance()
                             if abort_ID == 1: break
                             condition = (self.tol == 'OK' and self.stable == 'OK')
+                            if not condition:
+                                self.wait_to_settle()
+                            #end if
                         #end while
                         if abort_ID == 1: break
 
                         # start measurement
                         print 'begin seebeck measurement'
                         self.measurement = 'ON'
-                        self.updateGUI(stamp='Measurement', data=self.measurement)
-                        for i in range(4):
+                        self.record('Measurement', self.measurement)
+                        first = resume[2] if (resumed and self.dT_index == resume[1]) else 0
+                        converged = False
+                        for i in range(first, measurements_per_dT):
                             self.data_measurement()
-                            if (self.dT == dTlist[-1] and i == 3):
+                            if i == measurements_per_dT-1:
+                                converged = self.seebeck_converged()
+                            if ((self.dT == dTlist[-1] or converged) and i == measurements_per_dT-1):
                                 self.measurement_indicator = 'stop'
+                            self.count = i + 1
                             self.write_data_to_file()
                             if abort_ID == 1: break
                         #end for
@@ -593,11 +679,21 @@ class TakeData:
                         self.measurement = 'OFF'
                         self.tol = 'NO'
                         self.stable = 'NO'
-                        self.updateGUI(stamp='Measurement', data=self.measurement)
+                        self.record('Measurement', self.measurement)
+                        self.record('Settling ETA', '-')
+                        self.publish()
                         if abort_ID == 1: break
+                        if converged:
+                            print 'seebeck fits converged, skip the remaining dT'
+                            self.save_state(self.avgtemp_index, len(dTlist), 0)
+                            break
+                        #end if
                     #end for
                     print 'process seebeck data'
                     self.process_data()
+                    if abort_ID == 0: # a stopped avgtemp continues mid-sweep on resume, from its last saved row
+                        self.save_state(self.avgtemp_index + 1, 0, 0)
+                    #end if
                     if abort_ID == 1: break
                 #end for
                 print 'huzzah! program finished'
@@ -612,6 +708,9 @@ class TakeData:
             print "Error Occurred, check error_log.log"
             print e
         #end except
+        finally:
+            self.acquisition.stop()
+        #end finally
 
         if self.exception_ID == 1:
             self.updateGUI(stamp='Status Bar', data='Exception Occurred')
@@ -641,89 +740,61 @@ class TakeData:
     #end init
 
     #--------------------------------------------------------------------------
-    def take_temperature_Data(self):
+    def take_data(self):
+        """ Reads the PIDs while the Keithley scans, then handles the
+            temperatures followed by the voltages.
+        """
+        # an incomplete scan is already retried inside Keithley_2700.scan
+        samples = self.acquisition.acquire({'pid': self.pidbus.snapshot, 'keithley': self.k2700.scan})
+        self.take_temperature_Data(samples['pid'])
+        self.take_voltage_Data(samples['keithley'])
+        self.publish()
+    #end def
+
+    #--------------------------------------------------------------------------
+    def take_temperature_Data(self, sample):
         """ Takes data from the PID and proceeds to a
             function that checks the PID setpoints.
         """
         print 'take temperature data'
-        try:
-            # Take Data and time stamps:
-            self.sampletempA = float(self.sampleApid.get_pv())
-            time.sleep(0.1)
-            self.sampletempB = float(self.sampleBpid.get_pv())
-            time.sleep(0.1)
-            self.blocktempA = float(self.blockApid.get_pv())
-            time.sleep(0.1)
-            self.blocktempB = float(self.blockBpid.get_pv())
-            time.sleep(0.1)
-
-            # Get the current setpoints on the PID:
-            self.samplesetpointA = float(self.sampleApid.get_setpoint())
-            time.sleep(0.1)
-            self.samplesetpointB = float(self.sampleBpid.get_setpoint())
-            time.sleep(0.1)
-
-        except exceptions.ValueError as VE:
-            # Take Data and time stamps:
-            self.sampletempA = float(self.sampleApid.get_pv())
-            time.sleep(0.1)
-            self.sampletempB = float(self.sampleBpid.get_pv())
-            time.sleep(0.1)
-            self.blocktempA = float(self.blockApid.get_pv())
-            time.sleep(0.1)
-            self.blocktempB = float(self.blockBpid.get_pv())
-            time.sleep(0.1)
-
-            # Get the current setpoints on the PID:
-            self.samplesetpointA = float(self.sampleApid.get_setpoint())
-            time.sleep(0.1)
-            self.samplesetpointB = float(self.sampleBpid.get_setpoint())
-            time.sleep(0.1)
-
-        self.time_temperature = time.time() - self.start
+        # Take Data and time stamps:
+        snapshot = sample.data
+        self.sampletempA = snapshot.pv['sampleA']
+        self.sampletempB = snapshot.pv['sampleB']
+        self.blocktempA = snapshot.pv['blockA']
+        self.blocktempB = snapshot.pv['blockB']
+        self.samplesetpointA = snapshot.setpoint['sampleA']
+        self.samplesetpointB = snapshot.setpoint['sampleB']
+
+        self.time_temperature = sample.time - self.start
 
         print "\ntime: %.2f s\nsample temp A: %f C\nblock temp A: %f C\nsample temp B: %f C\nblock temp B: %f C" % (self.time_temperature, self.sampletempA, self.blocktempA, self.sampletempB, self.blocktempB)
 
-        #check stability of PID
-        if (len(self.recenttempA)<3):
-            self.recenttempA.append(self.sampletempA)
-            self.recenttempAtime.append(self.time_temperature)
+        # check stability of PID
+        self.trendA.add(self.time_temperature, self.sampletempA)
+        if self.trendA.ready():
+            self.stabilityA, stderr = self.trendA.fit()
+            print "stability A: %.4f +/- %.4f C/min" % (self.stabilityA*60, stderr*60)
+            self.record("Stability A", self.stabilityA*60, self.time_temperature)
         #end if
-        else:
-            self.recenttempA.pop(0)
-            self.recenttempAtime.pop(0)
-            self.recenttempA.append(self.sampletempA)
-            self.recenttempAtime.append(self.time_temperature)
-            self.stabilityA = self.getStability(self.recenttempA,self.recenttempAtime)
-            print "stability A: %.4f C/min" % (self.stabilityA*60)
-            self.updateGUI(stamp="Stability A", data=self.stabilityA*60)
-        #end else
 
-        if (len(self.recenttempB)<3):
-            self.recenttempB.append(self.sampletempB)
-            self.recenttempBtime.append(self.time_temperature)
+        self.trendB.add(self.time_temperature, self.sampletempB)
+        self.settleA.add(self.time_temperature, self.sampletempA, self.avgtemp+self.dT/2.0)
+        self.settleB.add(self.time_temperature, self.sampletempB, self.avgtemp-self.dT/2.0)
+        if self.trendB.ready():
+            self.stabilityB, stderr = self.trendB.fit()
+            print "stability B: %.4f +/- %.4f C/min" % (self.stabilityB*60, stderr*60)
+            self.record("Stability B", self.stabilityB*60, self.time_temperature)
         #end if
-        else:
-            self.recenttempB.pop(0)
-            self.recenttempBtime.pop(0)
-            self.recenttempB.append(self.sampletempB)
-            self.recenttempBtime.append(self.time_temperature)
-            self.stabilityB = self.getStability(self.recenttempB,self.recenttempBtime)
-            print "stability B: %.4f C/min" % (self.stabilityB*60)
-            self.updateGUI(stamp="Stability B", data=self.stabilityB*60)
-        #end else
 
-        self.updateGUI(stamp="Time Sample Temp A", data=self.time_temperature)
-        self.updateGUI(stamp="Time Sample Temp B", data=self.time_temperature)
-        self.updateGUI(stamp="Sample Temp A", data=self.sampletempA)
-        self.updateGUI(stamp="Sample Temp B", data=self.sampletempB)
+        self.record("Sample Temp A", self.sampletempA, self.time_temperature)
+        self.record("Sample Temp B", self.sampletempB, self.time_temperature)
 
-        self.updateGUI(stamp="Setpoint A", data=self.samplesetpointA)
-        self.updateGUI(stamp="Setpoint B", data=self.samplesetpointB)
+        self.record("Setpoint A", self.samplesetpointA, self.time_temperature)
+        self.record("Setpoint B", self.samplesetpointB, self.time_temperature)
 
-        self.updateGUI(stamp="Block Temp A", data=self.blocktempA)
-        self.updateGUI(stamp="Block Temp B", data=self.blocktempB)
-        self.updateGUI(stamp="Time Block Temp", data=self.time_temperature)
+        self.record("Block Temp A", self.blocktempA, self.time_temperature)
+        self.record("Block Temp B", self.blocktempB, self.time_temperature)
 
         global rawfile
         print('\nwrite temperatures to file\n')
@@ -775,19 +846,18 @@ class TakeData:
     #end def
 
     #--------------------------------------------------------------------------
-    def take_voltage_Data(self):
+    def take_voltage_Data(self, sample):
         print('take voltage data\n')
 
-        self.Vchromelraw = float(self.k2700.fetch(chromelChannel))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
-        self.Valumelraw = float(self.k2700.fetch(alumelChannel))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
-        self.time_voltage = time.time() - self.start
+        readings = sample.data
+        self.Vchromelraw = float(readings[chromelChannel][0][1])*10**6
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel', tc_type)
+        self.Valumelraw = float(readings[alumelChannel][0][1])*10**6
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel', tc_type)
+        self.time_voltage = sample.start - self.start + readings[chromelChannel][0][0]
 
-        self.updateGUI(stamp="Time Chromel Voltage", data=float(self.time_voltage))
-        self.updateGUI(stamp="Time Alumel Voltage", data=float(self.time_voltage))
-        self.updateGUI(stamp="Chromel Voltage", data=float(self.Vchromelcalc))
-        self.updateGUI(stamp="Alumel Voltage", data=float(self.Valumelcalc))
+        self.record("Chromel Voltage", float(self.Vchromelcalc), self.time_voltage)
+        self.record("Alumel Voltage", float(self.Valumelcalc), self.time_voltage)
 
         print "\ntime: %f s\nvoltage (Chromel): %f uV\nvoltage (Alumel): %f uV" % (self.time_voltage, self.Vchromelcalc, self.Valumelcalc)
 
@@ -797,15 +867,6 @@ class TakeData:
         rawfile.write('%.3f,%.3f,%.3f,%.3f,'%(self.Vchromelraw, self.Vchromelcalc,self.Valumelraw, self.Valumelcalc))
     #end def
 
-    #--------------------------------------------------------------------------
-    def getStability(self, temps, times):
-        coeffs = np.polyfit(times, temps, 1)
-
-        # Polynomial Coefficients
-        results = coeffs.tolist()
-        return results[0]
-    #end def
-
     #--------------------------------------------------------------------------
     def check_tolerance(self):
         print 'check tolerance'
@@ -823,22 +884,10 @@ class TakeData:
 
         print 'check stability'
 
-        if (self.stabilityA != '-'):
-            self.stableA = (np.abs(self.stabilityA) < self.stability_threshold)
-            print 'stable A: ',self.stableA
-        #end if
-        else:
-            self.stableA = False
-            print 'stable A: ',self.stableA
-        #end else
-        if (self.stabilityB != '-'):
-            self.stableB = (np.abs(self.stabilityB) < self.stability_threshold)
-            print 'stable B: ',self.stableB
-        #end if
-        else:
-            self.stableB = False
-            print 'stable B: ',self.stableB
-        #end else
+        self.stableA = self.trendA.is_stable(self.stability_threshold)
+        print 'stable A: ',self.stableA
+        self.stableB = self.trendB.is_stable(self.stability_threshold)
+        print 'stable B: ',self.stableB
         if (self.stableA and self.stableB):
             self.stable = 'OK'
         #end if
@@ -853,10 +902,37 @@ class TakeData:
         global rawfile
         print('write status to file')
         rawfile.write(str(self.tol)+','+str(self.stable)+'\n')
+        self.write_status(self.time_temperature, self.sampletempA, self.sampletempB,
+                          self.Vchromelraw, self.Vchromelcalc, self.Valumelraw, self.Valumelcalc)
 
         self.updateGUI(stamp="Status Bar", data=[self.tol, self.stable])
     #end def
 
+    #--------------------------------------------------------------------------
+    def wait_to_settle(self):
+        """
+        Predicts when both sample temperatures will be within tolerance and
+        stable, shows it in the status panel and waits until shortly before
+        then (at most settling.longest_pause) instead of polling the bus.
+        """
+        eta = settling.combine(self.settleA.eta(self.tolerance, self.stability_threshold),
+                               self.settleB.eta(self.tolerance, self.stability_threshold))
+        if eta is None:
+            print 'settling time: unknown'
+            self.record('Settling ETA', '-')
+        #end if
+        else:
+            print 'settling time: %.0f s' % (eta)
+            self.record('Settling ETA', eta)
+        #end else
+        self.publish()
+
+        end = time.time() + settling.pause(eta)
+        while time.time() < end and abort_ID == 0:
+            time.sleep(min(1.0, end - time.time()))
+        #end while
+    #end def
+
     #--------------------------------------------------------------------------
     def data_measurement(self):
         global rawfile
@@ -864,41 +940,39 @@ class TakeData:
         # Takes and writes to file the data on the Keithley
         # The only change between blocks like this one is the specific
         # channel on the Keithley that is being measured.
-        self.sampletempA = float(self.sampleApid.get_pv())
-        self.time_sampletempA = time.time() - self.start
-        self.updateGUI(stamp="Time Sample Temp A", data=self.time_sampletempA)
-        self.updateGUI(stamp="Sample Temp A", data=self.sampletempA)
+        # The sample temperatures are read while the first pass of the scan integrates
+        samples = self.acquisition.acquire({'pid': lambda: self.pidbus.snapshot(['sampleA', 'sampleB']),
+                                            'keithley': self.k2700.scan})
+        snapshot = samples['pid'].data
+
+        self.sampletempA = snapshot.pv['sampleA']
+        self.time_sampletempA = samples['pid'].time - self.start
+        self.record("Sample Temp A", self.sampletempA, self.time_sampletempA)
         print "time: %.2f s\t sample temp A: %.2f C" % (self.time_sampletempA, self.sampletempA)
 
-        time.sleep(0.2)
-
-        self.sampletempB = float(self.sampleBpid.get_pv())
-        self.time_sampletempB = time.time() - self.start
-        self.updateGUI(stamp="Time Sample Temp B", data=self.time_sampletempB)
-        self.updateGUI(stamp="Sample Temp B", data=self.sampletempB)
+        self.sampletempB = snapshot.pv['sampleB']
+        self.time_sampletempB = samples['pid'].time - self.start
+        self.record("Sample Temp B", self.sampletempB, self.time_sampletempB)
         print "time: %.2f s\ttempB: %.2f C" % (self.time_sampletempB, self.sampletempB)
 
-        time.sleep(0.2)
+        # One trigger scans chromel, alumel, alumel, chromel into the buffer
+        self.time_scan = samples['keithley'].start - self.start
+        readings = samples['keithley'].data
+        (stamp_Vchromel, Vchromel), (stamp_Vchromel2, Vchromel2) = readings[chromelChannel]
+        (stamp_Valumel, Valumel), (stamp_Valumel2, Valumel2) = readings[alumelChannel]
 
-        self.Vchromelraw = float(self.k2700.fetch(chromelChannel))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
-        self.time_Vchromel = time.time() - self.start
-        self.updateGUI(stamp="Time Chromel Voltage", data=self.time_Vchromel)
-        self.updateGUI(stamp="Chromel Voltage", data=self.Vchromelcalc)
+        self.Vchromelraw = float(Vchromel)*10**6
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel', tc_type)
+        self.time_Vchromel = self.time_scan + stamp_Vchromel
+        self.record("Chromel Voltage", self.Vchromelcalc, self.time_Vchromel)
         print "time: %.2f s\t voltage (Chromel) %f uV" % (self.time_Vchromel, self.Vchromelcalc)
 
-        time.sleep(0.2)
-
-        self.Valumelraw = float(self.k2700.fetch(alumelChannel))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
-        self.time_Valumel = time.time() - self.start
-        self.updateGUI(stamp="Time Alumel Voltage", data=self.time_Valumel)
-        self.updateGUI(stamp="Alumel Voltage", data=self.Valumelcalc)
+        self.Valumelraw = float(Valumel)*10**6
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel', tc_type)
+        self.time_Valumel = self.time_scan + stamp_Valumel
+        self.record("Alumel Voltage", self.Valumelcalc, self.time_Valumel)
         print "time: %.2f s\t voltage (Alumel) %f uV" % (self.time_Valumel, self.Valumelcalc)
 
-        time.sleep(0.2)
-
-
         rawfile.write('%.1f,'%(self.time_sampletempA))
         rawfile.write('%.2f,%.2f,%.2f,' %(self.sampletempA,self.samplesetpointA,self.blocktempA))
         rawfile.write(str(self.stabilityA)+',')
@@ -906,39 +980,35 @@ class TakeData:
         rawfile.write(str(self.stabilityB)+',')
         rawfile.write('%.3f,%.3f,%.3f,%.3f,'%(self.Vchromelraw, self.Vchromelcalc,self.Valumelraw, self.Valumelcalc))
         rawfile.write(str(self.tol)+','+str(self.stable)+'\n')
+        self.write_status(self.time_sampletempA, self.sampletempA, self.sampletempB,
+                          self.Vchromelraw, self.Vchromelcalc, self.Valumelraw, self.Valumelcalc)
 
         print('Symmetrize the measurement and repeat')
 
-        self.Valumelraw2 = float(self.k2700.fetch(alumelChannel))*10**6
-        self.Valumelcalc2 = self.voltage_Correction(self.Valumelraw2,self.sampletempA,self.sampletempB, 'alumel')
-        self.time_Valumel2 = time.time() - self.start
-        self.updateGUI(stamp="Time Alumel Voltage", data=self.time_Valumel2)
-        self.updateGUI(stamp="Alumel Voltage", data=self.Valumelcalc2)
+        self.Valumelraw2 = float(Valumel2)*10**6
+        self.Valumelcalc2 = voltage_correction(self.Valumelraw2,self.sampletempA,self.sampletempB, 'alumel', tc_type)
+        self.time_Valumel2 = self.time_scan + stamp_Valumel2
+        self.record("Alumel Voltage", self.Valumelcalc2, self.time_Valumel2)
         print "time: %.2f s\t voltage (Alumel) %f uV" % (self.time_Valumel2, self.Valumelcalc2)
 
-        time.sleep(0.2)
-
-        self.Vchromelraw2 = float(self.k2700.fetch(chromelChannel))*10**6
-        self.Vchromelcalc2 = self.voltage_Correction(self.Vchromelraw2,self.sampletempA,self.sampletempB, 'chromel')
-        self.time_Vchromel2 = time.time() - self.start
-        self.updateGUI(stamp="Time Chromel Voltage", data=self.time_Vchromel2)
-        self.updateGUI(stamp="Chromel Voltage", data=self.Vchromelcalc2)
+        self.Vchromelraw2 = float(Vchromel2)*10**6
+        self.Vchromelcalc2 = voltage_correction(self.Vchromelraw2,self.sampletempA,self.sampletempB, 'chromel', tc_type)
+        self.time_Vchromel2 = self.time_scan + stamp_Vchromel2
+        self.record("Chromel Voltage", self.Vchromelcalc2, self.time_Vchromel2)
         print "time: %.2f s\t voltage (Chromel) %f uV" % (self.time_Vchromel2, self.Vchromelcalc2)
 
-        time.sleep(0.2)
+        # The sample temperatures are read again on the PID bus worker
+        samples = self.acquisition.acquire({'pid': lambda: self.pidbus.snapshot(['sampleA', 'sampleB'])})
+        snapshot = samples['pid'].data
 
-        self.sampletempB2 = float(self.sampleBpid.get_pv())
-        self.time_sampletempB2 = time.time() - self.start
-        self.updateGUI(stamp="Time Sample Temp B", data=self.time_sampletempB2)
-        self.updateGUI(stamp="Sample Temp B", data=self.sampletempB2)
+        self.sampletempB2 = snapshot.pv['sampleB']
+        self.time_sampletempB2 = samples['pid'].time - self.start
+        self.record("Sample Temp B", self.sampletempB2, self.time_sampletempB2)
         print "time: %.2f s\ttempB: %.2f C" % (self.time_sampletempB2, self.sampletempB2)
 
-        time.sleep(0.2)
-
-        self.sampletempA2 = float(self.sampleApid.get_pv())
-        self.time_sampletempA2 = time.time() - self.start
-        self.updateGUI(stamp="Time Sample Temp A", data=self.time_sampletempA2)
-        self.updateGUI(stamp="Sample Temp A", data=self.sampletempA2)
+        self.sampletempA2 = snapshot.pv['sampleA']
+        self.time_sampletempA2 = samples['pid'].time - self.start
+        self.record("Sample Temp A", self.sampletempA2, self.time_sampletempA2)
         print "time: %.2f s\t sample temp A: %.2f C" % (self.time_sampletempA2, self.sampletempA2)
 
         rawfile.write('%.1f,'%(self.time_Valumel2))
@@ -948,93 +1018,49 @@ class TakeData:
         rawfile.write(str(self.stabilityB)+',')
         rawfile.write('%.3f,%.3f,%.3f,%.3f,'%(self.Vchromelraw2, self.Vchromelcalc2,self.Valumelraw2, self.Valumelcalc2))
         rawfile.write(str(self.tol)+','+str(self.stable)+'\n')
+        self.write_status(self.time_Valumel2, self.sampletempA2, self.sampletempB2,
+                          self.Vchromelraw2, self.Vchromelcalc2, self.Valumelraw2, self.Valumelcalc2)
+
+        self.publish()
     #end def
 
     #--------------------------------------------------------------------------
-    def voltage_Correction(self, raw_voltage, tempA, tempB, side):
-        ''' raw_data must be in uV '''
-        # Kelvin conversion for polynomial correction.
-        dT = tempA - tempB
-        avgT = (tempA + tempB)/2 + 273.15
-
-        # Correction for effect from Thermocouple Seebeck
-        out = self.alpha(avgT, side)*dT - raw_voltage
-
-        return out
+    def seebeck_converged(self):
+        """
+        True once the Seebeck fits of both wires at this avgtemp have a
+        standard error below seebeck_target, from data taken at dT steps on
+        both sides of 0 (|dT| of at least the tolerance, so the scatter of
+        the dT = 0 step does not count). Always False when the target is 0.
+        """
+        global Vchromelcalclist, Valumelcalclist, dTcalclist
+        if self.seebeck_target <= 0 or len(dTcalclist) < 3:
+            return False
+        #end if
+        chromel, alumel = fit_seebeck(dTcalclist, Vchromelcalclist, Valumelcalclist)
+        print "seebeck chromel: %.3f +/- %.4f uV/K (R^2 %.5f)" % (chromel[0], chromel[3], chromel[2])
+        print "seebeck alumel: %.3f +/- %.4f uV/K (R^2 %.5f)" % (alumel[0], alumel[3], alumel[2])
+        if not (min(dTcalclist) <= -self.tolerance and max(dTcalclist) >= self.tolerance):
+            return False
+        #end if
+        return chromel[3] < self.seebeck_target and alumel[3] < self.seebeck_target
     #end def
 
     #--------------------------------------------------------------------------
-    def alpha(self, x, side):
-        ''' x = avgT
-            alpha in uV/K
-        '''
-
-        if tc_type == "k-type":
-
-            ### If Chromel, taken from Chromel_Seebeck.txt
-            if side == 'chromel':
-                if ( x >= 270 and x < 700):
-                    alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                            -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                            -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                            -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                            -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                            -4.30421084091e-24*x**10
-
-                #end if
-
-                elif ( x >= 700 and x < 1599):
-                    alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                            0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                            9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                            5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                            4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-
-                #end if
-
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Chromel)
-
-            ### If Alumel, taken from Alumel_Seebeck.txt
-            elif side == 'alumel':
-                if ( x >= 270 and x < 570):
-                    alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                            -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                            -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                            -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                            -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-
-                #end if
-
-                elif ( x >= 570 and x < 1599):
-                    alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                            0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                            1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                            4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                            1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-
-                #end if
-
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Alumel)
-
-            else:
-                print "Error in voltage correction."
-
-        #end if (K-type)
-
-        return alpha
-
+    def write_status(self, t, tempA, tempB, Vchromelraw, Vchromelcalc, Valumelraw, Valumelcalc):
+        """
+        Appends the row just written to rawfile to the binary status store,
+        at full precision.
+        """
+        global rawstore
+        rawstore.append([t, tempA, self.samplesetpointA, self.blocktempA, self.stabilityA,
+                         tempB, self.samplesetpointB, self.blocktempB, self.stabilityB,
+                         Vchromelraw, Vchromelcalc, Valumelraw, Valumelcalc, self.tol, self.stable])
     #end def
 
     #--------------------------------------------------------------------------
     def write_data_to_file(self):
         global timecalclist, Vchromelcalclist, Valumelcalclist, dTcalclist, avgTcalclist
-        global myfile
+        global myfile, datastore
 
         print('\nWrite data to file\n')
         time = (self.time_sampletempA + self.time_sampletempB + self.time_Valumel + self.time_Vchromel + self.time_sampletempA2 + self.time_sampletempB2 + self.time_Valumel2 + self.time_Vchromel2)/8
@@ -1047,6 +1073,7 @@ class TakeData:
         myfile.write('%.3f,' %(time))
         myfile.write('%.4f,%.4f,%.4f,%.4f,' % (ta, tb, avgt, dt) )
         myfile.write('%.6f,%.6f' % (vchromel,valumel))
+        datastore.append([time, ta, tb, avgt, dt, vchromel, valumel, indicators.get(self.measurement_indicator, 0.0)])
 
         timecalclist.append(time)
         Vchromelcalclist.append(vchromel)
@@ -1070,15 +1097,60 @@ class TakeData:
             myfile.write(', ')
 
         myfile.write('\n')
+        self.save_state(self.avgtemp_index, self.dT_index, self.count)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def save_state(self, avgtemp_index, dT_index, count):
+        """
+        Saves the position in the profile and the data of the current avgtemp,
+        so the run can be resumed from here (--resume).
+        """
+        global timecalclist, Vchromelcalclist, Valumelcalclist, dTcalclist, avgTcalclist
+        global filePath, myfile, rawfile, processfile
+
+        # the csv files must hold everything the state refers to
+        for f in (myfile, rawfile, processfile):
+            f.flush()
+        #end for
+        run_state.save(filePath, {'measureList': measureList, 'dTlist': dTlist,
+                                  'tolerance': self.tolerance, 'stability_threshold': self.stability_threshold,
+                                  'oscillation': oscillation, 'seebeck_target': self.seebeck_target,
+                                  'avgtemp_index': avgtemp_index, 'dT_index': dT_index, 'count': count,
+                                  'elapsed': time.time() - self.start, 'plotnumber': self.plotnumber,
+                                  'timecalclist': timecalclist, 'Vchromelcalclist': Vchromelcalclist,
+                                  'Valumelcalclist': Valumelcalclist, 'dTcalclist': dTcalclist,
+                                  'avgTcalclist': avgTcalclist})
+    #end def
+
+    #--------------------------------------------------------------------------
+    def record(self, field, value, t=None):
+        """
+        Adds a value and its time stamp to the telemetry frame of the current
+        cycle; the frame is sent to the GUI in one message by publish.
+        """
+        if t is None:
+            t = time.time() - self.start
+        #end if
+        self.frame.setdefault(field, []).append((t, value))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def publish(self):
+        """
+        Sends the telemetry frame to the GUI (main thread), once per acquisition cycle.
+        """
+        if self.frame:
+            wx.CallAfter(pub.sendMessage, "Telemetry", msg=self.frame)
+            self.frame = {}
+        #end if
     #end def
 
     #--------------------------------------------------------------------------
     def updateGUI(self, stamp, data):
         """
-        Sends data to the GUI (main thread), for live updating while the process is running
-        in another thread.
+        Sends a single message (status changes, save requests) to the GUI.
         """
-        time.sleep(0.1)
         wx.CallAfter(pub.sendMessage, stamp, msg=data)
     #end def
 
@@ -1093,38 +1165,11 @@ class TakeData:
         dTchromellist = dTcalclist
         dTalumellist = dTcalclist
 
-        results_chromel = {}
-        results_alumel = {}
-
-        coeffs_chromel = np.polyfit(dTchromellist, Vchromelcalclist, 1)
-        coeffs_alumel = np.polyfit(dTalumellist,Valumelcalclist,1)
-        # Polynomial Coefficients
-        polynomial_chromel = coeffs_chromel.tolist()
-        polynomial_alumel = coeffs_alumel.tolist()
-
-        seebeck_chromel = polynomial_chromel[0]
-        offset_chromel = polynomial_chromel[1]
-        seebeck_alumel = polynomial_alumel[0]
-        offset_alumel = polynomial_alumel[1]
-
-        # Calculate coefficient of determination (r-squared):
-        p_chromel = np.poly1d(coeffs_chromel)
-        p_alumel = np.poly1d(coeffs_alumel)
-        # fitted values:
-        yhat_chromel = p_chromel(dTchromellist)
-        yhat_alumel = p_alumel(dTalumellist)
-        # mean of values:
-        ybar_chromel = np.sum(Vchromelcalclist)/len(Vchromelcalclist)
-        ybar_alumel = np.sum(Valumelcalclist)/len(Valumelcalclist)
-        # regression sum of squares:
-        ssreg_chromel = np.sum((yhat_chromel-ybar_chromel)**2)   # or sum([ (yihat - ybar)**2 for yihat in yhat])
-        ssreg_alumel = np.sum((yhat_alumel-ybar_alumel)**2)
-        # total sum of squares:
-        sstot_chromel = np.sum((Vchromelcalclist - ybar_chromel)**2)
-        sstot_alumel = np.sum((Valumelcalclist - ybar_alumel)**2)    # or sum([ (yi - ybar)**2 for yi in y])
-
-        rsquared_chromel = ssreg_chromel / sstot_chromel
-        rsquared_alumel = ssreg_alumel / sstot_alumel
+        chromel, alumel = fit_seebeck(dTchromellist, Vchromelcalclist, Valumelcalclist)
+        seebeck_chromel, offset_chromel, rsquared_chromel, stderr_chromel = chromel
+        seebeck_alumel, offset_alumel, rsquared_alumel, stderr_alumel = alumel
+        polynomial_chromel = [seebeck_chromel, offset_chromel]
+        polynomial_alumel = [seebeck_alumel, offset_alumel]
 
         processfile.write('%.3f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f\n'%(time,avgT,seebeck_chromel,offset_chromel,rsquared_chromel,seebeck_alumel,offset_alumel,rsquared_alumel))
 
@@ -1137,51 +1182,22 @@ class TakeData:
         celsius = u"\u2103"
         self.create_plot(dTalumellist,dTchromellist,Valumelcalclist,Vchromelcalclist,fitalumel,fitchromel,str(self.plotnumber)+'_'+str(avgT)+ 'C')
 
-        self.updateGUI(stamp="Chromel Seebeck", data=seebeck_chromel)
-        self.updateGUI(stamp="Alumel Seebeck", data=seebeck_alumel)
+        self.record("Chromel Seebeck", seebeck_chromel)
+        self.record("Alumel Seebeck", seebeck_alumel)
+        self.publish()
     #end def
 
     #--------------------------------------------------------------------------
     def create_plot(self, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel, title):
         global filePath
-        print 'create seebeck plot'
-        dpi = 400
-
-        plt.ioff()
-
-        # Create Plot:
-        fig = plt.figure(self.plotnumber, dpi=dpi)
-        ax = fig.add_subplot(111)
-        ax.grid()
-        ax.set_title(title)
-        ax.set_xlabel("dT (K)")
-        ax.set_ylabel("dV (uV)")
-
-        # Plot data points:
-        ax.scatter(xalumel, yalumel, color='r', marker='.', label="alumel Voltage")
-        ax.scatter(xchromel, ychromel, color='b', marker='.', label="chromel Voltage")
-
-        # Overlay linear fits:
-        coeffsalumel = fitalumel['polynomial']
-        coeffschromel = fitchromel['polynomial']
-        p_alumel = np.poly1d(coeffsalumel)
-        p_chromel = np.poly1d(coeffschromel)
-        xp = np.linspace(min(xalumel+xchromel), max(xalumel+xchromel), 5000)
-        alumel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffsalumel[0], coeffsalumel[1])
-        chromel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffschromel[0], coeffschromel[1])
-        ax.plot(xp, p_alumel(xp), '-', c='#FF9900', label="alumel Voltage Fit\n %s" % alumel_eq)
-        ax.plot(xp, p_chromel(xp), '-', c='g', label="chromel Voltage Fit\n %s" % chromel_eq)
-
-        ax.legend(loc='upper left', fontsize='10')
-
-        # Save:
+        print 'queue seebeck plot'
         plot_folder = filePath + '/Seebeck Plots/'
         if not os.path.exists(plot_folder):
             os.makedirs(plot_folder)
+        #end if
 
-        fig.savefig('%s.png' % (plot_folder + title) , dpi=dpi)
-
-        #plt.close()
+        # rendered in the background by the plot queue
+        self.plots.submit('%s.png' % (plot_folder + title), title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel)
     #end def
 
     #--------------------------------------------------------------------------
@@ -1189,16 +1205,20 @@ class TakeData:
         ''' Function saving the files after the data acquisition loop has been
             exited.
         '''
+        self.plots.close()
 
         print('Save Files')
 
         global myfile
         global rawfile
         global processfile
+        global rawstore, datastore
 
         myfile.close() # Close the file
         rawfile.close()
         processfile.close()
+        rawstore.close()
+        datastore.close()
 
         # Save the GUI plots
         global save_plots_ID
@@ -1283,20 +1303,24 @@ class UserPanel(wx.Panel):
         global tolerance
         global oscillation
         global stability_threshold
+        global seebeck_target
 
         self.oscillation = oscillation
         self.tolerance = tolerance
         self.stability_threshold = stability_threshold*60
+        self.seebeck_target = seebeck_target
 
 
         self.create_title("User Panel") # Title
 
         self.celsius = u"\u2103"
+        self.mu = u"\u00b5"
         self.font2 = wx.Font(11, wx.DEFAULT, wx.NORMAL, wx.NORMAL)
 
         self.oscillation_control() # Oscillation range control
         self.tolerance_control() # PID tolerance level Control
         self.stability_control() # PID stability threshold control
+        self.target_control() # Seebeck standard error target control
 
 
         self.measurementListBox()
@@ -1380,6 +1404,7 @@ class UserPanel(wx.Panel):
         global myfile
         global rawfile
         global processfile
+        global rawstore, datastore
         global measureList
         global dTlist
 
@@ -1404,6 +1429,8 @@ class UserPanel(wx.Panel):
                     myfile.write('Seebeck Data File\nStart Time: ' + str(begin) + '\n')
                     rawfile.write('System Status\nStart Time: ' + str(begin) + '\n')
                     processfile.write('Processed Seebeck Coefficent\nStart Time: ' + str(begin) + '\n')
+                    rawstore = RawStore(os.path.splitext(statusFile)[0] + '.raw', 'status', begin)
+                    datastore = RawStore(os.path.splitext(dataFile)[0] + '.raw', 'data', begin)
 
                     dataheaders = 'time (s), tempA (C), tempB (C), avgtemp (C), deltatemp (C), Vchromel (uV), Valumel (uV), indicator\n'
                     myfile.write(dataheaders)
@@ -1417,16 +1444,7 @@ class UserPanel(wx.Panel):
 
                     abort_ID = 0
 
-                    self.btn_osc.Disable()
-                    self.btn_tol.Disable()
-                    self.btn_stab.Disable()
-                    self.btn_new.Disable()
-                    self.btn_ren.Disable()
-                    self.btn_dlt.Disable()
-                    self.btn_clr.Disable()
-                    self.btn_check.Disable()
-                    self.btn_run.Disable()
-                    self.btn_stop.Enable()
+                    self.disable_buttons()
 
                     #start the threading process
                     thread = ProcessThread()
@@ -1441,6 +1459,60 @@ class UserPanel(wx.Panel):
         #end if
     #end def
 
+    #--------------------------------------------------------------------------
+    def resume(self, folder):
+        """ Carries on with the interrupted run saved in folder. """
+        global dataFile
+        global statusFile
+        global seebeckFile
+        global myfile
+        global rawfile
+        global processfile
+        global rawstore, datastore
+        global measureList
+        global dTlist
+        global tolerance
+        global stability_threshold
+        global oscillation
+        global seebeck_target
+        global filePath
+
+        global abort_ID
+
+        state = run_state.load(folder)
+        measureList = state['measureList']
+        dTlist = state['dTlist']
+        tolerance = state['tolerance']
+        stability_threshold = state['stability_threshold']
+        oscillation = state['oscillation']
+        seebeck_target = state.get('seebeck_target', 0)
+
+        self.text_osc.SetLabel(str(oscillation) + ' '+self.celsius)
+        self.text_tol.SetLabel(str(tolerance) + ' '+self.celsius)
+        self.text_stability_threshold.SetLabel(str(stability_threshold*60) + ' '+self.celsius+'/min')
+        self.text_target.SetLabel(str(seebeck_target) + ' '+self.mu+'V/'+self.celsius)
+        self.listbox.Clear()
+        for avgtemp in measureList:
+            self.listbox.Append(str(avgtemp))
+        #end for
+
+        filePath = os.path.abspath(folder)
+        os.chdir(filePath)
+
+        myfile = run_state.reopen(dataFile)
+        rawfile = run_state.reopen(statusFile)
+        processfile = run_state.reopen(seebeckFile)
+        rawstore = RawStore(os.path.splitext(statusFile)[0] + '.raw', 'status', resume=True)
+        datastore = RawStore(os.path.splitext(dataFile)[0] + '.raw', 'data', resume=True)
+
+        abort_ID = 0
+
+        self.disable_buttons()
+
+        #start the threading process
+        thread = ProcessThread(state)
+    #end def
+
     #--------------------------------------------------------------------------
     def name_folder(self):
         question = wx.MessageDialog(None, 'The data files are saved into a folder upon ' + \
@@ -1638,6 +1710,42 @@ class UserPanel(wx.Panel):
 
     #end def
 
+    #--------------------------------------------------------------------------
+    def target_control(self):
+        self.target_Panel = wx.Panel(self, -1)
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+
+        self.label_target = wx.StaticText(self, label="Seebeck Error Target ("+self.mu+"V/"+self.celsius+")")
+        self.text_target = text_target = wx.StaticText(self.target_Panel, label=str(self.seebeck_target) + ' '+self.mu+'V/'+self.celsius)
+        text_target.SetFont(self.font2)
+        self.edit_target = edit_target = wx.TextCtrl(self.target_Panel, size=(40, -1))
+        self.btn_target = btn_target = wx.Button(self.target_Panel, label="save", size=(40, -1))
+        text_guide_target = wx.StaticText(self.target_Panel, label='The remaining dT steps are\nskipped once the Seebeck fits\nare this precise (0: never).')
+
+        btn_target.Bind(wx.EVT_BUTTON, self.save_target)
+
+        hbox.Add((0, -1))
+        hbox.Add(text_target, 0, wx.LEFT, 5)
+        hbox.Add(edit_target, 0, wx.LEFT, 40)
+        hbox.Add(btn_target, 0, wx.LEFT, 5)
+        hbox.Add(text_guide_target, 0, wx.LEFT, 5)
+
+        self.target_Panel.SetSizer(hbox)
+
+    #end def
+
+    #--------------------------------------------------------------------------
+    def save_target(self, e):
+        global seebeck_target
+        try:
+            self.seebeck_target = self.edit_target.GetValue()
+            self.text_target.SetLabel(self.seebeck_target)
+            seebeck_target = float(self.seebeck_target)
+        except ValueError:
+            wx.MessageBox("Invalid input. Must be a number.", "Error")
+
+    #end def
+
     #--------------------------------------------------------------------------
     def measurementListBox(self):
         # ids for measurement List Box
@@ -1645,6 +1753,7 @@ class UserPanel(wx.Panel):
         ID_CHANGE = 2
         ID_CLEAR = 3
         ID_DELETE = 4
+        ID_OPTIMIZE = 5
 
         self.measurementPanel = wx.Panel(self, -1)
         hbox = wx.BoxSizer(wx.HORIZONTAL)
@@ -1663,11 +1772,13 @@ class UserPanel(wx.Panel):
         self.btn_ren = ren = wx.Button(btnPanel, ID_CHANGE, 'Change', size=(50, 20))
         self.btn_dlt = dlt = wx.Button(btnPanel, ID_DELETE, 'Delete', size=(50, 20))
         self.btn_clr = clr = wx.Button(btnPanel, ID_CLEAR, 'Clear', size=(50, 20))
+        self.btn_opt = opt = wx.Button(btnPanel, ID_OPTIMIZE, 'Optimize', size=(50, 20))
 
         self.Bind(wx.EVT_BUTTON, self.NewItem, id=ID_NEW)
         self.Bind(wx.EVT_BUTTON, self.OnRename, id=ID_CHANGE)
         self.Bind(wx.EVT_BUTTON, self.OnDelete, id=ID_DELETE)
         self.Bind(wx.EVT_BUTTON, self.OnClear, id=ID_CLEAR)
+        self.Bind(wx.EVT_BUTTON, self.OnOptimize, id=ID_OPTIMIZE)
         self.Bind(wx.EVT_LISTBOX_DCLICK, self.OnRename)
 
         vbox.Add((-1, 5))
@@ -1675,6 +1786,7 @@ class UserPanel(wx.Panel):
         vbox.Add(ren, 0, wx.TOP, 5)
         vbox.Add(dlt, 0, wx.TOP, 5)
         vbox.Add(clr, 0, wx.TOP, 5)
+        vbox.Add(opt, 0, wx.TOP, 5)
 
         btnPanel.SetSizer(vbox)
         #hbox.Add(self.label_measurements, 0, wx.LEFT, 5)
@@ -1727,6 +1839,26 @@ class UserPanel(wx.Panel):
 
     #end def
 
+    #--------------------------------------------------------------------------
+    def OnOptimize(self, event):
+        """
+        Reorders the measurements to spend the least time ramping and shows
+        the estimated duration of the run.
+        """
+        temps = [int(self.listbox.GetString(i)) for i in xrange(self.listbox.GetCount())]
+        if len(temps) == 0:
+            return
+        #end if
+        order, total = schedule.plan(temps, dTlist, schedule.load(rate_model_file))
+
+        self.listbox.Clear()
+        for avgtemp in order:
+            self.listbox.Append(str(avgtemp))
+        #end for
+        wx.MessageBox("Estimated duration: %.1f hours" % (total/3600), "Optimize")
+
+    #end def
+
     #--------------------------------------------------------------------------
     def listbox_max_limit(self, limit):
         """ Sets user input to only alalumel a maximum temperature. """
@@ -1758,7 +1890,7 @@ class UserPanel(wx.Panel):
     #--------------------------------------------------------------------------
     def create_sizer(self):
 
-        sizer = wx.GridBagSizer(8,2)
+        sizer = wx.GridBagSizer(9,2)
         sizer.Add(self.titlePanel, (0, 1), span=(1,2), flag=wx.ALIGN_CENTER_HORIZONTAL)
         sizer.Add(self.label_osc, (1, 1))
         sizer.Add(self.oscPanel, (1, 2))
@@ -1767,17 +1899,36 @@ class UserPanel(wx.Panel):
         sizer.Add(self.tolPanel, (2, 2))
         sizer.Add(self.label_stability_threshold, (3,1))
         sizer.Add(self.stability_threshold_Panel, (3, 2))
+        sizer.Add(self.label_target, (4,1))
+        sizer.Add(self.target_Panel, (4, 2))
 
-        sizer.Add(self.label_measurements, (4,1))
-        sizer.Add(self.measurementPanel, (4, 2))
-        sizer.Add(self.maxLimit_Panel, (5, 1), span=(1,2))
-        sizer.Add(self.linebreak4, (6,1),span = (1,2))
-        sizer.Add(self.run_stopPanel, (7,1),span = (1,2), flag=wx.ALIGN_CENTER_HORIZONTAL)
+        sizer.Add(self.label_measurements, (5,1))
+        sizer.Add(self.measurementPanel, (5, 2))
+        sizer.Add(self.maxLimit_Panel, (6, 1), span=(1,2))
+        sizer.Add(self.linebreak4, (7,1),span = (1,2))
+        sizer.Add(self.run_stopPanel, (8,1),span = (1,2), flag=wx.ALIGN_CENTER_HORIZONTAL)
 
         self.SetSizer(sizer)
 
     #end def
 
+    #--------------------------------------------------------------------------
+    def disable_buttons(self):
+        self.btn_osc.Disable()
+        self.btn_tol.Disable()
+        self.btn_stab.Disable()
+        self.btn_target.Disable()
+        self.btn_new.Disable()
+        self.btn_ren.Disable()
+        self.btn_dlt.Disable()
+        self.btn_clr.Disable()
+        self.btn_opt.Disable()
+        self.btn_check.Disable()
+        self.btn_run.Disable()
+        self.btn_stop.Enable()
+
+    #end def
+
     #--------------------------------------------------------------------------
     def enable_buttons(self):
         self.btn_check.Enable()
@@ -1785,9 +1936,11 @@ class UserPanel(wx.Panel):
         self.btn_osc.Enable()
         self.btn_tol.Enable()
         self.btn_stab.Enable()
+        self.btn_target.Enable()
         self.btn_ren.Enable()
         self.btn_dlt.Enable()
         self.btn_clr.Enable()
+        self.btn_opt.Enable()
 
         self.btn_stop.Disable()
 
@@ -1826,6 +1979,7 @@ class StatusPanel(wx.Panel):
         self.seebeckchromel = '-'
         self.seebeckalumel = '-'
         self.mea = '-'
+        self.eta = '-'
 
         self.create_title("Status Panel")
         self.create_status()
@@ -1838,36 +1992,27 @@ class StatusPanel(wx.Panel):
         self.linebreak7 = wx.StaticLine(self, pos=(-1,-1), size=(300,1))
         self.linebreak8 = wx.StaticLine(self, pos=(-1,-1), size=(300,1))
 
-        # Updates from running program
-        pub.subscribe(self.OnTime, "Time Chromel Voltage")
-        pub.subscribe(self.OnTime, "Time Alumel Voltage")
-        pub.subscribe(self.OnTime, "Time Sample Temp A")
-        pub.subscribe(self.OnTime, "Time Sample Temp B")
-
-        pub.subscribe(self.OnChromelVoltage, "Chromel Voltage")
-        pub.subscribe(self.OnAlumelVoltage, "Alumel Voltage")
-        pub.subscribe(self.OnSampleTempA, "Sample Temp A")
-        pub.subscribe(self.OnSampleTempB, "Sample Temp B")
-        pub.subscribe(self.OnBlockTempA, "Block Temp A")
-        pub.subscribe(self.OnBlockTempB, "Block Temp B")
-        pub.subscribe(self.OnSetpointA, "Setpoint A")
-        pub.subscribe(self.OnSetpointB, "Setpoint B")
-        pub.subscribe(self.OnStabilityA, "Stability A")
-        pub.subscribe(self.OnStabilityB, "Stability B")
-        pub.subscribe(self.OnMeasurement, 'Measurement')
-        pub.subscribe(self.OnSeebeckchromel, "Chromel Seebeck")
-        pub.subscribe(self.OnSeebeckalumel, "Alumel Seebeck")
+        # Handlers for the fields of the telemetry frame
+        self.handlers = {"Chromel Voltage": self.OnChromelVoltage,
+                         "Alumel Voltage": self.OnAlumelVoltage,
+                         "Sample Temp A": self.OnSampleTempA,
+                         "Sample Temp B": self.OnSampleTempB,
+                         "Block Temp A": self.OnBlockTempA,
+                         "Block Temp B": self.OnBlockTempB,
+                         "Setpoint A": self.OnSetpointA,
+                         "Setpoint B": self.OnSetpointB,
+                         "Stability A": self.OnStabilityA,
+                         "Stability B": self.OnStabilityB,
+                         "Measurement": self.OnMeasurement,
+                         "Settling ETA": self.OnSettling,
+                         "Chromel Seebeck": self.OnSeebeckchromel,
+                         "Alumel Seebeck": self.OnSeebeckalumel}
 
+        # Updates from running program
+        pub.subscribe(self.OnTelemetry, "Telemetry")
 
         # Updates from inital check
-        pub.subscribe(self.OnChromelVoltage, "Chromel Voltage Init")
-        pub.subscribe(self.OnAlumelVoltage, "Alumel Voltage Init")
-        pub.subscribe(self.OnSampleTempA, "Sample Temp A Init")
-        pub.subscribe(self.OnSampleTempB, "Sample Temp B Init")
-        pub.subscribe(self.OnBlockTempA, "Block Temp A Init")
-        pub.subscribe(self.OnBlockTempB, "Block Temp B Init")
-        pub.subscribe(self.OnSetpointA, "Setpoint A Init")
-        pub.subscribe(self.OnSetpointB, "Setpoint B Init")
+        pub.subscribe(self.OnTelemetry, "Telemetry Init")
 
         #self.update_values()
 
@@ -1875,56 +2020,68 @@ class StatusPanel(wx.Panel):
 
     #end init
 
+    #--------------------------------------------------------------------------
+    def OnTelemetry(self, msg):
+        """
+        msg is a telemetry frame, {field: [(time, value), ...]}. Shows the
+        latest value of every field and refreshes the panel once.
+        """
+        latest = None
+        for field in msg:
+            t, value = msg[field][-1]
+            if field in self.handlers:
+                self.handlers[field](value)
+            #end if
+            if t is not None and (latest is None or t > latest):
+                latest = t
+            #end if
+        #end for
+        self.dT = str(float(self.sampletempA)-float(self.sampletempB))
+        self.avgT = str((float(self.sampletempA)+float(self.sampletempB))/2)
+        if latest is not None:
+            self.OnTime(latest)
+        #end if
+        self.update_values()
+    #end def
+
     #--------------------------------------------------------------------------
     def OnChromelVoltage(self, msg):
         self.chromelV = '%.1f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnAlumelVoltage(self, msg):
         self.alumelV = '%.1f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnSampleTempA(self, msg):
         self.sampletempA = '%.1f'%(float(msg))
-        self.dT = str(float(self.sampletempA)-float(self.sampletempB))
-        self.avgT = str((float(self.sampletempA)+float(self.sampletempB))/2)
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnSampleTempB(self, msg):
         self.sampletempB = '%.1f'%(float(msg))
-        self.dT = str(float(self.sampletempA)-float(self.sampletempB))
-        self.avgT = str((float(self.sampletempA)+float(self.sampletempB))/2)
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnBlockTempA(self, msg):
         self.blocktempA = '%.1f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnBlockTempB(self, msg):
         self.blocktempB = '%.1f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnSetpointA(self, msg):
         self.samplesetpointA = '%.1f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnSetpointB(self, msg):
         self.samplesetpointB = '%.1f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
@@ -1933,7 +2090,6 @@ class StatusPanel(wx.Panel):
             self.stabilityA = '%.2f'%(float(msg))
         else:
             self.stabilityA = msg
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
@@ -1942,29 +2098,39 @@ class StatusPanel(wx.Panel):
             self.stabilityB = '%.2f'%(float(msg))
         else:
             self.stabilityB = msg
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnSeebeckchromel(self, msg):
         self.seebeckchromel = '%.2f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnSeebeckalumel(self, msg):
         self.seebeckalumel = '%.2f'%(float(msg))
-        self.update_values()
     #end def
 
     #--------------------------------------------------------------------------
     def OnMeasurement(self, msg):
         self.mea = msg
-        self.update_values()
+    #end def
+
+    #--------------------------------------------------------------------------
+    def OnSettling(self, msg):
+        if msg != '-':
+            self.eta = self.hms(msg)
+        else:
+            self.eta = msg
     #end def
 
     #--------------------------------------------------------------------------
     def OnTime(self, msg):
+        self.t = self.hms(msg)
+        self.ctime = str(datetime.now())[11:19]
+    #end def
+
+    #--------------------------------------------------------------------------
+    def hms(self, msg):
         time = int(float(msg))
 
         hours = str(time/3600)
@@ -1979,9 +2145,7 @@ class StatusPanel(wx.Panel):
         else:
             seconds = '%i'%(seconds)
 
-        self.t = '%s:%s:%s'%(hours,minutes,seconds)
-        self.ctime = str(datetime.now())[11:19]
-        self.update_values()
+        return '%s:%s:%s'%(hours,minutes,seconds)
     #end def
 
     #--------------------------------------------------------------------------
@@ -2034,6 +2198,8 @@ class StatusPanel(wx.Panel):
         self.label_seebeckalumel.SetFont(wx.Font(16, wx.DEFAULT, wx.NORMAL, wx.NORMAL))
         self.label_mea = wx.StaticText(self, label="seebeck measurement")
         self.label_mea.SetFont(wx.Font(16, wx.DEFAULT, wx.NORMAL, wx.NORMAL))
+        self.label_eta = wx.StaticText(self, label="settling in (h:m:s):")
+        self.label_eta.SetFont(wx.Font(16, wx.DEFAULT, wx.NORMAL, wx.NORMAL))
 
         self.ctimecurrent = wx.StaticText(self, label=self.ctime)
         self.ctimecurrent.SetFont(wx.Font(16, wx.DEFAULT, wx.NORMAL, wx.NORMAL))
@@ -2069,6 +2235,8 @@ class StatusPanel(wx.Panel):
         self.seebeckalumelcurrent.SetFont(wx.Font(16, wx.DEFAULT, wx.NORMAL, wx.NORMAL))
         self.meacurrent = wx.StaticText(self, label=self.mea)
         self.meacurrent.SetFont(wx.Font(16, wx.DEFAULT, wx.NORMAL, wx.NORMAL))
+        self.etacurrent = wx.StaticText(self, label=self.eta)
+        self.etacurrent.SetFont(wx.Font(16, wx.DEFAULT, wx.NORMAL, wx.NORMAL))
     #end def
 
     #--------------------------------------------------------------------------
@@ -2090,6 +2258,7 @@ class StatusPanel(wx.Panel):
         self.seebeckchromelcurrent.SetLabel(self.seebeckchromel)
         self.seebeckalumelcurrent.SetLabel(self.seebeckalumel)
         self.meacurrent.SetLabel(self.mea)
+        self.etacurrent.SetLabel(self.eta)
     #end def
 
     #--------------------------------------------------------------------------
@@ -2151,8 +2320,10 @@ class StatusPanel(wx.Panel):
 
         sizer.Add(self.label_mea, (18,0))
         sizer.Add(self.meacurrent, (18,1),flag=wx.ALIGN_CENTER_HORIZONTAL)
+        sizer.Add(self.label_eta, (19,0))
+        sizer.Add(self.etacurrent, (19,1),flag=wx.ALIGN_CENTER_HORIZONTAL)
 
-        sizer.Add(self.linebreak2, (19,0), span = (1,2))
+        sizer.Add(self.linebreak2, (20,0), span = (1,2))
 
         self.SetSizer(sizer)
     #end def
@@ -2170,10 +2341,8 @@ class VoltagePanel(wx.Panel):
         wx.Panel.__init__(self, *args, **kwargs)
         global filePath
 
-        global tchromelV_list
-        global chromelV_list
-        global talumelV_list
-        global alumelV_list
+        global chromelV_buffer
+        global alumelV_buffer
 
         self.create_title("Voltage Panel")
         self.init_plot()
@@ -2181,15 +2350,17 @@ class VoltagePanel(wx.Panel):
         self.create_control_panel()
         self.create_sizer()
 
-        pub.subscribe(self.OnChromelVoltage, "Chromel Voltage")
-        pub.subscribe(self.OnchromelVTime, "Time Chromel Voltage")
-        pub.subscribe(self.OnAlumelVoltage, "Alumel Voltage")
-        pub.subscribe(self.OnalumelVTime, "Time Alumel Voltage")
+        pub.subscribe(self.OnTelemetry, "Telemetry")
 
         # For saving the plots at the end of data acquisition:
         pub.subscribe(self.save_plot, "Save_All")
 
-        self.animator = animation.FuncAnimation(self.figure, self.draw_plot, interval=500, blit=False)
+        # Full draws only happen on a rescale or a resize; every one of them
+        # takes a new copy of the background for draw_plot to blit onto.
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.timer = self.canvas.new_timer(interval=500)
+        self.timer.add_callback(self.draw_plot)
+        self.timer.start()
     #end init
 
     #--------------------------------------------------------------------------
@@ -2224,30 +2395,14 @@ class VoltagePanel(wx.Panel):
     #end def
 
     #--------------------------------------------------------------------------
-    def OnChromelVoltage(self, msg):
-        self.chromelV = float(msg)
-        chromelV_list.append(self.chromelV)
-        tchromelV_list.append(self.tchromelV)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnchromelVTime(self, msg):
-        self.tchromelV = float(msg)
-
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnAlumelVoltage(self, msg):
-        self.alumelV = float(msg)
-        alumelV_list.append(self.alumelV)
-        talumelV_list.append(self.talumelV)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnalumelVTime(self, msg):
-        self.talumelV = float(msg)
-
-
+    def OnTelemetry(self, msg):
+        """ Appends the voltages of a telemetry frame to the plot lists. """
+        for t, value in msg.get("Chromel Voltage", []):
+            chromelV_buffer.append((t, value))
+        #end for
+        for t, value in msg.get("Alumel Voltage", []):
+            alumelV_buffer.append((t, value))
+        #end for
     #end def
 
     #--------------------------------------------------------------------------
@@ -2258,8 +2413,19 @@ class VoltagePanel(wx.Panel):
 
         self.figure = Figure((6,2), dpi=self.dpi)
         self.subplot = self.figure.add_subplot(111)
-        self.lineH, = self.subplot.plot(tchromelV_list,chromelV_list, color=self.colorH, linewidth=1)
-        self.lineL, = self.subplot.plot(talumelV_list,alumelV_list, color=self.colorL, linewidth=1)
+        #self.subplot.set_title("voltage vs. time", fontsize=12)
+        self.subplot.set_ylabel(r"voltage ($\mu V$)", fontsize = 8)
+        self.subplot.set_xlabel("time (s)", fontsize = 8)
+        self.subplot.tick_params(labelsize=8)
+
+        # The lines are kept for the whole run and updated with set_data.
+        # They are animated, so a full draw leaves them out of the background.
+        self.lineH, = self.subplot.plot([], [], color=self.colorH, linewidth=1, animated=True)
+        self.lineL, = self.subplot.plot([], [], color=self.colorL, linewidth=1, animated=True)
+        self.limits = None
+        self.background = None
+        self.xmax_auto = 0
+        self.ylim_auto = None
 
         self.legend = self.figure.legend( (self.lineH, self.lineL), (r"$V_{chromel}$",r"$V_{alumel}$"), (0.15,0.7),fontsize=8)
         #self.subplot.text(0.05, .95, r'$X(f) = \mathcal{F}\{x(t)\}$', \
@@ -2267,46 +2433,98 @@ class VoltagePanel(wx.Panel):
     #end def
 
     #--------------------------------------------------------------------------
-    def draw_plot(self,i):
-        self.subplot.clear()
-        #self.subplot.set_title("voltage vs. time", fontsize=12)
-        self.subplot.set_ylabel(r"voltage ($\mu V$)", fontsize = 8)
-        self.subplot.set_xlabel("time (s)", fontsize = 8)
+    def on_draw(self, event):
+        """ Called after every full draw of the canvas, including a resize """
+        self.background = self.canvas.copy_from_bbox(self.subplot.bbox)
+        for line in (self.lineH, self.lineL):
+            self.subplot.draw_artist(line)
+        #end for
+    #end def
 
+    #--------------------------------------------------------------------------
+    def get_limits(self):
         # Adjustable scale:
         if self.xmax_control.is_auto():
-            xmax = max(tchromelV_list+talumelV_list)
+            xmax = self.auto_xmax(max(chromelV_buffer.max[0], alumelV_buffer.max[0]))
         else:
             xmax = float(self.xmax_control.manual_value())
         if self.xmin_control.is_auto():
             xmin = 0
         else:
             xmin = float(self.xmin_control.manual_value())
+        ylim = self.auto_ylim(min(chromelV_buffer.min[1], alumelV_buffer.min[1]), max(chromelV_buffer.max[1], alumelV_buffer.max[1]))
         if self.ymin_control.is_auto():
-            minV = min(chromelV_list+alumelV_list)
-            ymin = minV - abs(minV)*0.3
+            ymin = ylim[0]
         else:
             ymin = float(self.ymin_control.manual_value())
         if self.ymax_control.is_auto():
-            maxV = max(chromelV_list+alumelV_list)
-            ymax = maxV + abs(maxV)*0.3
+            ymax = ylim[1]
         else:
             ymax = float(self.ymax_control.manual_value())
 
+        return (xmin, xmax, ymin, ymax)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def auto_xmax(self, t):
+        """ Extends the time axis a quarter at a time instead of on every frame """
+        if t > self.xmax_auto:
+            self.xmax_auto = t + max(0.25*t, 10)
+        #end if
+        return self.xmax_auto
+    #end def
+
+    #--------------------------------------------------------------------------
+    def auto_ylim(self, lo, hi):
+        """
+        Keeps the value axis until the data leaves it, then widens it with a
+        margin of 30% of the data range on both ends
+        """
+        if self.ylim_auto is None or lo < self.ylim_auto[0] or hi > self.ylim_auto[1]:
+            margin = 0.3*max(hi - lo, abs(lo), abs(hi), 1)
+            self.ylim_auto = (lo - margin, hi + margin)
+        #end if
+        return self.ylim_auto
+    #end def
 
+    #--------------------------------------------------------------------------
+    def rescale(self, limits):
+        xmin, xmax, ymin, ymax = limits
         self.subplot.set_xlim([xmin, xmax])
         self.subplot.set_ylim([ymin, ymax])
+        self.limits = limits
+
+        # The axes and tick labels are in the background, so redraw it;
+        # on_draw takes the new copy.
+        self.canvas.draw()
+    #end def
 
-        pylab.setp(self.subplot.get_xticklabels(), fontsize=8)
-        pylab.setp(self.subplot.get_yticklabels(), fontsize=8)
+    #--------------------------------------------------------------------------
+    def draw_plot(self):
+        if not (len(chromelV_buffer) and len(alumelV_buffer)):
+            return
+        #end if
 
-        self.lineH, = self.subplot.plot(tchromelV_list,chromelV_list, color=self.colorH, linewidth=1)
-        self.lineL, = self.subplot.plot(talumelV_list,alumelV_list, color=self.colorL, linewidth=1)
+        limits = self.get_limits()
+        if limits != self.limits:
+            self.rescale(limits)
+        #end if
 
-        return (self.lineH, self.lineL)
-        #return (self.subplot.plot( tchromelV_list, chromelV_list, color=self.colorH, linewidth=1),
-            #self.subplot.plot( talumelV_list, alumelV_list, color=self.colorL, linewidth=1))
+        # Draw at most two points per pixel of the visible time window
+        xmin, xmax = self.limits[0], self.limits[1]
+        pixels = self.subplot.bbox.width
+        self.lineH.set_data(*minmax_decimate(chromelV_buffer.column(0), chromelV_buffer.column(1), xmin, xmax, pixels))
+        self.lineL.set_data(*minmax_decimate(alumelV_buffer.column(0), alumelV_buffer.column(1), xmin, xmax, pixels))
 
+        # Put the lines back on the copy of the background
+        if self.background is None:
+            return
+        #end if
+        self.canvas.restore_region(self.background)
+        for line in (self.lineH, self.lineL):
+            self.subplot.draw_artist(line)
+        #end for
+        self.canvas.blit(self.subplot.bbox)
     #end def
 
     #--------------------------------------------------------------------------
@@ -2339,13 +2557,9 @@ class TemperaturePanel(wx.Panel):
         wx.Panel.__init__(self, *args, **kwargs)
         global filePath
 
-        global tsampletempA_list
-        global sampletempA_list
-        global tsampletempB_list
-        global sampletempB_list
-        global tblocktemp_list
-        global blocktempA_list
-        global blocktempB_list
+        global sampletempA_buffer
+        global sampletempB_buffer
+        global blocktemp_buffer
 
         self.create_title("Temperature Panel")
         self.init_plot()
@@ -2353,18 +2567,17 @@ class TemperaturePanel(wx.Panel):
         self.create_control_panel()
         self.create_sizer()
 
-        pub.subscribe(self.OnTimeSampleTempA, "Time Sample Temp A")
-        pub.subscribe(self.OnSampleTempA, "Sample Temp A")
-        pub.subscribe(self.OnTimeSampleTempB, "Time Sample Temp B")
-        pub.subscribe(self.OnSampleTempB, "Sample Temp B")
-        pub.subscribe(self.OnTimeBlockTemp, "Time Block Temp")
-        pub.subscribe(self.OnBlockTempA, "Block Temp A")
-        pub.subscribe(self.OnBlockTempB, "Block Temp B")
+        pub.subscribe(self.OnTelemetry, "Telemetry")
 
         # For saving the plots at the end of data acquisition:
         pub.subscribe(self.save_plot, "Save_All")
 
-        self.animator = animation.FuncAnimation(self.figure, self.draw_plot, interval=500, blit=False)
+        # Full draws only happen on a rescale or a resize; every one of them
+        # takes a new copy of the background for draw_plot to blit onto.
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.timer = self.canvas.new_timer(interval=500)
+        self.timer.add_callback(self.draw_plot)
+        self.timer.start()
     #end init
 
     #--------------------------------------------------------------------------
@@ -2399,45 +2612,18 @@ class TemperaturePanel(wx.Panel):
     #end def
 
     #--------------------------------------------------------------------------
-    def OnTimeSampleTempA(self, msg):
-        self.tsampletempA = float(msg)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnSampleTempA(self, msg):
-        self.sampletempA = float(msg)
-        sampletempA_list.append(self.sampletempA)
-        tsampletempA_list.append(self.tsampletempA)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnTimeSampleTempB(self, msg):
-        self.tsampletempB = float(msg)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnSampleTempB(self, msg):
-        self.sampletempB = float(msg)
-        sampletempB_list.append(self.sampletempB)
-        tsampletempB_list.append(self.tsampletempB)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnTimeBlockTemp(self, msg):
-        self.tblocktemp = float(msg)
-        tblocktemp_list.append(self.tblocktemp)
-        blocktempA_list.append(self.blocktempA)
-        blocktempB_list.append(self.blocktempB)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnBlockTempA(self, msg):
-        self.blocktempA = float(msg)
-    #end def
-
-    #--------------------------------------------------------------------------
-    def OnBlockTempB(self, msg):
-        self.blocktempB = float(msg)
+    def OnTelemetry(self, msg):
+        """ Appends the temperatures of a telemetry frame to the plot lists. """
+        for t, value in msg.get("Sample Temp A", []):
+            sampletempA_buffer.append((t, value))
+        #end for
+        for t, value in msg.get("Sample Temp B", []):
+            sampletempB_buffer.append((t, value))
+        #end for
+        # Both blocks are read in the same cycle and share a time axis
+        for (t, valueA), (t, valueB) in zip(msg.get("Block Temp A", []), msg.get("Block Temp B", [])):
+            blocktemp_buffer.append((t, valueA, valueB))
+        #end for
     #end def
 
     #--------------------------------------------------------------------------
@@ -2450,11 +2636,21 @@ class TemperaturePanel(wx.Panel):
 
         self.figure = Figure((6,2), dpi=self.dpi)
         self.subplot = self.figure.add_subplot(111)
-
-        self.lineSTA, = self.subplot.plot(tsampletempA_list,sampletempA_list, color=self.colorSTA, linewidth=1)
-        self.lineSTB, = self.subplot.plot(tsampletempB_list,sampletempB_list, color=self.colorSTB, linewidth=1)
-        self.lineBTA, = self.subplot.plot(tblocktemp_list,blocktempA_list, color=self.colorBTA, linewidth=1)
-        self.lineBTB, = self.subplot.plot(tblocktemp_list,blocktempB_list, color=self.colorBTB, linewidth=1)
+        #self.subplot.set_title("temperature vs. time", fontsize=12)
+        self.subplot.set_ylabel(r"temperature ($\degree C$)", fontsize = 8)
+        self.subplot.set_xlabel("time (s)", fontsize = 8)
+        self.subplot.tick_params(labelsize=8)
+
+        # The lines are kept for the whole run and updated with set_data.
+        # They are animated, so a full draw leaves them out of the background.
+        self.lineSTA, = self.subplot.plot([], [], color=self.colorSTA, linewidth=1, animated=True)
+        self.lineSTB, = self.subplot.plot([], [], color=self.colorSTB, linewidth=1, animated=True)
+        self.lineBTA, = self.subplot.plot([], [], color=self.colorBTA, linewidth=1, animated=True)
+        self.lineBTB, = self.subplot.plot([], [], color=self.colorBTB, linewidth=1, animated=True)
+        self.limits = None
+        self.background = None
+        self.xmax_auto = 0
+        self.ylim_auto = None
 
         self.legend = self.figure.legend( (self.lineSTA, self.lineBTA, self.lineSTB, self.lineBTB), (r"$T_A$ (sample)",r"$T_A$ (block)",r"$T_B$ (sample)",r"$T_B$ (block)"), (0.15,0.50),fontsize=8)
         #self.subplot.text(0.05, .95, r'$X(f) = \mathcal{F}\{x(t)\}$', \
@@ -2462,45 +2658,100 @@ class TemperaturePanel(wx.Panel):
     #end def
 
     #--------------------------------------------------------------------------
-    def draw_plot(self,i):
-        self.subplot.clear()
-        #self.subplot.set_title("temperature vs. time", fontsize=12)
-        self.subplot.set_ylabel(r"temperature ($\degree C$)", fontsize = 8)
-        self.subplot.set_xlabel("time (s)", fontsize = 8)
+    def on_draw(self, event):
+        """ Called after every full draw of the canvas, including a resize """
+        self.background = self.canvas.copy_from_bbox(self.subplot.bbox)
+        for line in (self.lineSTA, self.lineSTB, self.lineBTA, self.lineBTB):
+            self.subplot.draw_artist(line)
+        #end for
+    #end def
 
+    #--------------------------------------------------------------------------
+    def get_limits(self):
         # Adjustable scale:
         if self.xmax_control.is_auto():
-            xmax = max(tsampletempA_list+tsampletempB_list+tblocktemp_list)
+            xmax = self.auto_xmax(max(sampletempA_buffer.max[0], sampletempB_buffer.max[0], blocktemp_buffer.max[0]))
         else:
             xmax = float(self.xmax_control.manual_value())
         if self.xmin_control.is_auto():
             xmin = 0
         else:
             xmin = float(self.xmin_control.manual_value())
+        ylim = self.auto_ylim(min(sampletempA_buffer.min[1], sampletempB_buffer.min[1], blocktemp_buffer.min[1:].min()), max(sampletempA_buffer.max[1], sampletempB_buffer.max[1], blocktemp_buffer.max[1:].max()))
         if self.ymin_control.is_auto():
-            minT = min(sampletempA_list+sampletempB_list+blocktempA_list+blocktempB_list)
-            ymin = minT - abs(minT)*0.3
+            ymin = ylim[0]
         else:
             ymin = float(self.ymin_control.manual_value())
         if self.ymax_control.is_auto():
-            maxT = max(sampletempA_list+sampletempB_list+blocktempA_list+blocktempB_list)
-            ymax = maxT + abs(maxT)*0.3
+            ymax = ylim[1]
         else:
             ymax = float(self.ymax_control.manual_value())
 
+        return (xmin, xmax, ymin, ymax)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def auto_xmax(self, t):
+        """ Extends the time axis a quarter at a time instead of on every frame """
+        if t > self.xmax_auto:
+            self.xmax_auto = t + max(0.25*t, 10)
+        #end if
+        return self.xmax_auto
+    #end def
+
+    #--------------------------------------------------------------------------
+    def auto_ylim(self, lo, hi):
+        """
+        Keeps the value axis until the data leaves it, then widens it with a
+        margin of 30% of the data range on both ends
+        """
+        if self.ylim_auto is None or lo < self.ylim_auto[0] or hi > self.ylim_auto[1]:
+            margin = 0.3*max(hi - lo, abs(lo), abs(hi), 1)
+            self.ylim_auto = (lo - margin, hi + margin)
+        #end if
+        return self.ylim_auto
+    #end def
+
+    #--------------------------------------------------------------------------
+    def rescale(self, limits):
+        xmin, xmax, ymin, ymax = limits
         self.subplot.set_xlim([xmin, xmax])
         self.subplot.set_ylim([ymin, ymax])
+        self.limits = limits
 
-        pylab.setp(self.subplot.get_xticklabels(), fontsize=8)
-        pylab.setp(self.subplot.get_yticklabels(), fontsize=8)
+        # The axes and tick labels are in the background, so redraw it;
+        # on_draw takes the new copy.
+        self.canvas.draw()
+    #end def
 
-        self.lineSTA, = self.subplot.plot(tsampletempA_list,sampletempA_list, color=self.colorSTA, linewidth=1)
-        self.lineSTB, = self.subplot.plot(tsampletempB_list,sampletempB_list, color=self.colorSTB, linewidth=1)
-        self.lineBTA, = self.subplot.plot(tblocktemp_list,blocktempA_list, color=self.colorBTA, linewidth=1)
-        self.lineBTB, = self.subplot.plot(tblocktemp_list,blocktempB_list, color=self.colorBTB, linewidth=1)
+    #--------------------------------------------------------------------------
+    def draw_plot(self):
+        if not (len(sampletempA_buffer) and len(sampletempB_buffer) and len(blocktemp_buffer)):
+            return
+        #end if
 
-        return (self.lineSTA, self.lineSTB, self.lineBTA, self.lineBTB)
+        limits = self.get_limits()
+        if limits != self.limits:
+            self.rescale(limits)
+        #end if
 
+        # Draw at most two points per pixel of the visible time window
+        xmin, xmax = self.limits[0], self.limits[1]
+        pixels = self.subplot.bbox.width
+        self.lineSTA.set_data(*minmax_decimate(sampletempA_buffer.column(0), sampletempA_buffer.column(1), xmin, xmax, pixels))
+        self.lineSTB.set_data(*minmax_decimate(sampletempB_buffer.column(0), sampletempB_buffer.column(1), xmin, xmax, pixels))
+        self.lineBTA.set_data(*minmax_decimate(blocktemp_buffer.column(0), blocktemp_buffer.column(1), xmin, xmax, pixels))
+        self.lineBTB.set_data(*minmax_decimate(blocktemp_buffer.column(0), blocktemp_buffer.column(2), xmin, xmax, pixels))
+
+        # Put the lines back on the copy of the background
+        if self.background is None:
+            return
+        #end if
+        self.canvas.restore_region(self.background)
+        for line in (self.lineSTA, self.lineSTB, self.lineBTA, self.lineBTB):
+            self.subplot.draw_artist(line)
+        #end for
+        self.canvas.blit(self.subplot.bbox)
     #end def
 
     #--------------------------------------------------------------------------
@@ -2711,12 +2962,21 @@ class App(wx.App):
     """
     App for initializing program
     """
+    #--------------------------------------------------------------------------
+    def __init__(self, resume=None):
+        self.resume = resume # folder of an interrupted run to carry on with
+        wx.App.__init__(self)
+    #end init
+
     #--------------------------------------------------------------------------
     def OnInit(self):
         self.frame = Frame(parent=None, title="High Temp Seebeck GUI", size=(1280,1280))
         self.frame.Show()
 
         setup = Setup()
+        if self.resume is not None:
+            self.frame.userpanel.resume(self.resume)
+        #end if
         return True
     #end init
 
@@ -2725,7 +2985,12 @@ class App(wx.App):
 
 #==============================================================================
 if __name__=='__main__':
-    app = App()
+    # python SeebeckGUIv7.py --resume <run folder>
+    resume = None
+    if '--resume' in sys.argv[1:-1]:
+        resume = sys.argv[sys.argv.index('--resume') + 1]
+    #end if
+    app = App(resume)
     app.MainLoop()
 
 #end if
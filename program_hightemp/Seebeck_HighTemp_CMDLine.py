@@ -7,16 +7,33 @@ Created: 2016-02-09
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-import minimalmodbus as modbus # For communicating with the cn7500s
-import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
-import visa # pyvisa, essential for communicating with the Keithley
+import instrument_sim
+if instrument_sim.enabled:
+    # SEEBECK_SIMULATE=1 runs against simulated instruments
+    modbus = omegacn7500 = visa = instrument_sim
+else:
+    import minimalmodbus as modbus # For communicating with the cn7500s
+    import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
+    import visa # pyvisa, essential for communicating with the Keithley
+#end if
 import time
 from datetime import datetime # for getting the current date and time
 import exceptions
+from thermocouple import voltage_correction
+from regression import fit_seebeck
+from plot_queue import PlotQueue
+import settling
+from settling import Settling
+# Minimum-interval pacing for the Keithley and the cn7500s
+from instrument_pacing import Pacer, wait_until_ready
 
 #==============================================================================
 version = '1.0 (2016-02-09)'
 
+# Minimum time between instrument transactions (s)
+keithley_min_interval = 0.02 # GPIB
+pid_min_interval = 0.01 # Modbus inter-frame gap on the shared cn7500 bus
+
 # Keeps Windows from complaining that the port is already open:
 modbus.CLOSE_PORT_AFTER_EACH_CALL = True
 
@@ -29,32 +46,81 @@ class Keithley_2700:
     #--------------------------------------------------------------------------
     def __init__(self, instr):
         self.ctrl = ResourceManager.open_resource(instr)
+        self.pacer = Pacer(keithley_min_interval)
 
     #end init
 
     #--------------------------------------------------------------------------
-    def fetch(self, channel):
+    def configure_scan(self, channels, passes=2):
         """
-        Scan the channel and take a reading
+        Program the internal scan list once so that a single trigger reads
+        every channel 'passes' times into the buffer.
         """
-        measure = False
-        while (not measure):
+        self.scan_channels = channels
+        self.scan_count = len(channels)*passes
+        self.ctrl.write(":INITiate:CONTinuous OFF")
+        self.ctrl.write(":TRIGger:SOURce IMMediate")
+        self.ctrl.write(":TRIGger:COUNt 1")
+        self.ctrl.write(":SAMPle:COUNt %d" % (self.scan_count)) # One sample per channel per pass
+        self.ctrl.write(":ROUTe:SCAN:INTernal (@ %s)" % (','.join(channels))) # Specify Channels
+        self.ctrl.write(":ROUTe:SCAN:TSOurce IMMediate")
+        self.ctrl.write(":ROUTe:SCAN:LSELect INTernal") # Use the internal scan list
+        self.ctrl.write(":FORMat:ELEMents READing, TSTamp, CHANnel")
+        self.ctrl.write(":TRACe:TSTamp:FORMat ABSolute") # Timestamps relative to first reading
+        self.ctrl.write(":TRACe:POINts %d" % (self.scan_count))
+        self.ctrl.write(":TRACe:FEED SENSe1")
+    #end def
+
+    #--------------------------------------------------------------------------
+    def scan(self):
+        """
+        Trigger the scan list once and read the whole buffer.
+        Returns a dictionary of channel: [(timestamp, reading), ...] with the
+        timestamps in seconds from the first reading of the scan.
+        """
+        while True:
             try:
-                self.ctrl.write(":ROUTe:SCAN:INTernal (@ %s)" % (channel)) # Specify Channel
-                #keithley.write(":SENSe1:FUNCtion 'TEMPerature'") # Specify Data type
-                self.ctrl.write(":ROUTe:SCAN:LSELect INTernal") # Scan Selected Channel
-                time.sleep(.1)
-                self.ctrl.write(":ROUTe:SCAN:LSELect NONE") # Stop Scan
-                time.sleep(.1)
-                data = self.ctrl.query(":FETCh?")
-                time.sleep(.1)
-                data = float(str(data)[0:15])
-                measure = True
+                with self.pacer:
+                    self.ctrl.write(":TRACe:CLEar")
+                    self.ctrl.write(":TRACe:FEED:CONTrol NEXT")
+                    self.ctrl.write(":INITiate") # Trigger the scan
+                    wait_until_ready(self.ctrl, self.pacer.min_interval) # Poll until the scan has completed
+                    data = self.ctrl.query(":TRACe:DATA?")
+                readings = self.parse_scan(data)
+                break
             except exceptions.ValueError as VE:
                 print(VE)
-                measure = False
         #end while
-        return data # Fetches Reading
+        return readings
+    #end def
+
+    #--------------------------------------------------------------------------
+    def parse_scan(self, data):
+        """
+        Split the buffer into (reading, timestamp, channel) triplets. Each
+        element has its units appended (e.g. '+1.2E-06VDC,+0.412SECS,107INTCHAN')
+        """
+        elements = str(data).strip().split(',')
+        if len(elements) != 3*self.scan_count:
+            raise ValueError('incomplete scan: %d elements' % (len(elements)))
+        #end if
+        readings = {}
+        for channel in self.scan_channels:
+            readings[channel] = []
+        #end for
+        for n in range(0, len(elements), 3):
+            value = float(self.strip_units(elements[n]))
+            stamp = float(self.strip_units(elements[n+1]))
+            channel = str(int(self.strip_units(elements[n+2])))
+            readings[channel].append((stamp, value))
+        #end for
+        return readings
+    #end def
+
+    #--------------------------------------------------------------------------
+    def strip_units(self, element):
+        """ Remove the unit suffix (VDC, C, SECS, INTCHAN) from a buffer element """
+        return element.strip().rstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ#')
     #end def
 
     #--------------------------------------------------------------------------
@@ -89,6 +155,16 @@ class PID(omegacn7500.OmegaCN7500):
     heatingCoolingControl = 4102 # Register for Heating/Cooling control selection
     heating = 0 # Value for Heating setting
 
+    # All four controllers share one serial bus, so they share one pacer
+    bus = Pacer(pid_min_interval)
+
+    #--------------------------------------------------------------------------
+    def _performCommand(self, functioncode, payloadToSlave):
+        """ Every minimalmodbus transaction passes through here; pace it. """
+        with PID.bus:
+            return omegacn7500.OmegaCN7500._performCommand(self, functioncode, payloadToSlave)
+    #end def
+
 #end class
 ###############################################################################
 
@@ -102,8 +178,10 @@ class Main:
         
         self.abort_ID = 0
         self.start = time.time()
-        self.delay = 2
+        self.settleA = Settling()
+        self.settleB = Settling()
         self.plotnumber = 0
+        self.plots = PlotQueue()
     
         for self.avgtemp in self.measureList:
             self.dT = 0
@@ -140,7 +218,7 @@ class Main:
             while True:
                 self.data_measurement()
                 self.write_data_to_file('status')
-                time.sleep(5)
+                self.wait_to_settle()
                 if self.abort_ID==1: break
                 if (self.tol == 'OK' and self.stable == 'OK'):
                     for self.dT in self.dTList:
@@ -171,7 +249,7 @@ class Main:
                         while True:
                             self.data_measurement()
                             self.write_data_to_file('status')
-                            time.sleep(5)
+                            self.wait_to_settle()
                             if self.abort_ID==1: break
                             if (self.tol == 'OK' and self.stable == 'OK'):
                                 for n in range(self.measurement_number):
@@ -238,6 +316,9 @@ class Main:
         self.k2700.ctrl.write(":TRIGger:SEQuence1:COUNt 1")    # Set the count rate
         # Sets the the acquisition rate of the measurements
         self.k2700.ctrl.write(":SENSe1:VOLTage:DC:NPLCycles 4, (@ 107,108)") # Sets integration period based on frequency
+        # Scan chromel, alumel, alumel, chromel per trigger: the paired readings
+        # share one time centre, so a linear drift cancels in their averages
+        self.k2700.configure_scan(['107','108','108','107'], passes=1)
 
         """
         Prepare the PID for operation:
@@ -353,59 +434,54 @@ class Main:
         self.time_sampletempA = time.time() - self.start
         print "time: %.2f s\t sample temp A: %.2f C" % (self.time_sampletempA, self.sampletempA)
 
-        time.sleep(self.delay)
-
         self.sampletempB = float(self.sampleBpid.get_pv())
         self.blocktempB = float(self.blockBpid.get_pv())
         self.time_sampletempB = time.time() - self.start
         print "time: %.2f s\ttempB: %.2f C" % (self.time_sampletempB, self.sampletempB)
 
-        time.sleep(self.delay)
+        # One trigger scans chromel, alumel, alumel, chromel into the buffer
+        self.time_scan = time.time() - self.start
+        readings = self.k2700.scan()
+        (stamp_Vchromel, Vchromel), (stamp_Vchromel2, Vchromel2) = readings['107']
+        (stamp_Valumel, Valumel), (stamp_Valumel2, Valumel2) = readings['108']
 
-        self.Vchromelraw = float(self.k2700.fetch('107'))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
-        self.time_Vchromel = time.time() - self.start
+        self.Vchromelraw = float(Vchromel)*10**6
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
+        self.time_Vchromel = self.time_scan + stamp_Vchromel
         print "time: %.2f s\t voltage (Chromel) %f uV" % (self.time_Vchromel, self.Vchromelcalc)
 
-        time.sleep(self.delay)
-
-        self.Valumelraw = float(self.k2700.fetch('108'))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
-        self.time_Valumel = time.time() - self.start
+        self.Valumelraw = float(Valumel)*10**6
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
+        self.time_Valumel = self.time_scan + stamp_Valumel
         print "time: %.2f s\t voltage (Alumel) %f uV" % (self.time_Valumel, self.Valumelcalc)
 
-        time.sleep(self.delay)
-
         print('Symmetrize the measurement and repeat')
 
-        self.Valumelraw2 = float(self.k2700.fetch('108'))*10**6
-        self.Valumelcalc2 = self.voltage_Correction(self.Valumelraw2,self.sampletempA,self.sampletempB, 'alumel')
-        self.time_Valumel2 = time.time() - self.start
+        self.Valumelraw2 = float(Valumel2)*10**6
+        self.Valumelcalc2 = voltage_correction(self.Valumelraw2,self.sampletempA,self.sampletempB, 'alumel')
+        self.time_Valumel2 = self.time_scan + stamp_Valumel2
         print "time: %.2f s\t voltage (Alumel) %f uV" % (self.time_Valumel2, self.Valumelcalc2)
 
-        time.sleep(self.delay)
-
-        self.Vchromelraw2 = float(self.k2700.fetch('107'))*10**6
-        self.Vchromelcalc2 = self.voltage_Correction(self.Vchromelraw2,self.sampletempA,self.sampletempB, 'chromel')
-        self.time_Vchromel2 = time.time() - self.start
+        self.Vchromelraw2 = float(Vchromel2)*10**6
+        self.Vchromelcalc2 = voltage_correction(self.Vchromelraw2,self.sampletempA,self.sampletempB, 'chromel')
+        self.time_Vchromel2 = self.time_scan + stamp_Vchromel2
         print "time: %.2f s\t voltage (Chromel) %f uV" % (self.time_Vchromel2, self.Vchromelcalc2)
 
-        time.sleep(self.delay)
-
         self.sampletempB2 = float(self.sampleBpid.get_pv())
         self.blocktempB = float(self.blockApid.get_pv())
         self.time_sampletempB2 = time.time() - self.start
         print "time: %.2f s\ttempB: %.2f C" % (self.time_sampletempB2, self.sampletempB2)
 
-        time.sleep(self.delay)
-
         self.sampletempA2 = float(self.sampleApid.get_pv())
         self.blocktempA = float(self.blockApid.get_pv())
         self.time_sampletempA2 = time.time() - self.start
         print "time: %.2f s\t sample temp A: %.2f C" % (self.time_sampletempA2, self.sampletempA2)
         
-        self.time = ( self.time_sampletempA + self.time_sampletempB + self.time_Vchromel + self.time_Valumel + self.time_Valumel2 + self.time_Vchromel2 self.time_sampletempB2 + self.time_sampletempA2)/8
+        self.time = ( self.time_sampletempA + self.time_sampletempB + self.time_Vchromel + self.time_Valumel + self.time_Valumel2 + self.time_Vchromel2 + self.time_sampletempB2 + self.time_sampletempA2)/8
         
+        self.settleA.add(self.time_sampletempA2, self.sampletempA2, self.avgtemp+self.dT/2.0)
+        self.settleB.add(self.time_sampletempB2, self.sampletempB2, self.avgtemp-self.dT/2.0)
+
         #check stability of PID
         if (len(self.recenttempA)<3):
             self.recenttempA.append(self.sampletempA)
@@ -449,70 +525,17 @@ class Main:
     #end def
 
     #--------------------------------------------------------------------------
-    def voltage_Correction(self, raw_voltage, tempA, tempB, side):
-        ''' raw_data must be in uV '''
-        # Kelvin conversion for polynomial correction.
-        dT = tempA - tempB
-        avgT = (tempA + tempB)/2 + 273.15
-
-        # Correction for effect from Thermocouple Seebeck
-        out = self.alpha(avgT, side)*dT - raw_voltage
-
-        return out
-    #end def
-
-    #--------------------------------------------------------------------------
-    def alpha(self, x, side):
-        ''' x = avgT
-            alpha in uV/K
-        '''
-        ### If Chromel, taken from Chromel_Seebeck.txt
-        if side == 'chromel':
-            if ( x >= 270 and x < 700):
-                alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                        -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                        -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                        -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                        -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                        -4.30421084091e-24*x**10
-            #end if
-            elif ( x >= 700 and x < 1599):
-                alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                        0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                        9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                        5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                        4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-            #end if
-            else:
-                print "Error in voltage correction, out of range."
-        #end if (Chromel)
-
-        ### If Alumel, taken from Alumel_Seebeck.txt
-        elif side == 'alumel':
-            if ( x >= 270 and x < 570):
-                alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                        -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                        -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                        -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                        -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-            #end if
-            elif ( x >= 570 and x < 1599):
-                alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                        0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                        1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                        4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                        1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-            #end if
-            else:
-                print "Error in voltage correction, out of range."
-        #end if (Alumel)
-
-        else:
-            print "Error in voltage correction."
-        #end else
-
-        return alpha
-
+    def wait_to_settle(self):
+        """
+        Waits 5 s before the next reading, or longer while the sample
+        temperatures are predicted to be far from settling.
+        """
+        eta = settling.combine(self.settleA.eta(self.tolerance, self.stability_threshold),
+                               self.settleB.eta(self.tolerance, self.stability_threshold))
+        if eta is not None:
+            print 'settling time: %.0f s' % (eta)
+        #end if
+        time.sleep(max(5, settling.pause(eta)))
     #end def
 
     #--------------------------------------------------------------------------
@@ -615,42 +638,15 @@ class Main:
         dTchromellist = self.dTcalclist
         dTalumellist = self.dTcalclist
 
-        results_chromel = {}
-        results_alumel = {}
-
-        coeffs_chromel = np.polyfit(dTchromellist, self.Vchromelcalclist, 1)
-        coeffs_alumel = np.polyfit(dTalumellist,self.Valumelcalclist,1)
-        # Polynomial Coefficients
-        polynomial_chromel = coeffs_chromel.tolist()
-        polynomial_alumel = coeffs_alumel.tolist()
-
-        seebeck_chromel = polynomial_chromel[0]
-        offset_chromel = polynomial_chromel[1]
-        seebeck_alumel = polynomial_alumel[0]
-        offset_alumel = polynomial_alumel[1]
-        print 'seebeck (chromel): %.3f uV/K'%(seebeck_chromel)
-        print 'seebeck (alumel): %.3f uV/K'%(seebeck_alumel)
+        chromel, alumel = fit_seebeck(dTchromellist, self.Vchromelcalclist, self.Valumelcalclist)
+        seebeck_chromel, offset_chromel, rsquared_chromel, stderr_chromel = chromel
+        seebeck_alumel, offset_alumel, rsquared_alumel, stderr_alumel = alumel
+        polynomial_chromel = [seebeck_chromel, offset_chromel]
+        polynomial_alumel = [seebeck_alumel, offset_alumel]
+        print 'seebeck (chromel): %.3f +/- %.3f uV/K'%(seebeck_chromel, stderr_chromel)
+        print 'seebeck (alumel): %.3f +/- %.3f uV/K'%(seebeck_alumel, stderr_alumel)
         print '\n***\n'
 
-        # Calculate coefficient of determination (r-squared):
-        p_chromel = np.poly1d(coeffs_chromel)
-        p_alumel = np.poly1d(coeffs_alumel)
-        # fitted values:
-        yhat_chromel = p_chromel(dTchromellist)
-        yhat_alumel = p_alumel(dTalumellist)
-        # mean of values:
-        ybar_chromel = np.sum(self.Vchromelcalclist)/len(self.Vchromelcalclist)
-        ybar_alumel = np.sum(self.Valumelcalclist)/len(self.Valumelcalclist)
-        # regression sum of squares:
-        ssreg_chromel = np.sum((yhat_chromel-ybar_chromel)**2)   # or sum([ (yihat - ybar)**2 for yihat in yhat])
-        ssreg_alumel = np.sum((yhat_alumel-ybar_alumel)**2)
-        # total sum of squares:
-        sstot_chromel = np.sum((self.Vchromelcalclist - ybar_chromel)**2)
-        sstot_alumel = np.sum((self.Valumelcalclist - ybar_alumel)**2)    # or sum([ (yi - ybar)**2 for yi in y])
-
-        rsquared_chromel = ssreg_chromel / sstot_chromel
-        rsquared_alumel = ssreg_alumel / sstot_alumel
-
         self.seebeckfile.write('%.3f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f\n'%(time,avgT,seebeck_chromel,offset_chromel,rsquared_chromel,seebeck_alumel,offset_alumel,rsquared_alumel))
 
         fitchromel = {}
@@ -665,44 +661,14 @@ class Main:
 
     #--------------------------------------------------------------------------
     def create_plot(self, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel, title):
-        print 'create seebeck plot'
-        dpi = 400
-
-        plt.ioff()
-
-        # Create Plot:
-        fig = plt.figure(self.plotnumber, dpi=dpi)
-        ax = fig.add_subplot(111)
-        ax.grid()
-        ax.set_title(title)
-        ax.set_xlabel("dT (K)")
-        ax.set_ylabel("dV (uV)")
-
-        # Plot data points:
-        ax.scatter(xalumel, yalumel, color='r', marker='.', label="alumel Voltage")
-        ax.scatter(xchromel, ychromel, color='b', marker='.', label="chromel Voltage")
-
-        # Overlay linear fits:
-        coeffsalumel = fitalumel['polynomial']
-        coeffschromel = fitchromel['polynomial']
-        p_alumel = np.poly1d(coeffsalumel)
-        p_chromel = np.poly1d(coeffschromel)
-        xp = np.linspace(min(xalumel+xchromel), max(xalumel+xchromel), 5000)
-        alumel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffsalumel[0], coeffsalumel[1])
-        chromel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffschromel[0], coeffschromel[1])
-        ax.plot(xp, p_alumel(xp), '-', c='#FF9900', label="alumel Voltage Fit\n %s" % alumel_eq)
-        ax.plot(xp, p_chromel(xp), '-', c='g', label="chromel Voltage Fit\n %s" % chromel_eq)
-
-        ax.legend(loc='upper left', fontsize='10')
-
-        # Save:
+        print 'queue seebeck plot'
         plot_folder = self.filePath + '/Seebeck Plots/'
         if not os.path.exists(plot_folder):
             os.makedirs(plot_folder)
+        #end if
 
-        fig.savefig('%s.png' % (plot_folder + title) , dpi=dpi)
-
-        #plt.close()
+        # rendered in the background by the plot queue
+        self.plots.submit('%s.png' % (plot_folder + title), title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel)
     #end def
 
     #--------------------------------------------------------------------------
@@ -739,6 +705,7 @@ class Main:
 
     #--------------------------------------------------------------------------
     def save_files(self):
+        self.plots.close()
         print('Save Files')
         self.datafile.close()
         self.statusfile.close()
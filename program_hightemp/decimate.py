@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : decimate
+Description: Min/max decimation of a time series for the live plots.
+Comments: Only the points inside the visible time window are used. If there
+          are more than two per pixel, the window is split into one bucket per
+          pixel and only the lowest and highest point of every bucket is kept,
+          in time order, so that spikes and steps still show. Otherwise the
+          points are returned as they are (views, no copy).
+"""
+import numpy as np
+
+#------------------------------------------------------------------------------
+def visible(t, xmin, xmax):
+    """
+    Slice of the (increasing) times t that covers [xmin, xmax], with one point
+    either side so that the line runs to the edge of the plot.
+    """
+    start = max(np.searchsorted(t, xmin, side='left') - 1, 0)
+    stop = min(np.searchsorted(t, xmax, side='right') + 1, len(t))
+    return slice(start, stop)
+#end def
+
+#------------------------------------------------------------------------------
+def minmax_decimate(t, y, xmin, xmax, pixels):
+    """
+    Returns the points of (t, y) to draw for a plot 'pixels' wide showing
+    xmin to xmax; at most about 2*pixels points.
+    """
+    window = visible(t, xmin, xmax)
+    t = t[window]
+    y = y[window]
+    buckets = int(pixels)
+    if buckets < 1 or len(t) <= 2*buckets:
+        return t, y
+    #end if
+
+    # Equal number of points per bucket; the sample rate is close to constant.
+    # The size is rounded up, so the points left over fill less than one
+    # bucket instead of piling up in the last one.
+    size = -(-len(t) // buckets)
+    full = len(t) // size
+    end = size*full
+    blocks = y[:end].reshape(full, size)
+    offsets = np.arange(full)*size
+    imin = offsets + np.argmin(blocks, axis=1)
+    imax = offsets + np.argmax(blocks, axis=1)
+    index = np.sort(np.column_stack((imin, imax)), axis=1).ravel()
+
+    # Points left over after the last full bucket (fewer than size)
+    if end < len(t):
+        rest = np.arange(end, len(t))
+        index = np.concatenate((index, [rest[np.argmin(y[end:])], rest[np.argmax(y[end:])]]))
+        index[-2:].sort()
+    #end if
+
+    return t[index], y[index]
+#end def
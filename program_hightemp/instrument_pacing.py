@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : instrument_pacing
+Description: Minimum-interval pacing for the instrument drivers, used in place
+             of fixed time.sleep calls between transactions.
+Comments: One Pacer is shared by every instrument on the same bus, so the
+          four CN7500s on /dev/cu.usbserial share a single Pacer.
+"""
+import time
+from threading import RLock
+
+###############################################################################
+class Pacer:
+    ''' Keeps a minimum interval between transactions on one bus. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, min_interval):
+        self.min_interval = min_interval # seconds between end of one transaction and start of the next
+        self.last = 0
+        self.lock = RLock()
+    #end init
+
+    #--------------------------------------------------------------------------
+    def wait(self):
+        """ Sleep only for whatever remains of the minimum interval. """
+        remaining = self.last + self.min_interval - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+        #end if
+    #end def
+
+    #--------------------------------------------------------------------------
+    def mark(self):
+        """ Record the end of a transaction. """
+        self.last = time.time()
+    #end def
+
+    #--------------------------------------------------------------------------
+    def __enter__(self):
+        self.lock.acquire()
+        self.wait()
+        return self
+    #end def
+
+    #--------------------------------------------------------------------------
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.mark()
+        self.lock.release()
+        return False
+    #end def
+
+#end class
+###############################################################################
+
+#------------------------------------------------------------------------------
+def wait_until_ready(ctrl, poll_interval, timeout=10):
+    """
+    Poll a SCPI instrument until its pending operations have completed.
+    *OPC sets bit 0 of the standard event status register, which is read
+    back with *ESR?. Raises IOError if the timeout (s) passes first, so an
+    unfinished scan is never read.
+    """
+    ctrl.write("*OPC")
+    end = time.time() + timeout
+    while time.time() < end:
+        if int(float(ctrl.query("*ESR?"))) & 1:
+            return True
+        #end if
+        time.sleep(poll_interval)
+    #end while
+    raise IOError("instrument not ready after %g s" % (timeout))
+#end def
@@ -0,0 +1,717 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : instrument_sim
+Description: Simulated Keithley 2700/2000 and cn7500s, so the measurement
+             programs can be run, debugged and timed without the hardware.
+Comments: Set SEEBECK_SIMULATE=1 and the programs use this module in place
+          of visa, minimalmodbus and omegacn7500:
+
+              SEEBECK_SIMULATE=1 python SeebeckGUIv7.py
+
+          The Keithleys answer the SCPI commands the programs send (long or
+          short forms, any case). A reading takes its integration time
+          (NPLCycles/line frequency) plus the relay switching time, *OPC and
+          *ESR? report when a scan or reading has completed, :FETCh? and
+          :TRACe:DATA? are formatted like the real instruments (units after
+          each element, a partial buffer while the scan is still running),
+          and a channel read with the wrong function overflows. Every
+          transaction costs the GPIB or Modbus latency.
+
+          The cn7500s keep their registers and run/stop coil at the real
+          addresses, so omegacn7500's calls (get_pv, set_setpoint, run,
+          read_registers, set_pattern_step_setpoint, ...) work unchanged,
+          and execute their ramp/soak program when the control method is
+          set to PID program control.
+
+          Controllers 1 and 2 heat sides A and B of a simulated stage, with
+          the heater -> block -> sample model of programs/thermal_model.py;
+          controllers 3 and 4 read the blocks. The Keithley thermocouple
+          channels read the samples and the voltage channels the Seebeck
+          voltages of the chromel and alumel wires over the sample.
+
+          Other settings (environment variables):
+              SEEBECK_SIMULATE_SPEED   stage time runs this many times faster
+                                       than the clock (default 1)
+              SEEBECK_SIMULATE_ERRORS  probability that a transaction fails
+                                       with an IOError (default 0)
+              SEEBECK_SIMULATE_MODEL   model.json fitted by thermal_model.py
+              SEEBECK_SIMULATE_PROFILE controller program to load into
+                                       controllers 1 and 2, e.g. 200C_profile.csv
+"""
+import os
+import re
+import json
+import time
+import random
+import numpy as np
+from threading import RLock
+
+#==============================================================================
+enabled = os.environ.get('SEEBECK_SIMULATE', '') not in ('', '0')
+speed = float(os.environ.get('SEEBECK_SIMULATE_SPEED', 1))
+error_rate = float(os.environ.get('SEEBECK_SIMULATE_ERRORS', 0))
+model_file = os.environ.get('SEEBECK_SIMULATE_MODEL', '')
+profile_file = os.environ.get('SEEBECK_SIMULATE_PROFILE', '')
+
+# minimalmodbus setting, the programs set it to True
+CLOSE_PORT_AFTER_EACH_CALL = False
+
+# Latencies (s)
+gpib_latency = 0.002 # per write or query
+modbus_latency = 0.025 # request and answer of a short RTU frame at 9600 baud
+port_open_latency = 0.01 # opening the serial port, with CLOSE_PORT_AFTER_EACH_CALL
+error_delay = 0.5 # before a failed transaction raises
+switch_time = 0.003 # relay settling of the scanner card
+line_frequency = 60.0 # Hz, one power line cycle of integration is 1/60 s
+
+# Stage
+ambient = 25.0 # C
+gradient = 1.0 # C, side A above side B with no heater running (room temperature stage)
+model_step = 1.0 # s of stage time per integration step
+# heater -> block -> sample coefficients (1/s) of each side, see thermal_model.py
+default_params = {'kp': 0.01, 'kl': 0.002, 'kbs': 0.01, 'kb': 0.002, 'ksb': 0.01, 'ks': 0.001}
+max_heating = 0.2 # C/s, most the heater can heat (or cool) the block
+
+# Readings
+sample_seebeck = 150.0 # uV/K
+wire_seebeck = {'chromel': 21.5, 'alumel': -18.0} # uV/K
+wire_offset = {'chromel': 0.4e-6, 'alumel': -0.3e-6} # V
+voltage_noise = 50e-9 # V at 1 PLC
+temperature_noise = 0.02 # C at 1 PLC
+thermocouple_sensitivity = 41e-6 # V/C of a type K, for a thermocouple read as a voltage
+overflow = 9.9e37
+
+# Channels of the scanner cards: (quantity, side or wire)
+wiring = {'2700': {'107': ('voltage', 'chromel'), '108': ('voltage', 'alumel'),
+                   '109': ('temperature', 'A'), '110': ('temperature', 'B'),
+                   '117': ('temperature', 'A'), '118': ('temperature', 'B')},
+          '2000': {'2': ('temperature', 'A'), '7': ('temperature', 'B'),
+                   '4': ('voltage', 'chromel'), '5': ('voltage', 'alumel')}}
+models = {'GPIB0::1::INSTR': '2700', 'GPIB0::16::INSTR': '2000'}
+
+# cn7500 registers and coils
+REGISTER_PV = 4096 # 0x1000
+REGISTER_SETPOINT = 4097 # 0x1001
+REGISTER_CONTROL = 4101 # 0x1005, control method
+REGISTER_HEATING_COOLING = 4102 # 0x1006
+REGISTER_START_PATTERN = 4144 # 0x1030
+REGISTER_ACTUAL_STEP = 4176 # 0x1050 + pattern
+REGISTER_CYCLES = 4192 # 0x1060 + pattern
+REGISTER_LINK = 4208 # 0x1070 + pattern
+REGISTER_STEP_SETPOINT = 8192 # 0x2000 + 8*pattern + step
+REGISTER_STEP_TIME = 8320 # 0x2080 + 8*pattern + step, minutes
+COIL_RUN = 2068 # 0x0814
+PROGRAM_CONTROL = 3 # control method that runs the ramp/soak program
+HEATING, COOLING = 0, 1 # heating/cooling control values, 2 is both
+END_OF_PROGRAM = 8 # link value
+
+#------------------------------------------------------------------------------
+def celsius(register):
+    """ Temperature in a register: signed, 0.1 C per count. """
+    if register > 32767:
+        register -= 65536
+    #end if
+    return register/10.0
+#end def
+
+#------------------------------------------------------------------------------
+def transaction(latency):
+    """ Waits for the latency of one transaction, failing some of them. """
+    if error_rate and random.random() < error_rate:
+        time.sleep(error_delay)
+        raise IOError('simulated communication failure')
+    #end if
+    time.sleep(latency)
+#end def
+
+###############################################################################
+class Controller:
+    ''' Registers and program of one cn7500. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, address):
+        self.address = address
+        self.registers = {REGISTER_SETPOINT: int(ambient*10), REGISTER_CONTROL: 0,
+                          REGISTER_HEATING_COOLING: HEATING, REGISTER_START_PATTERN: 0}
+        self.running = False
+        self.started = 0
+        self.start_setpoint = ambient
+    #end init
+
+    #--------------------------------------------------------------------------
+    def run(self, now):
+        if not self.running:
+            self.running = True
+            self.started = now
+            self.start_setpoint = celsius(self.registers[REGISTER_SETPOINT])
+        #end if
+    #end def
+
+    #--------------------------------------------------------------------------
+    def program(self):
+        """ The (setpoint, seconds) steps of the ramp/soak program in order. """
+        steps = []
+        pattern = self.registers[REGISTER_START_PATTERN]
+        visited = set()
+        while pattern < END_OF_PROGRAM and pattern not in visited:
+            visited.add(pattern)
+            for step in range(self.registers.get(REGISTER_ACTUAL_STEP + pattern, 7) + 1):
+                address = 8*pattern + step
+                if REGISTER_STEP_SETPOINT + address in self.registers:
+                    steps.append((celsius(self.registers[REGISTER_STEP_SETPOINT + address]),
+                                  60.0*self.registers.get(REGISTER_STEP_TIME + address, 0)))
+                #end if
+            #end for
+            pattern = self.registers.get(REGISTER_LINK + pattern, END_OF_PROGRAM)
+        #end while
+        return steps
+    #end def
+
+    #--------------------------------------------------------------------------
+    def setpoint(self, now):
+        """
+        The setpoint at stage time now; a running program ramps linearly to
+        the setpoint of each step over the step time.
+        """
+        if not (self.running and self.registers[REGISTER_CONTROL] == PROGRAM_CONTROL):
+            return celsius(self.registers[REGISTER_SETPOINT])
+        #end if
+        elapsed = now - self.started
+        previous = self.start_setpoint
+        for setpoint, duration in self.program():
+            if elapsed < duration:
+                return previous + (setpoint - previous)*elapsed/duration
+            #end if
+            elapsed -= duration
+            previous = setpoint
+        #end for
+        return previous
+    #end def
+
+    #--------------------------------------------------------------------------
+    def load_profile(self, path, column):
+        """ Programs the steps of a profile (minutes, setpoint A, setpoint B) like PIDprogram_import. """
+        program = np.loadtxt(path, delimiter=',', ndmin=2)
+        for i, row in enumerate(program):
+            self.registers[REGISTER_STEP_SETPOINT + i] = int(round(row[column]*10)) % 65536
+            self.registers[REGISTER_STEP_TIME + i] = int(round(row[0]))
+        #end for
+        patterns = (len(program) - 1)//8 + 1
+        for pattern in range(patterns):
+            self.registers[REGISTER_ACTUAL_STEP + pattern] = 7
+            self.registers[REGISTER_LINK + pattern] = pattern + 1
+        #end for
+        self.registers[REGISTER_ACTUAL_STEP + patterns - 1] = (len(program) - 1) % 8
+        self.registers[REGISTER_LINK + patterns - 1] = END_OF_PROGRAM
+        self.registers[REGISTER_CONTROL] = PROGRAM_CONTROL
+    #end def
+
+#end class
+###############################################################################
+
+###############################################################################
+class Stage:
+    ''' Blocks and samples of both sides, heated by controllers 1 and 2. '''
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        self.lock = RLock()
+        self.params = {'A': dict(default_params), 'B': dict(default_params)}
+        self.ambient = {'A': ambient + gradient/2, 'B': ambient - gradient/2}
+        if model_file:
+            with open(model_file, 'r') as f:
+                saved = json.load(f)
+            #end with
+            for side in self.params:
+                self.params[side].update(saved['params'][side])
+                self.ambient[side] = saved['ambient'] + (gradient/2 if side == 'A' else -gradient/2)
+            #end for
+        #end if
+        self.block = dict(self.ambient)
+        self.sample = dict(self.ambient)
+        self.controllers = {}
+        self.heaters = {'A': 1, 'B': 2} # controller heating each side
+        self.clock = time.time()
+        self.now = 0.0 # stage time (s)
+    #end init
+
+    #--------------------------------------------------------------------------
+    def controller(self, address):
+        with self.lock:
+            if address not in self.controllers:
+                self.controllers[address] = Controller(address)
+                if profile_file and address in (1, 2):
+                    self.controllers[address].load_profile(profile_file, address)
+                #end if
+            #end if
+            return self.controllers[address]
+        #end with
+    #end def
+
+    #--------------------------------------------------------------------------
+    def advance(self):
+        """ Integrates the stage up to the current time. """
+        with self.lock:
+            clock = time.time()
+            end = self.now + (clock - self.clock)*speed
+            self.clock = clock
+            while self.now < end:
+                dt = min(model_step, end - self.now)
+                for side in ('A', 'B'):
+                    self.step(side, dt)
+                #end for
+                self.now += dt
+            #end while
+        #end with
+    #end def
+
+    #--------------------------------------------------------------------------
+    def step(self, side, dt):
+        k = self.params[side]
+        Tamb = self.ambient[side]
+        b = self.block[side]
+        s = self.sample[side]
+        heater = 0.0
+        pid = self.controllers.get(self.heaters[side])
+        if pid is not None and pid.running:
+            sp = pid.setpoint(self.now)
+            mode = pid.registers[REGISTER_HEATING_COOLING]
+            heater = k['kp']*(sp - s) + k['kl']*(sp - Tamb)
+            heater = min(heater, 0.0 if mode == COOLING else max_heating)
+            heater = max(heater, 0.0 if mode == HEATING else -max_heating)
+        #end if
+        self.block[side] = b + dt*(heater - k['kbs']*(b - s) - k['kb']*(b - Tamb))
+        self.sample[side] = s + dt*(k['ksb']*(b - s) - k['ks']*(s - Tamb))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def pv(self, address):
+        """ Process value of a controller: 1, 2 the samples, 3, 4 the blocks. """
+        self.advance()
+        side = 'A' if address in (1, 3) else 'B'
+        return self.sample[side] if address in (1, 2) else self.block[side]
+    #end def
+
+    #--------------------------------------------------------------------------
+    def voltage(self, wire):
+        """ Seebeck voltage (V) of a wire over the sample. """
+        self.advance()
+        dT = self.sample['A'] - self.sample['B']
+        return (wire_seebeck[wire] - sample_seebeck)*dT*1e-6 + wire_offset[wire]
+    #end def
+
+#end class
+###############################################################################
+
+stage = Stage()
+
+###############################################################################
+class OmegaCN7500:
+    ''' Stands in for omegacn7500.OmegaCN7500 on the simulated Modbus line. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, portname, slaveaddress):
+        self.portname = portname
+        self.address = slaveaddress
+        self.controller = stage.controller(slaveaddress)
+    #end init
+
+    #--------------------------------------------------------------------------
+    def _performCommand(self, functioncode, payloadToSlave):
+        """
+        One Modbus transaction; payloadToSlave is (address, values) here
+        rather than the encoded frame.
+        """
+        latency = modbus_latency + (port_open_latency if CLOSE_PORT_AFTER_EACH_CALL else 0)
+        transaction(latency)
+        address, values = payloadToSlave
+        controller = self.controller
+        with stage.lock:
+            if functioncode in (1, 2):
+                return [int(controller.running)]
+            elif functioncode == 5:
+                if values[0]:
+                    stage.advance()
+                    controller.run(stage.now)
+                else:
+                    controller.running = False
+                #end if
+                return None
+            elif functioncode in (6, 16):
+                for i, value in enumerate(values):
+                    controller.registers[address + i] = value
+                #end for
+                return None
+            #end if
+            registers = []
+            for i in range(values):
+                if address + i == REGISTER_PV:
+                    value = int(round(stage.pv(self.address)*10))
+                elif address + i == REGISTER_SETPOINT and controller.registers[REGISTER_CONTROL] == PROGRAM_CONTROL:
+                    value = int(round(controller.setpoint(stage.now)*10))
+                else:
+                    value = controller.registers.get(address + i, 0)
+                #end if
+                registers.append(value % 65536)
+            #end for
+            return registers
+        #end with
+    #end def
+
+    #--------------------------------------------------------------------------
+    def read_registers(self, registeraddress, numberOfRegisters, functioncode=3):
+        return self._performCommand(functioncode, (registeraddress, numberOfRegisters))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def read_register(self, registeraddress, numberOfDecimals=0, functioncode=3, signed=False):
+        value = self.read_registers(registeraddress, 1, functioncode)[0]
+        if signed and value > 32767:
+            value -= 65536
+        #end if
+        return value/10.0**numberOfDecimals if numberOfDecimals else value
+    #end def
+
+    #--------------------------------------------------------------------------
+    def write_register(self, registeraddress, value, numberOfDecimals=0, functioncode=16, signed=False):
+        value = int(round(value*10**numberOfDecimals))
+        if not (-32768 if signed else 0) <= value <= (32767 if signed else 65535):
+            raise ValueError('value out of range: %r' % (value))
+        #end if
+        self._performCommand(functioncode, (registeraddress, [value % 65536]))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def read_bit(self, registeraddress, functioncode=2):
+        return self._performCommand(functioncode, (registeraddress, 1))[0]
+    #end def
+
+    #--------------------------------------------------------------------------
+    def write_bit(self, registeraddress, value, functioncode=5):
+        self._performCommand(functioncode, (registeraddress, [value]))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def get_pv(self):
+        return self.read_register(REGISTER_PV, 1, signed=True)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def get_setpoint(self):
+        return self.read_register(REGISTER_SETPOINT, 1, signed=True)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def set_setpoint(self, setpointvalue):
+        self.write_register(REGISTER_SETPOINT, setpointvalue, 1, signed=True)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def run(self):
+        self.write_bit(COIL_RUN, 1)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def stop(self):
+        self.write_bit(COIL_RUN, 0)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def is_running(self):
+        return self.read_bit(COIL_RUN, functioncode=1) == 1
+    #end def
+
+    #--------------------------------------------------------------------------
+    def set_pattern_step_setpoint(self, patternnumber, stepnumber, setpointvalue):
+        self.write_register(REGISTER_STEP_SETPOINT + 8*patternnumber + stepnumber, setpointvalue, 1, signed=True)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def set_pattern_step_time(self, patternnumber, stepnumber, timevalue):
+        """ Step time in minutes (0-900). """
+        if not 0 <= timevalue <= 900:
+            raise ValueError('step time out of range: %r' % (timevalue))
+        #end if
+        self.write_register(REGISTER_STEP_TIME + 8*patternnumber + stepnumber, timevalue)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def set_pattern_actual_step(self, patternnumber, value):
+        self.write_register(REGISTER_ACTUAL_STEP + patternnumber, value)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def set_pattern_additional_cycles(self, patternnumber, value):
+        self.write_register(REGISTER_CYCLES + patternnumber, value)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def set_pattern_link_topattern(self, patternnumber, value):
+        self.write_register(REGISTER_LINK + patternnumber, value)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def get_all_pattern_variables(self, patternnumber):
+        lines = []
+        for step in range(8):
+            lines.append('SP%d: %.1f  Time%d: %d' % (
+                step, self.read_register(REGISTER_STEP_SETPOINT + 8*patternnumber + step, 1, signed=True),
+                step, self.read_register(REGISTER_STEP_TIME + 8*patternnumber + step)))
+        #end for
+        lines.append('Actual step: %d' % (self.read_register(REGISTER_ACTUAL_STEP + patternnumber)))
+        lines.append('Additional cycles: %d' % (self.read_register(REGISTER_CYCLES + patternnumber)))
+        lines.append('Linked to pattern: %d' % (self.read_register(REGISTER_LINK + patternnumber)))
+        return '\n'.join(lines)
+    #end def
+
+#end class
+###############################################################################
+
+#------------------------------------------------------------------------------
+def header(command):
+    """
+    The SCPI header of a command in short form, e.g. ':ROUTe:SCAN:INTernal'
+    and 'rout:scan:int' are both 'ROUT:SCAN:INT', and its parameters.
+    """
+    parts = command.strip().split(None, 1)
+    mnemonics = []
+    for mnemonic in parts[0].strip(':').upper().split(':'):
+        query = mnemonic.endswith('?')
+        mnemonic = mnemonic.rstrip('?').rstrip('0123456789') if not mnemonic.startswith('*') else mnemonic.rstrip('?')
+        if len(mnemonic) > 4 and not mnemonic.startswith('*'):
+            mnemonic = mnemonic[:3] if mnemonic[3] in 'AEIOU' else mnemonic[:4]
+        #end if
+        mnemonics.append(mnemonic + ('?' if query else ''))
+    #end for
+    return ':'.join(mnemonics), (parts[1] if len(parts) > 1 else '')
+#end def
+
+#------------------------------------------------------------------------------
+def channel_list(parameters):
+    """ The channels of a '(@ 107,108)' list. """
+    match = re.search(r'\(@\s*([^)]*)\)', parameters)
+    if match is None:
+        return []
+    #end if
+    return [channel.strip() for channel in match.group(1).split(',') if channel.strip()]
+#end def
+
+###############################################################################
+class Keithley:
+    ''' A Keithley 2700 or 2000 with its scanner card, on the simulated GPIB. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, resource):
+        self.resource = resource
+        self.model = models.get(resource, '2700')
+        self.wiring = wiring[self.model]
+        self.lock = RLock()
+        self.function = 'VOLT' # function of channels not set one by one
+        self.functions = {}
+        self.nplc = {'VOLT': 1.0, 'TEMP': 1.0}
+        self.channel_nplc = {}
+        self.continuous = True
+        self.scan_list = []
+        self.sample_count = 1
+        self.elements = ['READ', 'TST', 'RNUM', 'CHAN']
+        self.closed = None
+        self.readings = [] # (time, channel) of the scan in progress
+        self.last = None # (time, channel) of the last single reading
+        self.ready = 0 # time the pending operation completes
+        self.opc = False
+        self.count = 0 # readings taken, for RNUMber
+    #end init
+
+    #--------------------------------------------------------------------------
+    def channel_function(self, channel):
+        return self.functions.get(channel, self.function)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def reading_time(self, channel):
+        function = self.channel_function(channel)
+        return self.channel_nplc.get((function, channel), self.nplc[function])/line_frequency + switch_time
+    #end def
+
+    #--------------------------------------------------------------------------
+    def value(self, channel):
+        """ A reading of the channel with its function, and the unit. """
+        function = self.channel_function(channel)
+        nplc = self.channel_nplc.get((function, channel), self.nplc[function])
+        unit = 'VDC' if function == 'VOLT' else 'C'
+        quantity, name = self.wiring.get(channel, ('voltage', None))
+        if function == 'VOLT':
+            if name is None:
+                value = 0.0
+            elif quantity == 'voltage':
+                value = stage.voltage(name)
+            else:
+                stage.advance()
+                value = thermocouple_sensitivity*(stage.sample[name] - ambient)
+            #end if
+            return value + random.gauss(0, voltage_noise/np.sqrt(nplc)), unit
+        #end if
+        if quantity != 'temperature':
+            return overflow, unit
+        #end if
+        stage.advance()
+        return stage.sample[name] + random.gauss(0, temperature_noise/np.sqrt(nplc)), unit
+    #end def
+
+    #--------------------------------------------------------------------------
+    def format(self, stamp, channel):
+        """ One reading with the elements of :FORMat:ELEMents. """
+        value, unit = self.value(channel)
+        self.count += 1
+        if self.model == '2000':
+            return '%+.8E' % (value)
+        #end if
+        elements = {'READ': '%+.8E%s' % (value, unit), 'TST': '%+013.3fSECS' % (stamp),
+                    'RNUM': '%+06dRDNG#' % (self.count), 'CHAN': '%03dINTCHAN' % (int(channel))}
+        return ','.join([elements[element] for element in self.elements if element in elements])
+    #end def
+
+    #--------------------------------------------------------------------------
+    def write(self, command):
+        with self.lock:
+            transaction(gpib_latency)
+            self.execute(command)
+        #end with
+    #end def
+
+    #--------------------------------------------------------------------------
+    def query(self, command):
+        with self.lock:
+            transaction(gpib_latency)
+            return self.execute(command) + '\n'
+        #end with
+    #end def
+
+    #--------------------------------------------------------------------------
+    def execute(self, command):
+        name, parameters = header(command)
+        now = time.time()
+        if name == '*OPC':
+            self.opc = True
+        elif name == '*OPC?':
+            time.sleep(max(self.ready - time.time(), 0))
+            return '1'
+        elif name == '*ESR?':
+            done = self.opc and now >= self.ready
+            if done:
+                self.opc = False
+            #end if
+            return '%d' % (int(done))
+        elif name in ('FETC?', 'SENS:DATA:FRES?'):
+            time.sleep(max(self.ready - time.time(), 0))
+            return self.fetch()
+        elif name == 'TRAC:DATA?':
+            done = [(stamp, channel) for stamp, channel in self.readings if stamp <= now]
+            if not done:
+                return ''
+            #end if
+            return ','.join([self.format(stamp - done[0][0], channel) for stamp, channel in done])
+        elif name == 'TRAC:CLE':
+            self.readings = []
+        elif name == 'INIT':
+            self.start_scan(now)
+        elif name == 'INIT:CONT':
+            self.continuous = parameters.strip().upper() in ('ON', '1')
+        elif name == 'SAMP:COUN':
+            self.sample_count = int(parameters)
+        elif name == 'ROUT:SCAN' or name == 'ROUT:SCAN:INT':
+            self.scan_list = channel_list(parameters)
+        elif name == 'ROUT:SCAN:LSEL':
+            if parameters.strip().upper().startswith('INT') and self.continuous and self.scan_list:
+                self.single(self.scan_list[0], now)
+            #end if
+        elif name == 'ROUT:CLOS':
+            channels = channel_list(parameters)
+            if channels:
+                self.closed = channels[0]
+                self.single(channels[0], now)
+            #end if
+        elif name == 'ROUT:OPEN:ALL':
+            self.closed = None
+        elif name in ('FUNC', 'SENS:FUNC'):
+            function = 'TEMP' if 'TEMP' in parameters.upper() else 'VOLT'
+            channels = channel_list(parameters)
+            for channel in channels:
+                self.functions[channel] = function
+            #end for
+            if not channels:
+                self.function = function
+                if self.closed is not None:
+                    self.single(self.closed, now)
+                #end if
+            #end if
+        elif name.endswith(':NPLC'):
+            function = 'TEMP' if 'TEMP' in name else 'VOLT'
+            value = float(parameters.split(',')[0])
+            channels = channel_list(parameters)
+            for channel in channels:
+                self.channel_nplc[(function, channel)] = value
+            #end for
+            if not channels:
+                self.nplc[function] = value
+            #end if
+        elif name == 'FORM:ELEM':
+            self.elements = [header(element)[0] for element in parameters.split(',')]
+        #end if
+        return ''
+    #end def
+
+    #--------------------------------------------------------------------------
+    def single(self, channel, now):
+        """ Starts a single reading of channel. """
+        self.ready = now + self.reading_time(channel)
+        self.last = (self.ready, channel)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def start_scan(self, now):
+        """ Triggers the scan list, sample_count readings one after the other. """
+        self.readings = []
+        stamp = now
+        for n in range(self.sample_count if self.scan_list else 0):
+            channel = self.scan_list[n % len(self.scan_list)]
+            stamp += self.reading_time(channel)
+            self.readings.append((stamp, channel))
+        #end for
+        self.ready = stamp
+        if self.readings:
+            self.last = self.readings[-1]
+        #end if
+    #end def
+
+    #--------------------------------------------------------------------------
+    def fetch(self):
+        """ The last reading; the instrument times out if there is none. """
+        if self.last is None:
+            time.sleep(error_delay)
+            raise IOError('simulated timeout: no reading to fetch')
+        #end if
+        return self.format(0.0, self.last[1])
+    #end def
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        pass
+    #end def
+
+#end class
+###############################################################################
+
+###############################################################################
+class ResourceManager:
+    ''' Stands in for visa.ResourceManager. '''
+    #--------------------------------------------------------------------------
+    def list_resources(self):
+        return tuple(sorted(models))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def open_resource(self, resource):
+        return Keithley(resource)
+    #end def
+
+#end class
+###############################################################################
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : pid_bus
+Description: Reads every cn7500 on the shared serial bus with one multi-register
+             transaction per controller and returns a single snapshot.
+Comments: The process value (0x1000) and setpoint (0x1001) are adjacent holding
+          registers, so one read_registers call returns both. The run/stop
+          state is a coil (0x0814) and cannot be read with the registers; it
+          is only read for the controllers asked for.
+"""
+import time
+
+#==============================================================================
+REGISTER_PV = 4096 # 0x1000, process value (0.1 C per count, signed)
+NUMBER_OF_REGISTERS = 2 # process value and setpoint
+
+###############################################################################
+class PIDSnapshot:
+    ''' Process values, setpoints and run states of the controllers at one time. '''
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        self.time = 0
+        self.pv = {}
+        self.setpoint = {}
+        self.running = {}
+    #end init
+
+#end class
+###############################################################################
+
+###############################################################################
+class PIDBus:
+    ''' Manages the cn7500 controllers that share one Modbus line. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, controllers):
+        """
+        controllers is a list of (name, pid) pairs, e.g.
+        [('sampleA', sampleApid), ('sampleB', sampleBpid), ...]
+        """
+        self.names = [name for name, pid in controllers]
+        self.controllers = dict(controllers)
+    #end init
+
+    #--------------------------------------------------------------------------
+    def read_controller(self, name):
+        """ Process value and setpoint of one controller in one transaction. """
+        while True:
+            try:
+                values = self.controllers[name].read_registers(REGISTER_PV, NUMBER_OF_REGISTERS)
+                break
+            except IOError:
+                print 'IOError: communication failure'
+        #end while
+        pv = self.to_signed(values[0])/10.0
+        setpoint = self.to_signed(values[1])/10.0
+        return pv, setpoint
+    #end def
+
+    #--------------------------------------------------------------------------
+    def is_running(self, name):
+        while True:
+            try:
+                return self.controllers[name].is_running()
+            except IOError:
+                print 'IOError: communication failure'
+        #end while
+    #end def
+
+    #--------------------------------------------------------------------------
+    def snapshot(self, names=None, running=()):
+        """
+        Read the controllers in 'names' (all by default) and the run state of
+        the controllers in 'running'. Returns a PIDSnapshot.
+        """
+        if names is None:
+            names = self.names
+        #end if
+        snapshot = PIDSnapshot()
+        for name in names:
+            snapshot.pv[name], snapshot.setpoint[name] = self.read_controller(name)
+        #end for
+        for name in running:
+            snapshot.running[name] = self.is_running(name)
+        #end for
+        snapshot.time = time.time()
+        return snapshot
+    #end def
+
+    #--------------------------------------------------------------------------
+    def to_signed(self, value):
+        """ Registers are read as unsigned 16 bit integers. """
+        if value > 32767:
+            value -= 65536
+        #end if
+        return value
+    #end def
+
+#end class
+###############################################################################
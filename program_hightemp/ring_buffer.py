@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : ring_buffer
+Description: Fixed size NumPy ring buffer for the live plots, so that memory
+             and redraw cost stay flat during long runs.
+Comments: Every row is written twice, at i and i+size, so the most recent
+          'size' rows are always one contiguous slice of the array and view()
+          returns them without copying. The running min and max of each
+          column are updated as rows are appended and cover the whole run.
+          If a spill path is given, rows that drop out of the buffer are
+          appended to that file as comma separated text.
+"""
+import numpy as np
+
+###############################################################################
+class RingBuffer:
+    ''' Holds the last 'size' rows of (time, value, ...) data. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, size, columns=2, spill=None):
+        self.size = size
+        self.columns = columns
+        self.data = np.zeros((2*size, columns))
+        self.index = 0 # next row to write, also the oldest row once full
+        self.count = 0 # rows appended since the start
+        self.min = np.empty(columns)
+        self.max = np.empty(columns)
+        self.min.fill(np.inf)
+        self.max.fill(-np.inf)
+        self.spill = spill
+    #end init
+
+    #--------------------------------------------------------------------------
+    def append(self, row):
+        row = np.asarray(row, dtype=float)
+        i = self.index
+        if self.count >= self.size and self.spill is not None:
+            self.write_spill(self.data[i])
+        #end if
+        self.data[i] = row
+        self.data[i+self.size] = row
+        self.index = (i+1) % self.size
+        self.count += 1
+        np.minimum(self.min, row, out=self.min)
+        np.maximum(self.max, row, out=self.max)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def view(self):
+        """ The rows in the buffer, oldest first, as a view of the array. """
+        if self.count < self.size:
+            return self.data[:self.count]
+        #end if
+        return self.data[self.index:self.index+self.size]
+    #end def
+
+    #--------------------------------------------------------------------------
+    def column(self, n):
+        return self.view()[:,n]
+    #end def
+
+    #--------------------------------------------------------------------------
+    def write_spill(self, row):
+        with open(self.spill, 'a') as f:
+            f.write(','.join(['%.6g' % (x) for x in row]) + '\n')
+        #end with
+    #end def
+
+    #--------------------------------------------------------------------------
+    def __len__(self):
+        return min(self.count, self.size)
+    #end def
+
+#end class
+###############################################################################
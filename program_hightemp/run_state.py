@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : run_state
+Description: Saves where a high temperature run is in its profile, so an
+             interrupted run can be resumed instead of started over.
+Comments: The state is a small JSON file in the run folder: the measurement
+          and dT lists and settings of the run, the index of the current
+          avgtemp and dT, the number of oscillation measurements taken at
+          that dT, the elapsed time and the data collected so far at the
+          current avgtemp. It is written to a temporary file, fsynced and
+          renamed over the old state, so the file on disk is always either
+          the previous or the new state, never a partial one.
+
+          usage: python SeebeckGUIv7.py --resume <run folder>
+"""
+import os
+import json
+
+#==============================================================================
+STATE_FILE = 'run_state.json'
+
+#------------------------------------------------------------------------------
+def save(folder, state):
+    """ Atomically replaces the state file in folder with state. """
+    path = os.path.join(folder, STATE_FILE)
+    temp = path + '.tmp'
+    with open(temp, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    #end with
+    if os.name == 'nt' and os.path.exists(path):
+        os.remove(path) # rename does not replace on Windows
+    #end if
+    os.rename(temp, path)
+#end def
+
+#------------------------------------------------------------------------------
+def load(folder):
+    """ The saved state of the run in folder. """
+    path = os.path.join(folder, STATE_FILE)
+    if not os.path.exists(path):
+        raise IOError("no %s in %s, the run can not be resumed" % (STATE_FILE, folder))
+    #end if
+    with open(path, 'r') as f:
+        return json.load(f)
+    #end with
+#end def
+
+#------------------------------------------------------------------------------
+def reopen(path):
+    """
+    Opens a csv file of the run for appending, after cutting off a line that
+    was only partly written when the run stopped.
+    """
+    with open(path, 'r+b') as f:
+        text = f.read()
+        f.truncate(text.rfind('\n') + 1)
+    #end with
+    return open(path, 'a')
+#end def
+
+#------------------------------------------------------------------------------
+def next_step(state, steps):
+    """
+    Where to continue a run from its saved state: the avgtemp index, the dT
+    index and the number of oscillation measurements already taken there. A
+    finished dT moves on to the next one; past the last dT, the dT index is
+    len(dTlist) and only the processing of the avgtemp is left.
+    """
+    avgtemp_index = state['avgtemp_index']
+    dT_index = state['dT_index']
+    count = state['count']
+    if count >= steps:
+        dT_index += 1
+        count = 0
+    #end if
+    return avgtemp_index, dT_index, count
+#end def
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : schedule
+Description: Orders the measurement temperatures of a run to spend the least
+             time ramping the furnace, and estimates how long the run takes.
+Comments: The blocks heat and cool at very different rates, both depending
+          on the temperature. RateModel holds a straight line fit of each,
+          rate (C/s) = a + b*T, learned from the Status.raw/PID_Data.raw
+          stores of earlier runs (readings taken while the sample was more
+          than 'margin' away from its setpoint), plus the time a dT step
+          takes on top of its ramp, learned from the Start/Stop Oscillation
+          marks of Data.raw. The time of a ramp is the integral of dT/rate.
+
+          The list is split into passes, a new one starting at every
+          temperature that is already in the current pass, so a hysteresis
+          loop (e.g. 50 to 200 and back to 50) is an up and a down pass. The
+          passes are measured in the order given, each one sorted up or down,
+          whichever makes the whole run quickest. The time of a pass only
+          depends on the temperature the run is at before it, so the best
+          run is found pass by pass for each temperature a pass can end at.
+
+          usage: python schedule.py learn <model.json> <run folder> ...
+                 python schedule.py plan <model.json> <T1> <T2> ...
+"""
+import os
+import sys
+import json
+import numpy as np
+
+import raw_store
+from regression import fit_lines
+
+#==============================================================================
+margin = 5.0 # C from the setpoint, below this the PID is settling, not ramping
+min_rate = 0.001 # C/s, the slowest a ramp is taken to go
+start_temp = 25.0 # C, the sample temperature before a run
+min_points = 20 # readings needed to learn a rate
+
+# sample temperature and setpoint columns of the stores that hold them
+temperature_fields = {'status': (('sampletempA', 'sampletempB'), ('samplesetpointA', 'samplesetpointB')),
+                      'pid': (('sampletempA', 'sampletempB'), ('setpointA', 'setpointB'))}
+
+###############################################################################
+class RateModel:
+    ''' Heating and cooling rates of the sample and the time of a dT step. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, heating=(0.083, 0.0), cooling=(-0.005, 0.0002), step_time=300.0):
+        """
+        heating and cooling are (a, b) of rate = a + b*T (C/s, T in C),
+        step_time is the time (s) of a dT step besides its ramp.
+        """
+        self.heating = tuple(heating)
+        self.cooling = tuple(cooling)
+        self.step_time = step_time
+    #end init
+
+    #--------------------------------------------------------------------------
+    def rate(self, T, up):
+        a, b = self.heating if up else self.cooling
+        return np.maximum(a + b*np.asarray(T, dtype=float), min_rate)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def transit(self, T1, T2, points=50):
+        """ Time (s) to take the sample from T1 to T2. """
+        if T1 == T2:
+            return 0.0
+        #end if
+        T = np.linspace(T1, T2, points)
+        return float(np.trapz(1/self.rate(T, T2 > T1), T)*np.sign(T2 - T1))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def dwell(self, avgT, dTlist):
+        """ Time (s) of the dT sweep at avgT; each side moves by dT/2. """
+        total = 0.0
+        dT = 0.0
+        for step in dTlist:
+            total += max(self.transit(avgT + dT/2.0, avgT + step/2.0),
+                         self.transit(avgT - dT/2.0, avgT - step/2.0)) + self.step_time
+            dT = step
+        #end for
+        return total
+    #end def
+
+    #--------------------------------------------------------------------------
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'heating': self.heating, 'cooling': self.cooling, 'step_time': self.step_time}, f)
+        #end with
+    #end def
+
+#end class
+###############################################################################
+
+#------------------------------------------------------------------------------
+def load(path):
+    """ The model saved at path, or the default model if there is none. """
+    if not os.path.exists(path):
+        return RateModel()
+    #end if
+    with open(path, 'r') as f:
+        return RateModel(**dict([(str(key), value) for key, value in json.load(f).items()]))
+    #end with
+#end def
+
+#------------------------------------------------------------------------------
+def ramps(path):
+    """
+    Average sample temperature and its rate of change (C/s) between the
+    readings of a store, and whether the setpoint was above or below.
+    """
+    header, data = raw_store.read(path)
+    temps, setpoints = temperature_fields[header['layout']]
+    T = (data[temps[0]] + data[temps[1]])/2
+    setpoint = (data[setpoints[0]] + data[setpoints[1]])/2
+    dt = np.diff(data['time'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.diff(T)/dt
+    #end with
+    mid = (T[1:] + T[:-1])/2
+    error = setpoint[:-1] - T[:-1]
+    ok = (dt > 0) & np.isfinite(rate)
+    heating = ok & (error > margin) & (rate > 0)
+    cooling = ok & (error < -margin) & (rate < 0)
+    return mid, rate, heating, cooling
+#end def
+
+#------------------------------------------------------------------------------
+def sweeps(path):
+    """ Average temperatures and durations (s) of the dT sweeps in a Data.raw store. """
+    header, data = raw_store.read(path)
+    starts = data[data['indicator'] == raw_store.indicators['start']]
+    stops = data[data['indicator'] == raw_store.indicators['stop']]
+    n = min(len(starts), len(stops))
+    return starts['avgT'][:n], stops['time'][:n] - starts['time'][:n]
+#end def
+
+#------------------------------------------------------------------------------
+def learn(folders, dTlist, model=None):
+    """
+    Fits the heating and cooling rates and the dT step time to the raw
+    stores in the run folders; parts without enough data keep the values
+    of model (the default model if None).
+    """
+    if model is None:
+        model = RateModel()
+    #end if
+    heat_T, heat_rate, cool_T, cool_rate, sweep_T, durations = [], [], [], [], [], []
+    for folder in folders:
+        for name in ('Status.raw', 'PID_Data.raw'):
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                T, rate, heating, cooling = ramps(path)
+                heat_T.append(T[heating])
+                heat_rate.append(rate[heating])
+                cool_T.append(T[cooling])
+                cool_rate.append(-rate[cooling])
+            #end if
+        #end for
+        path = os.path.join(folder, 'Data.raw')
+        if os.path.exists(path) and raw_store.read_header(path)['layout'] == 'data':
+            avgT, duration = sweeps(path)
+            sweep_T.extend(avgT)
+            durations.extend(duration)
+        #end if
+    #end for
+
+    heating, cooling = model.heating, model.cooling
+    if heat_T and sum([len(T) for T in heat_T]) >= min_points:
+        heating = fit_lines(np.concatenate(heat_T), np.concatenate(heat_rate))[1::-1]
+    #end if
+    if cool_T and sum([len(T) for T in cool_T]) >= min_points:
+        cooling = fit_lines(np.concatenate(cool_T), np.concatenate(cool_rate))[1::-1]
+    #end if
+    learned = RateModel(heating, cooling, model.step_time)
+
+    # what is left of a sweep after its ramps, per dT step
+    if durations and len(dTlist) > 0:
+        left = [duration - (learned.dwell(avgT, dTlist) - len(dTlist)*learned.step_time)
+                for avgT, duration in zip(sweep_T, durations)]
+        learned.step_time = max(float(np.median(left)), 0.0)/len(dTlist)
+    #end if
+    return learned
+#end def
+
+#------------------------------------------------------------------------------
+def duration(order, dTlist, model, start=start_temp):
+    """ Estimated time (s) of a run measuring the temperatures in order. """
+    total = 0.0
+    T = start
+    for avgT in order:
+        total += model.transit(T, avgT) + model.dwell(avgT, dTlist)
+        T = avgT
+    #end for
+    return total
+#end def
+
+#------------------------------------------------------------------------------
+def passes(temps):
+    """
+    Splits the temperatures into passes in which none of them repeats; a new
+    pass starts at a temperature that is already in the current one.
+    """
+    found = [[]]
+    for T in temps:
+        if T in found[-1]:
+            found.append([])
+        #end if
+        found[-1].append(T)
+    #end for
+    return [temps_pass for temps_pass in found if temps_pass]
+#end def
+
+#------------------------------------------------------------------------------
+def plan(temps, dTlist, model, start=start_temp):
+    """
+    Returns the quickest order of the temperatures and its duration (s). The
+    passes of the list are kept in order and each is measured up or down.
+    """
+    # quickest (duration, order) of the run so far, by the temperature it ends at
+    best = {start: (0.0, [])}
+    for temps_pass in passes(list(temps)):
+        ends = {}
+        for T, (total, order) in best.items():
+            for candidate in (sorted(temps_pass), sorted(temps_pass, reverse=True)):
+                time = total + duration(candidate, dTlist, model, T)
+                if candidate[-1] not in ends or time < ends[candidate[-1]][0]:
+                    ends[candidate[-1]] = (time, order + candidate)
+                #end if
+            #end for
+        #end for
+        best = ends
+    #end for
+    total, order = min(best.values())
+    return order, total
+#end def
+
+#==============================================================================
+if __name__=='__main__':
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] not in ('learn', 'plan'):
+        print __doc__
+        sys.exit(1)
+    #end if
+    dTlist = [0,-4,-8,-4,0,4,8,4,0]
+    if args[0] == 'learn':
+        model = learn(args[2:], dTlist, load(args[1]))
+        model.save(args[1])
+        print 'heating: %.4f + %.6f*T C/s' % model.heating
+        print 'cooling: %.4f + %.6f*T C/s' % model.cooling
+        print 'dT step: %.0f s' % (model.step_time)
+    else:
+        order, total = plan([float(T) for T in args[2:]], dTlist, load(args[1]))
+        print 'order: ', ', '.join(['%g' % (T) for T in order])
+        print 'estimated duration: %.1f h' % (total/3600)
+    #end if
+#end if
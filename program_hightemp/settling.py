@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : settling
+Description: Predicts how long a PID controlled temperature needs to settle
+             at a new setpoint, so the measurement loops can show an ETA and
+             wait instead of polling the controllers while nothing can
+             happen.
+Comments: The approach to the setpoint is taken to be first order: the error
+          e = T - setpoint decays as e0*exp(-t/tau). A line fitted to
+          ln|e| against time over the recent readings gives tau and the
+          current error, and from them the time until |e| is within the
+          tolerance and the rate of change |e|/tau is below the stability
+          threshold. Readings within 'floor' of the setpoint (the controller
+          resolution) carry no information on the decay and are left out,
+          and no prediction is made while the error is not decaying (e.g.
+          while the heater is still ramping at full power).
+"""
+from collections import deque
+import numpy as np
+
+from regression import fit_lines
+
+#==============================================================================
+window = 600.0 # s of readings used for the prediction
+floor = 0.1 # C, errors below this are noise
+min_points = 5
+lead = 30.0 # s, polling resumes this long before the predicted settling time
+longest_pause = 60.0 # s, the most the loops wait between readings
+
+###############################################################################
+class Settling:
+    ''' Fits the approach of one temperature to its setpoint. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, window=window, floor=floor, min_points=min_points):
+        self.window = window
+        self.floor = floor
+        self.min_points = min_points
+        self.reset()
+    #end init
+
+    #--------------------------------------------------------------------------
+    def reset(self, setpoint=None):
+        self.setpoint = setpoint
+        self.points = deque()
+    #end def
+
+    #--------------------------------------------------------------------------
+    def add(self, t, T, setpoint):
+        """ Adds a reading at time t (s); a new setpoint starts a new fit. """
+        if setpoint != self.setpoint:
+            self.reset(setpoint)
+        #end if
+        self.points.append((t, T - setpoint))
+        while t - self.points[0][0] > self.window:
+            self.points.popleft()
+        #end while
+    #end def
+
+    #--------------------------------------------------------------------------
+    def fit(self):
+        """
+        Time constant tau (s) and the error at the last reading from the fit,
+        or None if the error is not decaying or there are too few readings.
+        """
+        if not self.points:
+            return None
+        #end if
+        t, e = np.array(self.points).T
+        use = np.abs(e) > self.floor
+        if use.sum() < self.min_points:
+            return None
+        #end if
+        slope, offset, rsquared, stderr = fit_lines(t[use], np.log(np.abs(e[use])))
+        if not slope < 0:
+            return None
+        #end if
+        return -1/slope, np.exp(offset + slope*t[-1])
+    #end def
+
+    #--------------------------------------------------------------------------
+    def eta(self, tolerance, threshold):
+        """
+        Seconds from the last reading until the temperature is within
+        tolerance (C) of the setpoint and changing slower than threshold
+        (C/s); 0 if it already is, None if it can not be predicted.
+        """
+        if self.points and abs(self.points[-1][1]) <= self.floor:
+            return 0.0
+        #end if
+        model = self.fit()
+        if model is None:
+            return None
+        #end if
+        tau, error = model
+        # |e| must fall below the tolerance and below threshold*tau
+        target = min(tolerance, threshold*tau)
+        return max(0.0, tau*np.log(error/target))
+    #end def
+
+#end class
+###############################################################################
+
+#------------------------------------------------------------------------------
+def combine(*etas):
+    """ ETA of several temperatures that must all settle, None if any is unknown. """
+    if None in etas:
+        return None
+    #end if
+    return max(etas)
+#end def
+
+#------------------------------------------------------------------------------
+def pause(eta, lead=lead, longest=longest_pause):
+    """ How long a loop can wait before reading the temperatures again (s). """
+    if eta is None:
+        return 0.0
+    #end if
+    return min(max(eta - lead, 0.0), longest)
+#end def
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : stability
+Description: Decides when a PID controlled temperature has settled, from the
+             slope of a straight line fitted to its last few minutes.
+Comments: The fit covers every point of the last 'window' seconds instead of
+          the last three points, so one noisy reading no longer flips the
+          stability flag. The sums of the fit are kept as points are added
+          and dropped, so each update costs the same whatever the window
+          length. A temperature is stable when the slope is below the
+          threshold by more than 'confidence' standard errors of the slope,
+          which come from the scatter of the points about the line: a quiet
+          controller is declared stable after a few points, a noisy one only
+          once the window holds enough points to tell.
+"""
+from collections import deque
+
+from regression import fit_sums
+
+#==============================================================================
+window = 60.0 # s of readings in the fit
+confidence = 2.0 # standard errors of the slope below the threshold to be stable
+min_points = 3
+
+###############################################################################
+class Stability:
+    ''' Slope (C/s) of a temperature over a sliding time window. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, window=window, confidence=confidence, min_points=min_points):
+        self.window = window
+        self.confidence = confidence
+        self.min_points = min_points
+        self.reset()
+    #end init
+
+    #--------------------------------------------------------------------------
+    def reset(self):
+        """ Forgets the readings, e.g. after the setpoint has changed. """
+        self.points = deque()
+        self.origin = None # first reading, the sums are taken about it
+        self.n = 0
+        self.st = self.sT = self.stt = self.stT = self.sTT = 0.0
+    #end def
+
+    #--------------------------------------------------------------------------
+    def add(self, t, T):
+        """ Adds a reading at time t (s) and drops those older than the window. """
+        if self.origin is None:
+            self.origin = (t, T)
+        #end if
+        t = t - self.origin[0]
+        T = T - self.origin[1]
+        self.points.append((t, T))
+        self.update(t, T, 1)
+        while t - self.points[0][0] > self.window:
+            old_t, old_T = self.points.popleft()
+            self.update(old_t, old_T, -1)
+        #end while
+    #end def
+
+    #--------------------------------------------------------------------------
+    def update(self, t, T, sign):
+        self.n += sign
+        self.st += sign*t
+        self.sT += sign*T
+        self.stt += sign*t*t
+        self.stT += sign*t*T
+        self.sTT += sign*T*T
+    #end def
+
+    #--------------------------------------------------------------------------
+    def ready(self):
+        return self.n >= self.min_points
+    #end def
+
+    #--------------------------------------------------------------------------
+    def fit(self):
+        """ Slope (C/s) and its standard error, nan until the window is ready. """
+        if not self.ready():
+            return float('nan'), float('nan')
+        #end if
+        slope, offset, rsquared, stderr = fit_sums(self.n, self.st, self.sT, self.stt, self.stT, self.sTT)
+        return float(slope), float(stderr)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def is_stable(self, threshold):
+        """ True when |slope| < threshold (C/s) with the set confidence. """
+        if not self.ready():
+            return False
+        #end if
+        slope, stderr = self.fit()
+        return abs(slope) + self.confidence*stderr < threshold
+    #end def
+
+#end class
+###############################################################################
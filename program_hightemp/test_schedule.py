@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : test_schedule
+Description: Tests of the setpoint order planner in schedule.py.
+Comments: usage: python -m unittest test_schedule (from program_hightemp)
+"""
+import unittest
+
+import schedule
+
+#==============================================================================
+dTlist = [0,-4,-8,-4,0,4,8,4,0]
+
+###############################################################################
+class PlanTest(unittest.TestCase):
+    #--------------------------------------------------------------------------
+    def setUp(self):
+        # heats much faster than it cools, as the furnace does
+        self.model = schedule.RateModel(heating=(0.1, 0.0), cooling=(0.005, 0.0001), step_time=300.0)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def test_passes(self):
+        self.assertEqual(schedule.passes([50, 100, 150, 200, 150, 100, 50]),
+                         [[50, 100, 150, 200], [150, 100, 50]])
+        self.assertEqual(schedule.passes([100, 50, 150]), [[100, 50, 150]])
+    #end def
+
+    #--------------------------------------------------------------------------
+    def test_single_pass_is_sorted(self):
+        order, total = schedule.plan([150, 50, 100], dTlist, self.model)
+        self.assertEqual(order, [50, 100, 150])
+        self.assertAlmostEqual(total, schedule.duration(order, dTlist, self.model))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def test_hysteresis_list_is_reordered_within_passes(self):
+        temps = [200, 150, 100, 50, 100, 150, 200]
+        order, total = schedule.plan(temps, dTlist, self.model)
+
+        # the down pass is heated through from the start, then cooled back
+        self.assertEqual(order, [50, 100, 150, 200, 200, 150, 100])
+        self.assertAlmostEqual(total, schedule.duration(order, dTlist, self.model))
+        self.assertLess(total, schedule.duration(temps, dTlist, self.model))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def test_hysteresis_passes_are_kept(self):
+        temps = [50, 100, 150, 200, 150, 100, 50]
+        order, total = schedule.plan(temps, dTlist, self.model)
+        self.assertEqual(sorted(order[:4]), [50, 100, 150, 200])
+        self.assertEqual(sorted(order[4:]), [50, 100, 150])
+        self.assertLessEqual(total, schedule.duration(temps, dTlist, self.model))
+    #end def
+
+#end class
+###############################################################################
+
+#==============================================================================
+if __name__=='__main__':
+    unittest.main()
+#end if
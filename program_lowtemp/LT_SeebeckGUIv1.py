@@ -25,9 +25,15 @@ import matplotlib.animation as animation # For plotting
 import pylab
 import numpy as np
 import matplotlib.pyplot as plt
-import minimalmodbus as modbus # For communicating with the cn7500s
-import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
-import visa # pyvisa, essential for communicating with the Keithley
+import instrument_sim
+if instrument_sim.enabled:
+    # SEEBECK_SIMULATE=1 runs against simulated instruments
+    modbus = omegacn7500 = visa = instrument_sim
+else:
+    import minimalmodbus as modbus # For communicating with the cn7500s
+    import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
+    import visa # pyvisa, essential for communicating with the Keithley
+#end if
 from threading import Thread # For threading the processes going on behind the GUI
 import time
 from datetime import datetime # for getting the current date and time
@@ -35,6 +41,10 @@ from datetime import datetime # for getting the current date and time
 import exceptions
 import sys
 from logging_utils import setup_logging_to_file, log_exception
+from thermocouple import voltage_correction
+from regression import fit_seebeck
+from plot_queue import PlotQueue
+from stability import Stability
 
 # for a fancy status bar:
 import EnhancedStatusBar as ESB
@@ -58,6 +68,7 @@ APP_EXIT = 1 # id for File\Quit
 
 
 stability_threshold = 0.25/60
+stability_window = 60 # s of sample temperatures in the stability fit
 oscillation = 8 # Degree range that the PID will oscillate in
 tolerance = (oscillation/5) # This must be set to less than oscillation
 measureList = []
@@ -126,7 +137,7 @@ class Keithley_2000:
         """ 
         Scan the channel and take a reading 
         """
-        if (channel == VlowChannel or channel == VhighChannel):
+        if (channel == chromelChannel or channel == alumelChannel):
             self.ctrl.write("func 'volt:dc'")
             
         #end if
@@ -299,9 +310,9 @@ class InitialCheck:
         """ Takes data from the PID
         """
         self.Vchromelraw = float(self.k2000.fetch(chromelChannel))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel', tc_type)
         self.Valumelraw = float(self.k2000.fetch(alumelChannel))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel', tc_type)
 
         self.updateGUI(stamp="Chromel Voltage Init", data=float(self.Vchromelcalc))
         self.updateGUI(stamp="Alumel Voltage Init", data=float(self.Valumelcalc))
@@ -311,86 +322,6 @@ class InitialCheck:
     #end def
 
 
-    #--------------------------------------------------------------------------
-    def voltage_Correction(self, raw_voltage, tempA, tempB, side):
-        ''' raw_data must be in uV '''
-        # Kelvin conversion for polynomial correction.
-        dT = tempA - tempB
-        avgT = (tempA + tempB)/2 + 273.15
-
-        # Correction for effect from Thermocouple Seebeck
-        out = self.alpha(avgT, side)*dT - raw_voltage
-
-        return out
-    #end def
-    #--------------------------------------------------------------------------
-    def alpha(self, x, side):
-        ''' x = avgT
-            alpha in uV/K
-        '''
-        global tc_type
-
-        if tc_type == "k-type":
-
-            ### If Chromel, taken from Chromel_Seebeck.txt
-            if side == 'chromel':
-                if ( x >= 270 and x < 700):
-                    alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                            -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                            -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                            -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                            -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                            -4.30421084091e-24*x**10
-
-                #end if
-
-                elif ( x >= 700 and x < 1599):
-                    alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                            0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                            9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                            5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                            4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-
-                #end if
-
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Chromel)
-
-            ### If Alumel, taken from Alumel_Seebeck.txt
-            elif side == 'alumel':
-                if ( x >= 270 and x < 570):
-                    alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                            -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                            -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                            -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                            -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-
-                #end if
-
-                elif ( x >= 570 and x < 1599):
-                    alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                            0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                            1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                            4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                            1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-
-                #end if
-
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Alumel)
-
-            else:
-                print "Error in voltage correction."
-
-        #end if (K-type)
-
-        return alpha
-
-    #end def
     #--------------------------------------------------------------------------
     def updateGUI(self, stamp, data):
         """
@@ -430,6 +361,8 @@ class TakeData:
 
         self.tolerance = tolerance
         self.stability_threshold = stability_threshold
+        self.trendA = Stability(stability_window)
+        self.trendB = Stability(stability_window)
 
         self.tol = 'NO'
         self.stable = 'NO'
@@ -438,6 +371,7 @@ class TakeData:
         self.updateGUI(stamp='Measurement', data=self.measurement)
 
         self.plotnumber = 0
+        self.plots = PlotQueue()
 
         self.exception_ID = 0
 
@@ -475,10 +409,8 @@ class TakeData:
                     dTcalclist = []
                     avgTcalclist = []
 
-                    self.recenttempA = []
-                    self.recenttempAtime=[]
-                    self.recenttempB = []
-                    self.recenttempBtime=[]
+                    self.trendA.reset()
+                    self.trendB.reset()
                     self.stabilityA = '-'
                     self.stabilityB = '-'
                     self.updateGUI(stamp="Stability A", data=self.stabilityA)
@@ -521,10 +453,8 @@ class TakeData:
                                 print 'IOError: communication failure'
                         #end while
                         print 'reset stability'
-                        self.recenttempA = []
-                        self.recenttempAtime=[]
-                        self.recenttempB = []
-                        self.recenttempBtime=[]
+                        self.trendA.reset()
+                        self.trendB.reset()
                         self.stabilityA = '-'
                         self.stabilityB = '-'
                         self.updateGUI(stamp="Stability A", data=self.stabilityA)
@@ -639,34 +569,20 @@ class TakeData:
 
         print "\ntime: %.2f s\nsample temp A: %f C\nsample temp B: %f C" % (self.time_temperature, self.sampletempA, self.sampletempB)
 
-        #check stability of PID
-        if (len(self.recenttempA)<3):
-            self.recenttempA.append(self.sampletempA)
-            self.recenttempAtime.append(self.time_temperature)
-        #end if
-        else:
-            self.recenttempA.pop(0)
-            self.recenttempAtime.pop(0)
-            self.recenttempA.append(self.sampletempA)
-            self.recenttempAtime.append(self.time_temperature)
-            self.stabilityA = self.getStability(self.recenttempA,self.recenttempAtime)
-            print "stability A: %.4f C/min" % (self.stabilityA*60)
+        # check stability of PID
+        self.trendA.add(self.time_temperature, self.sampletempA)
+        if self.trendA.ready():
+            self.stabilityA, stderr = self.trendA.fit()
+            print "stability A: %.4f +/- %.4f C/min" % (self.stabilityA*60, stderr*60)
             self.updateGUI(stamp="Stability A", data=self.stabilityA*60)
-        #end else
-
-        if (len(self.recenttempB)<3):
-            self.recenttempB.append(self.sampletempB)
-            self.recenttempBtime.append(self.time_temperature)
         #end if
-        else:
-            self.recenttempB.pop(0)
-            self.recenttempBtime.pop(0)
-            self.recenttempB.append(self.sampletempB)
-            self.recenttempBtime.append(self.time_temperature)
-            self.stabilityB = self.getStability(self.recenttempB,self.recenttempBtime)
-            print "stability B: %.4f C/min" % (self.stabilityB*60)
+
+        self.trendB.add(self.time_temperature, self.sampletempB)
+        if self.trendB.ready():
+            self.stabilityB, stderr = self.trendB.fit()
+            print "stability B: %.4f +/- %.4f C/min" % (self.stabilityB*60, stderr*60)
             self.updateGUI(stamp="Stability B", data=self.stabilityB*60)
-        #end else
+        #end if
 
         self.updateGUI(stamp="Time Sample Temp A", data=self.time_temperature)
         self.updateGUI(stamp="Time Sample Temp B", data=self.time_temperature)
@@ -706,9 +622,9 @@ class TakeData:
         print('take voltage data\n')
 
         self.Vchromelraw = float(self.k2000.fetch(chromelChannel))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel', tc_type)
         self.Valumelraw = float(self.k2000.fetch(alumelChannel))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel', tc_type)
         self.time_voltage = time.time() - self.start
 
         self.updateGUI(stamp="Time Chromel Voltage", data=float(self.time_voltage))
@@ -724,15 +640,6 @@ class TakeData:
         rawfile.write('%.3f,%.3f,%.3f,%.3f,'%(self.Vchromelraw, self.Vchromelcalc,self.Valumelraw, self.Valumelcalc))
     #end def
 
-    #--------------------------------------------------------------------------
-    def getStability(self, temps, times):
-        coeffs = np.polyfit(times, temps, 1)
-
-        # Polynomial Coefficients
-        results = coeffs.tolist()
-        return results[0]
-    #end def
-
     #--------------------------------------------------------------------------
     def check_tolerance(self):
         print 'check tolerance'
@@ -750,22 +657,10 @@ class TakeData:
 
         print 'check stability'
 
-        if (self.stabilityA != '-'):
-            self.stableA = (np.abs(self.stabilityA) < self.stability_threshold)
-            print 'stable A: ',self.stableA
-        #end if
-        else:
-            self.stableA = False
-            print 'stable A: ',self.stableA
-        #end else
-        if (self.stabilityB != '-'):
-            self.stableB = (np.abs(self.stabilityB) < self.stability_threshold)
-            print 'stable B: ',self.stableB
-        #end if
-        else:
-            self.stableB = False
-            print 'stable B: ',self.stableB
-        #end else
+        self.stableA = self.trendA.is_stable(self.stability_threshold)
+        print 'stable A: ',self.stableA
+        self.stableB = self.trendB.is_stable(self.stability_threshold)
+        print 'stable B: ',self.stableB
         if (self.stableA and self.stableB):
             self.stable = 'OK'
         #end if
@@ -808,7 +703,7 @@ class TakeData:
         time.sleep(0.2)
 
         self.Vchromelraw = float(self.k2000.fetch(chromelChannel))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel')
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.sampletempA,self.sampletempB, 'chromel', tc_type)
         self.time_Vchromel = time.time() - self.start
         self.updateGUI(stamp="Time Chromel Voltage", data=self.time_Vchromel)
         self.updateGUI(stamp="Chromel Voltage", data=self.Vchromelcalc)
@@ -817,7 +712,7 @@ class TakeData:
         time.sleep(0.2)
 
         self.Valumelraw = float(self.k2000.fetch(alumelChannel))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel')
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.sampletempA,self.sampletempB, 'alumel', tc_type)
         self.time_Valumel = time.time() - self.start
         self.updateGUI(stamp="Time Alumel Voltage", data=self.time_Valumel)
         self.updateGUI(stamp="Alumel Voltage", data=self.Valumelcalc)
@@ -837,7 +732,7 @@ class TakeData:
         print('Symmetrize the measurement and repeat')
 
         self.Valumelraw2 = float(self.k2000.fetch(alumelChannel))*10**6
-        self.Valumelcalc2 = self.voltage_Correction(self.Valumelraw2,self.sampletempA,self.sampletempB, 'alumel')
+        self.Valumelcalc2 = voltage_correction(self.Valumelraw2,self.sampletempA,self.sampletempB, 'alumel', tc_type)
         self.time_Valumel2 = time.time() - self.start
         self.updateGUI(stamp="Time Alumel Voltage", data=self.time_Valumel2)
         self.updateGUI(stamp="Alumel Voltage", data=self.Valumelcalc2)
@@ -846,7 +741,7 @@ class TakeData:
         time.sleep(0.2)
 
         self.Vchromelraw2 = float(self.k2000.fetch(chromelChannel))*10**6
-        self.Vchromelcalc2 = self.voltage_Correction(self.Vchromelraw2,self.sampletempA,self.sampletempB, 'chromel')
+        self.Vchromelcalc2 = voltage_correction(self.Vchromelraw2,self.sampletempA,self.sampletempB, 'chromel', tc_type)
         self.time_Vchromel2 = time.time() - self.start
         self.updateGUI(stamp="Time Chromel Voltage", data=self.time_Vchromel2)
         self.updateGUI(stamp="Chromel Voltage", data=self.Vchromelcalc2)
@@ -877,87 +772,6 @@ class TakeData:
         rawfile.write(str(self.tol)+','+str(self.stable)+'\n')
     #end def
 
-    #--------------------------------------------------------------------------
-    def voltage_Correction(self, raw_voltage, tempA, tempB, side):
-        ''' raw_data must be in uV '''
-        # Kelvin conversion for polynomial correction.
-        dT = tempA - tempB
-        avgT = (tempA + tempB)/2 + 273.15
-
-        # Correction for effect from Thermocouple Seebeck
-        out = self.alpha(avgT, side)*dT - raw_voltage
-
-        return out
-    #end def
-
-    #--------------------------------------------------------------------------
-    def alpha(self, x, side):
-        ''' x = avgT
-            alpha in uV/K
-        '''
-
-        if tc_type == "k-type":
-
-            ### If Chromel, taken from Chromel_Seebeck.txt
-            if side == 'chromel':
-                if ( x >= 270 and x < 700):
-                    alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                            -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                            -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                            -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                            -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                            -4.30421084091e-24*x**10
-
-                #end if
-
-                elif ( x >= 700 and x < 1599):
-                    alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                            0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                            9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                            5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                            4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-
-                #end if
-
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Chromel)
-
-            ### If Alumel, taken from Alumel_Seebeck.txt
-            elif side == 'alumel':
-                if ( x >= 270 and x < 570):
-                    alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                            -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                            -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                            -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                            -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-
-                #end if
-
-                elif ( x >= 570 and x < 1599):
-                    alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                            0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                            1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                            4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                            1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-
-                #end if
-
-                else:
-                    print "Error in voltage correction, out of range."
-
-            #end if (Alumel)
-
-            else:
-                print "Error in voltage correction."
-
-        #end if (K-type)
-
-        return alpha
-
-    #end def
-
     #--------------------------------------------------------------------------
     def write_data_to_file(self):
         global timecalclist, Vchromelcalclist, Valumelcalclist, dTcalclist, avgTcalclist
@@ -1020,38 +834,11 @@ class TakeData:
         dTchromellist = dTcalclist
         dTalumellist = dTcalclist
 
-        results_chromel = {}
-        results_alumel = {}
-
-        coeffs_chromel = np.polyfit(dTchromellist, Vchromelcalclist, 1)
-        coeffs_alumel = np.polyfit(dTalumellist,Valumelcalclist,1)
-        # Polynomial Coefficients
-        polynomial_chromel = coeffs_chromel.tolist()
-        polynomial_alumel = coeffs_alumel.tolist()
-
-        seebeck_chromel = polynomial_chromel[0]
-        offset_chromel = polynomial_chromel[1]
-        seebeck_alumel = polynomial_alumel[0]
-        offset_alumel = polynomial_alumel[1]
-
-        # Calculate coefficient of determination (r-squared):
-        p_chromel = np.poly1d(coeffs_chromel)
-        p_alumel = np.poly1d(coeffs_alumel)
-        # fitted values:
-        yhat_chromel = p_chromel(dTchromellist)
-        yhat_alumel = p_alumel(dTalumellist)
-        # mean of values:
-        ybar_chromel = np.sum(Vchromelcalclist)/len(Vchromelcalclist)
-        ybar_alumel = np.sum(Valumelcalclist)/len(Valumelcalclist)
-        # regression sum of squares:
-        ssreg_chromel = np.sum((yhat_chromel-ybar_chromel)**2)   # or sum([ (yihat - ybar)**2 for yihat in yhat])
-        ssreg_alumel = np.sum((yhat_alumel-ybar_alumel)**2)
-        # total sum of squares:
-        sstot_chromel = np.sum((Vchromelcalclist - ybar_chromel)**2)
-        sstot_alumel = np.sum((Valumelcalclist - ybar_alumel)**2)    # or sum([ (yi - ybar)**2 for yi in y])
-
-        rsquared_chromel = ssreg_chromel / sstot_chromel
-        rsquared_alumel = ssreg_alumel / sstot_alumel
+        chromel, alumel = fit_seebeck(dTchromellist, Vchromelcalclist, Valumelcalclist)
+        seebeck_chromel, offset_chromel, rsquared_chromel, stderr_chromel = chromel
+        seebeck_alumel, offset_alumel, rsquared_alumel, stderr_alumel = alumel
+        polynomial_chromel = [seebeck_chromel, offset_chromel]
+        polynomial_alumel = [seebeck_alumel, offset_alumel]
 
         processfile.write('%.3f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f\n'%(time,avgT,seebeck_chromel,offset_chromel,rsquared_chromel,seebeck_alumel,offset_alumel,rsquared_alumel))
 
@@ -1071,44 +858,14 @@ class TakeData:
     #--------------------------------------------------------------------------
     def create_plot(self, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel, title):
         global filePath
-        print 'create seebeck plot'
-        dpi = 400
-
-        plt.ioff()
-
-        # Create Plot:
-        fig = plt.figure(self.plotnumber, dpi=dpi)
-        ax = fig.add_subplot(111)
-        ax.grid()
-        ax.set_title(title)
-        ax.set_xlabel("dT (K)")
-        ax.set_ylabel("dV (uV)")
-
-        # Plot data points:
-        ax.scatter(xalumel, yalumel, color='r', marker='.', label="alumel Voltage")
-        ax.scatter(xchromel, ychromel, color='b', marker='.', label="chromel Voltage")
-
-        # Overlay linear fits:
-        coeffsalumel = fitalumel['polynomial']
-        coeffschromel = fitchromel['polynomial']
-        p_alumel = np.poly1d(coeffsalumel)
-        p_chromel = np.poly1d(coeffschromel)
-        xp = np.linspace(min(xalumel+xchromel), max(xalumel+xchromel), 5000)
-        alumel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffsalumel[0], coeffsalumel[1])
-        chromel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffschromel[0], coeffschromel[1])
-        ax.plot(xp, p_alumel(xp), '-', c='#FF9900', label="alumel Voltage Fit\n %s" % alumel_eq)
-        ax.plot(xp, p_chromel(xp), '-', c='g', label="chromel Voltage Fit\n %s" % chromel_eq)
-
-        ax.legend(loc='upper left', fontsize='10')
-
-        # Save:
+        print 'queue seebeck plot'
         plot_folder = filePath + '/Seebeck Plots/'
         if not os.path.exists(plot_folder):
             os.makedirs(plot_folder)
+        #end if
 
-        fig.savefig('%s.png' % (plot_folder + title) , dpi=dpi)
-
-        #plt.close()
+        # rendered in the background by the plot queue
+        self.plots.submit('%s.png' % (plot_folder + title), title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel)
     #end def
 
     #--------------------------------------------------------------------------
@@ -1116,6 +873,7 @@ class TakeData:
         ''' Function saving the files after the data acquisition loop has been
             exited.
         '''
+        self.plots.close()
 
         print('Save Files')
 
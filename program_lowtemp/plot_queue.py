@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : plot_queue
+Description: Renders the Seebeck fit plots in the background, so the
+             acquisition and processing loops never wait for a PNG.
+Comments: The workers draw on a bare matplotlib Figure with the Agg canvas
+          (no pyplot, imported in the worker), so no figure is kept in
+          pyplot's registry and each one is freed as soon as it is saved,
+          whatever backend the calling program uses. PlotQueue renders on one
+          thread and is the one to use in the wx GUIs: they create it from
+          their measurement thread, and forking a running wx process from a
+          thread is not safe (macOS in particular). PlotPool renders in
+          parallel in a pool of worker processes, for the batch processing
+          scripts, and must be created from the main thread of a program
+          without a GUI. The fit lines are straight, so they are drawn
+          through their two end points.
+"""
+import Queue
+import multiprocessing
+from threading import Thread
+import numpy as np
+
+#==============================================================================
+poll_interval = 0.5 # s, longest close waits on the worker before checking for Ctrl-C
+
+#------------------------------------------------------------------------------
+def plot_args(path, title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel):
+    """ Arguments of render_seebeck_plot, copied so the caller can go on to change its own. """
+    return (path, title, np.array(xalumel), np.array(xchromel),
+            np.array(yalumel), np.array(ychromel), dict(fitalumel), dict(fitchromel))
+#end def
+
+#------------------------------------------------------------------------------
+def render_seebeck_plot(path, title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel, dpi=400):
+    """ Saves the alumel and chromel voltages against dT and their fits to path. """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # Create Plot:
+    fig = Figure(dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.grid()
+    ax.set_title(title)
+    ax.set_xlabel("dT (K)")
+    ax.set_ylabel("dV (uV)")
+
+    # Plot data points:
+    ax.scatter(xalumel, yalumel, color='r', marker='.', label="alumel Voltage")
+    ax.scatter(xchromel, ychromel, color='b', marker='.', label="chromel Voltage")
+
+    # Overlay linear fits:
+    coeffsalumel = fitalumel['polynomial']
+    coeffschromel = fitchromel['polynomial']
+    xp = np.array([min(np.min(xalumel), np.min(xchromel)), max(np.max(xalumel), np.max(xchromel))])
+    alumel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffsalumel[0], coeffsalumel[1])
+    chromel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffschromel[0], coeffschromel[1])
+    ax.plot(xp, np.polyval(coeffsalumel, xp), '-', c='#FF9900', label="alumel Voltage Fit\n %s" % alumel_eq)
+    ax.plot(xp, np.polyval(coeffschromel, xp), '-', c='g', label="chromel Voltage Fit\n %s" % chromel_eq)
+
+    ax.legend(loc='upper left', fontsize='10')
+
+    # Save:
+    canvas.print_figure(path, dpi=dpi)
+    return path
+#end def
+
+###############################################################################
+class PlotQueue(Thread):
+    ''' Hands plot jobs to a worker thread that saves them in order. '''
+    #--------------------------------------------------------------------------
+    def __init__(self):
+        Thread.__init__(self)
+        self.jobs = Queue.Queue()
+        self.errors = []
+        self.daemon = True
+        self.start()
+    #end init
+
+    #--------------------------------------------------------------------------
+    def run(self):
+        while True:
+            args = self.jobs.get()
+            if args is None:
+                break
+            #end if
+            try:
+                render_seebeck_plot(*args)
+            except Exception as e:
+                self.errors.append(e)
+            #end except
+        #end while
+    #end def
+
+    #--------------------------------------------------------------------------
+    def submit(self, path, title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel):
+        """ Queue a plot and return immediately. """
+        self.jobs.put(plot_args(path, title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel))
+    #end def
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """ Wait for the queued plots to be saved and stop the worker. """
+        self.jobs.put(None)
+        while self.is_alive():
+            self.join(poll_interval)
+        #end while
+        for e in self.errors:
+            print 'Seebeck plot failed: ', e
+        #end for
+        self.errors = []
+    #end def
+
+#end class
+###############################################################################
+
+###############################################################################
+class PlotPool:
+    ''' Hands plot jobs to a pool of worker processes. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, processes=None):
+        self.pool = multiprocessing.Pool(processes) # one worker per core by default
+        self.jobs = []
+    #end init
+
+    #--------------------------------------------------------------------------
+    def submit(self, path, title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel):
+        """ Queue a plot and return immediately. """
+        args = plot_args(path, title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel)
+        self.jobs.append(self.pool.apply_async(render_seebeck_plot, args))
+        self.jobs = [job for job in self.jobs if not job.ready() or not job.successful()]
+    #end def
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        """ Wait for the queued plots to be saved and stop the workers. """
+        self.pool.close()
+        self.pool.join()
+        for job in self.jobs:
+            try:
+                job.get()
+            except Exception as e:
+                print 'Seebeck plot failed: ', e
+            #end except
+        #end for
+        self.jobs = []
+    #end def
+
+#end class
+###############################################################################
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : thermocouple
+Description: Seebeck coefficient of the thermocouple legs and the correction
+             of the measured voltages for it.
+Comments: The piecewise polynomials are the fits to Chromel_Seebeck.txt and
+          Alumel_Seebeck.txt that were written out term by term in every
+          program. The coefficients are stored highest order first and
+          evaluated with np.polyval (Horner's scheme), so alpha and
+          voltage_correction accept numbers or whole arrays.
+"""
+import numpy as np
+
+#==============================================================================
+# Piecewise fits of alpha (uV/K) against temperature (K):
+#   [(lower bound, upper bound, coefficients highest order first), ...]
+coefficients = {
+    'k-type': {
+        'chromel': [
+            (270, 700, [-4.30421084091e-24, 2.15928374212e-20, -4.8197269477e-17,
+                        6.30044607727e-14, -5.33914758601e-11, 3.06344710205e-08,
+                        -1.20477254034e-05, 0.00320554346691, -0.552110359087,
+                        55.6028987953, -2467.61114613]),
+            (700, 1599, [-4.19761748937e-25, 4.27299905603e-21, -1.93318725171e-17,
+                         5.10080771762e-14, -8.64369652227e-11, 9.73981855547e-08,
+                         -7.27785048931e-05, 0.0346344390853, -9.49622421414,
+                         1165.13254764]),
+            ],
+        'alumel': [
+            (270, 570, [3.48576207577e-20, -1.2391854625e-16, 1.91977765586e-13,
+                        -1.69831949233e-10, 9.4391002358e-08, -3.41263237031e-05,
+                        0.00801252041119, -1.17546754681, 97.4007289124,
+                        -3465.28789643]),
+            (570, 1599, [-1.23699936952e-26, 1.80403838088e-22, -1.27526741699e-18,
+                         4.969263632e-15, -1.14428153299e-11, 1.61971537881e-08,
+                         -1.41920634198e-05, 0.00747127856327, -2.17639940109,
+                         254.644633774]),
+            ],
+        },
+    }
+
+# The room temperature programs call the legs by the voltage they measure
+sides = {'high': 'chromel', 'low': 'alumel'}
+
+#------------------------------------------------------------------------------
+def alpha(x, side, tc_type='k-type'):
+    """
+    x = avgT (K), a number or an array
+    alpha in uV/K
+    """
+    x = np.asarray(x, dtype=float)
+    out = np.empty(x.shape)
+    out.fill(np.nan)
+    for lower, upper, coeffs in coefficients[tc_type][sides.get(side, side)]:
+        inside = (x >= lower) & (x < upper)
+        out[inside] = np.polyval(coeffs, x[inside])
+    #end for
+    if np.isnan(out).any():
+        raise ValueError("Error in voltage correction, out of range.")
+    #end if
+    if out.ndim == 0:
+        return float(out)
+    #end if
+    return out
+#end def
+
+#------------------------------------------------------------------------------
+def voltage_correction(raw, tempA, tempB, side, tc_type='k-type'):
+    """
+    raw must be in uV, tempA and tempB in C; numbers or arrays of equal length
+    """
+    tempA = np.asarray(tempA, dtype=float)
+    tempB = np.asarray(tempB, dtype=float)
+
+    # Kelvin conversion for polynomial correction.
+    dT = tempA - tempB
+    avgT = (tempA + tempB)/2 + 273.15
+
+    # Correction for effect from Thermocouple Seebeck
+    return alpha(avgT, side, tc_type)*dT - raw
+#end def
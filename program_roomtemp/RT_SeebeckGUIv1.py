@@ -23,7 +23,13 @@ from matplotlib.pyplot import gcf, setp
 import matplotlib.animation as animation # For plotting
 import pylab
 import numpy as np
-import visa # pyvisa, essential for communicating with the Keithley
+import instrument_sim
+if instrument_sim.enabled:
+    # SEEBECK_SIMULATE=1 runs against simulated instruments
+    visa = instrument_sim
+else:
+    import visa # pyvisa, essential for communicating with the Keithley
+#end if
 from threading import Thread # For threading the processes going on behind the GUI
 import time
 from datetime import datetime # for getting the current date and time
@@ -37,6 +43,9 @@ import EnhancedStatusBar as ESB
 
 # For finding sheet resistance:
 import RT_Seebeck_Processing_v1
+# thermocouple Seebeck coefficients
+import thermocouple
+from raw_store import RawStore
 
 #==============================================================================
 
@@ -72,6 +81,7 @@ filePath = 'global file path'
 
 # placer for files to be created
 myfile = 'global file'
+rawstore = 'global file' # full precision copy of the data file
 
 # Placers for the GUI plots:
 Vhigh_list = [0]
@@ -339,60 +349,9 @@ class TakeData:
         
         #print "average temp: %f K" %(tkelvin)
         
-        ### If Chromel, taken from Chromel_Seebeck.txt
-        if side == 'high':
-            if ( x >= 270 and x < 700):
-                alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                        -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                        -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                        -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                        -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                        -4.30421084091e-24*x**10
-                
-            #end if
-                
-            elif ( x >= 700 and x < 1599):
-                alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                        0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                        9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                        5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                        4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-                
-            #end if
-            
-            else:
-                print "Error in voltage correction, out of range."
-                
-        #end if (Chromel)
-        
-        ### If Alumel, taken from Alumel_Seebeck.txt
-        elif side == 'low':
-            if ( x >= 270 and x < 570):
-                alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                        -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                        -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                        -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                        -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-                
-            #end if
-                
-            elif ( x >= 570 and x < 1599):
-                alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                        0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                        1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                        4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                        1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-                
-            #end if
-                
-            else:
-                print "Error in voltage correction, out of range."
-                
-        #end if (Alumel)
-            
-        else:
-            print "Error in voltage correction."
-    
+        # 'high' is the chromel leg, 'low' the alumel leg
+        alpha = thermocouple.alpha(x, side)
+        
         print "alpha for %s: %f"% (side,alpha)
         return alpha
     #end def
@@ -402,6 +361,8 @@ class TakeData:
         print('Write data to file')
         myfile.write('%.2f,%f,%.2f,%f,%.2f,%f,%.2f,%f,' % (self.ttempA, self.tempA, self.ttempB, self.tempB, self.tVlow, self.Vlow, self.tVhigh, self.Vhigh) )
         myfile.write( '%.2f,%f,%.2f,%f,%.2f,%f,%.2f,%f\n' % (self.tVhigh2, self.Vhigh2, self.tVlow2, self.Vlow2, self.ttempB2, self.tempB2, self.ttempA2, self.tempA2) )
+        rawstore.append([self.ttempA, self.tempA, self.ttempB, self.tempB, self.tVlow, self.Vlow, self.tVhigh, self.Vhigh,
+                         self.tVhigh2, self.Vhigh2, self.tVlow2, self.Vlow2, self.ttempB2, self.tempB2, self.ttempA2, self.tempA2])
         
     #end def
     
@@ -427,12 +388,14 @@ class TakeData:
         global dataFile
         global finaldataFile
         global myfile
+        global rawstore
         
         stop = time.time()
         end = datetime.now() # End time
         totalTime = stop - self.start # Elapsed Measurement Time (seconds)
         
         myfile.close() # Close the file
+        rawstore.close()
         
         myfile = open(dataFile, 'r') # Opens the file for Reading
         contents = myfile.readlines() # Reads the lines of the file into python set
@@ -594,6 +557,7 @@ class UserPanel(wx.Panel):
         global dataFile
         global finaldataFile
         global myfile
+        global rawstore
         global abort_ID
         global Vhigh_list, tVhigh_list, Vlow_list, tVlow_list
         global tempA_list, ttempA_list, tempB_list, ttempB_list
@@ -613,6 +577,7 @@ class UserPanel(wx.Panel):
                 myfile = open(dataFile, 'w') # opens file for writing/overwriting
                 myfile.write('start time: ' + str(begin) + '\n')
                 myfile.write('time (s),tempA (C),time (s),tempB (C),time (s),Vlow (uV),time (s),Vhigh (uV),time (s),Vhigh2 (uV),time (s),Vlow2 (uV),time (s),tempB2 (C),time (s),tempA2 (C)\n')              
+                rawstore = RawStore(os.path.splitext(finaldataFile)[0] + '.raw', 'roomtemp', begin)
                 
                 # Global variables:
 
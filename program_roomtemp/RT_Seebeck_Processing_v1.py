@@ -25,6 +25,15 @@ import matplotlib.pyplot as plt
 # for creating new folders
 import os
 
+# thermocouple Seebeck coefficients
+import thermocouple
+
+# for linear fits
+from regression import fit_seebeck
+
+# for reading the binary copy of the data file
+import raw_store
+
 ###############################################################################
 class Process_Data:
     ''' Interpolates the data in order to get a common timestamp and outputs
@@ -129,85 +138,15 @@ class Process_Data:
         '''
         
         # Kelvin conversion for polynomial correction.
-        avgT_Kelvin = [None]*len(self.avgT)
-        for x in xrange(len(self.avgT)):
-            avgT_Kelvin[x] = self.avgT[x] + 273.15
+        avgT_Kelvin = np.array(self.avgT) + 273.15
         
         # Correction for effect from Thermocouple Seebeck
-        v_corrected = [None]*len(avgT_Kelvin)
-        for x in xrange(len(avgT_Kelvin)):
-            v_corrected[x] = self.alphacalc(avgT_Kelvin[x],side)*self.dT[x] - raw_data[x]
+        v_corrected = thermocouple.alpha(avgT_Kelvin, side)*np.array(self.dT) - np.array(raw_data)
         
-        return v_corrected
+        return v_corrected.tolist()
         
     #end def
         
-    #--------------------------------------------------------------------------
-    def alphacalc(self, x, side):
-        ''' x = avgT 
-            alpha in uV/K
-        '''
-        
-        ### If Chromel, taken from Chromel_Seebeck.txt
-        if side == 'high':
-            if ( x >= 270 and x < 700):
-                alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                        -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                        -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                        -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                        -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                        -4.30421084091e-24*x**10
-                
-            #end if
-                
-            elif ( x >= 700 and x < 1599):
-                alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                        0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                        9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                        5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                        4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-                
-            #end if
-            
-            else:
-                print "Error in voltage correction, out of range."
-                
-        #end if (Chromel)
-        
-        ### If Alumel, taken from Alumel_Seebeck.txt
-        elif side == 'low':
-            if ( x >= 270 and x < 570):
-                alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                        -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                        -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                        -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                        -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-                
-            #end if
-                
-            elif ( x >= 570 and x < 1599):
-                alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                        0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                        1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                        4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                        1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-                
-            #end if
-                
-            else:
-                print "Error in voltage correction, out of range."
-                
-        #end if (Alumel)
-            
-        else:
-            print "Error in voltage correction."
-        
-        #end if (K-type)
-        
-        return alpha
-    
-    #end def
-        
     #--------------------------------------------------------------------------
     def calculate_seebeck(self):
         '''
@@ -218,8 +157,10 @@ class Process_Data:
         y_Vlow = self.Vlow_int_corrected
         y_Vhigh = self.Vhigh_int_corrected
         
-        Vlow_fit = self.polyfit(x,y_Vlow,1)
-        Vhigh_fit = self.polyfit(x,y_Vhigh, 1)
+        # high is the chromel side and low the alumel side
+        Vhigh_line, Vlow_line = fit_seebeck(x, y_Vhigh, y_Vlow)
+        Vlow_fit = self.fit_results(Vlow_line)
+        Vhigh_fit = self.fit_results(Vhigh_line)
         
         self.create_plot(x, y_Vlow, Vlow_fit, title='low seebeck plot')
         self.create_plot(x, y_Vhigh, Vhigh_fit, title='high seebeck plot')
@@ -230,29 +171,18 @@ class Process_Data:
     #end def
             
     #--------------------------------------------------------------------------
-    def polyfit(self, x, y, degree):
+    def fit_results(self, line):
         '''
-        Returns the polynomial fit for x and y of degree degree along with the
-        r^2 and the temperature, all in dictionary form.
+        Returns the linear fit (slope, offset, r^2, slope standard error) as
+        the polynomial coefficients along with the r^2 and the standard
+        error, all in dictionary form.
         '''
         results = {}
-    
-        coeffs = np.polyfit(x, y, degree)
-    
-        # Polynomial Coefficients
-        results['polynomial'] = coeffs.tolist()
         
-        # Calculate coefficient of determination (r-squared):
-        p = np.poly1d(coeffs)
-        # fitted values:
-        yhat = p(x)                      # or [p(z) for z in x]
-        # mean of values:
-        ybar = np.sum(y)/len(y)          # or sum(y)/len(y)
-        # regression sum of squares:
-        ssreg = np.sum((yhat-ybar)**2)   # or sum([ (yihat - ybar)**2 for yihat in yhat])
-        # total sum of squares:
-        sstot = np.sum((y - ybar)**2)    # or sum([ (yi - ybar)**2 for yi in y])
-        results['r-squared'] = ssreg / sstot
+        slope, offset, rsquared, stderr = line
+        results['polynomial'] = [slope, offset]
+        results['r-squared'] = rsquared
+        results['stderr'] = stderr
     
         return results
     
@@ -328,6 +258,15 @@ class Process_Data:
 #--------------------------------------------------------------------------
 def extract_Data(filePath):
     
+    # Memory-map the binary copy of the data file if there is one; the
+    # columns are only read as they are used
+    raw = os.path.splitext(filePath)[0] + '.raw'
+    if os.path.exists(raw):
+        header, data = raw_store.open_mapped(raw)
+        print('Successfully mapped ' + raw)
+        return tuple([data[name] for name in raw_store.layouts['roomtemp']['fields']])
+    #end if
+    
     f = open(filePath)
     loadData = f.read()
     f.close()
@@ -37,6 +37,8 @@ import EnhancedStatusBar as ESB
 
 # For finding sheet resistance:
 import RT_Seebeck_Processing_v1
+# thermocouple Seebeck coefficients
+import thermocouple
 
 #==============================================================================
 
@@ -323,80 +325,12 @@ class TakeData:
         avgT = (tempA + tempB)/2
         
         # Correction for effect from Thermocouple Seebeck
-        out = self.alpha(avgT, side)*self.dT - raw_data
+        out = thermocouple.alpha(avgT, side, tc_type)*self.dT - raw_data
         
         return out
         
     #end def
      
-    #--------------------------------------------------------------------------
-    def alpha(self, x, side):
-        ''' x = avgT 
-            alpha in uV/K
-        '''
-        
-        if tc_type == "k-type":
-            
-            ### If Chromel, taken from Chromel_Seebeck.txt
-            if side == 'high':
-                if ( x >= 270 and x < 700):
-                    alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                            -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                            -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                            -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                            -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                            -4.30421084091e-24*x**10
-                    
-                #end if
-                    
-                elif ( x >= 700 and x < 1599):
-                    alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                            0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                            9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                            5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                            4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-                    
-                #end if
-                
-                else:
-                    print "Error in voltage correction, out of range."
-                    
-            #end if (Chromel)
-            
-            ### If Alumel, taken from Alumel_Seebeck.txt
-            elif side == 'low':
-                if ( x >= 270 and x < 570):
-                    alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                            -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                            -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                            -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                            -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-                    
-                #end if
-                    
-                elif ( x >= 570 and x < 1599):
-                    alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                            0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                            1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                            4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                            1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-                    
-                #end if
-                    
-                else:
-                    print "Error in voltage correction, out of range."
-                    
-            #end if (Alumel)
-                
-            else:
-                print "Error in voltage correction."
-        
-        #end if (K-type)
-        
-        return alpha
-    
-    #end def
-    
     #--------------------------------------------------------------------------
     def write_data_to_file(self):
         print('Write data to file')
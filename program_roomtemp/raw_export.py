@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : raw_export
+Description: Writes a .raw store (Status.raw, Data.raw) back out as the csv
+             file it was logged alongside, so the existing processing scripts
+             can read it.
+Comments: By default the numbers are formatted as in the original files. With
+          --full every value is written with all 17 significant digits. Other
+          layouts are always written at full precision. Without a csv path
+          the output is <store>_export.csv, so the Status.csv or Data.csv
+          logged next to the store is never replaced. An existing file is
+          only overwritten with --force.
+
+          usage: python raw_export.py [--full] [--force] Status.raw [out.csv]
+"""
+import os
+import sys
+import numpy as np
+
+import raw_store
+
+#==============================================================================
+flag_text = {1.0: 'OK', 0.0: 'NO'}
+indicator_text = {1.0: ',Start Oscillation', -1.0: ',Stop Oscillation', 0.0: ', '}
+
+#------------------------------------------------------------------------------
+def number(fmt, full):
+    if full:
+        return lambda x: '%.17g' % (x)
+    #end if
+    return lambda x: fmt % (x)
+#end def
+
+#------------------------------------------------------------------------------
+def stability(x):
+    """ stabilityA/B are written with str(), '-' until there are enough points. """
+    if np.isnan(x):
+        return '-'
+    #end if
+    return str(x)
+#end def
+
+#------------------------------------------------------------------------------
+def status_line(row, full=False):
+    n1, n2, n3 = number('%.1f', full), number('%.2f', full), number('%.3f', full)
+    values = [n1(row['time']),
+              n2(row['sampletempA']), n2(row['samplesetpointA']), n2(row['blocktempA']), stability(row['stabilityA']),
+              n2(row['sampletempB']), n2(row['samplesetpointB']), n2(row['blocktempB']), stability(row['stabilityB']),
+              n3(row['chromelvoltageraw']), n3(row['chromelvoltagecalc']),
+              n3(row['alumelvoltageraw']), n3(row['alumelvoltagecalc']),
+              flag_text[float(row['tolerance'])], flag_text[float(row['stability'])]]
+    return ','.join(values) + '\n'
+#end def
+
+#------------------------------------------------------------------------------
+def data_line(row, full=False):
+    n3, n4, n6 = number('%.3f', full), number('%.4f', full), number('%.6f', full)
+    values = [n3(row['time']),
+              n4(row['tempA']), n4(row['tempB']), n4(row['avgT']), n4(row['dT']),
+              n6(row['Vchromel']), n6(row['Valumel'])]
+    return ','.join(values) + indicator_text[float(row['indicator'])] + '\n'
+#end def
+
+#------------------------------------------------------------------------------
+def plain_line(row, full=True):
+    return ','.join(['%.17g' % (x) for x in row]) + '\n'
+#end def
+
+#==============================================================================
+lines = {'status': status_line, 'data': data_line}
+
+#------------------------------------------------------------------------------
+def export(path, csvpath=None, full=False, overwrite=False):
+    """
+    Writes the store at path as csv, to <store>_export.csv next to it by
+    default. Raises IOError if the csv file exists, unless overwrite is set.
+    Returns the csv path.
+    """
+    if csvpath is None:
+        csvpath = os.path.splitext(path)[0] + '_export.csv'
+    #end if
+    if os.path.exists(csvpath) and not overwrite:
+        raise IOError('%s already exists, use --force to overwrite it' % (csvpath))
+    #end if
+    header, data = raw_store.read(path)
+    layout = raw_store.layouts[header['layout']]
+    line = lines.get(header['layout'], plain_line)
+    with open(csvpath, 'w') as f:
+        if layout['title'] is not None:
+            f.write(layout['title'] + '\n')
+        #end if
+        f.write('Start Time: ' + header['start'] + '\n')
+        f.write(layout['headers'])
+        for row in data:
+            f.write(line(row, full))
+        #end for
+    #end with
+    return csvpath
+#end def
+
+#==============================================================================
+if __name__=='__main__':
+    args = sys.argv[1:]
+    full = '--full' in args
+    force = '--force' in args
+    args = [arg for arg in args if arg not in ('--full', '--force')]
+    if not 1 <= len(args) <= 2:
+        print __doc__
+        sys.exit(1)
+    #end if
+    try:
+        csvpath = export(args[0], (args[1:] or [None])[0], full, force)
+    except IOError as e:
+        print e
+        sys.exit(1)
+    #end except
+    print 'written: ', csvpath
+#end if
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : raw_store
+Description: Append-only binary log of the rows written to the Status.csv and
+             Data.csv files, at full float64 precision, and its readers.
+Comments: A store is a fixed size text header (magic line, then one line of
+          JSON with the layout, field names and start time, padded with
+          spaces) followed by fixed width little-endian float64 records, one
+          per row. Rows are appended and flushed as they are taken, so a run
+          that is stopped loses at most the row being written; readers ignore
+          a partial last record. The fixed record width lets a store be read
+          with one np.fromfile call, or memory-mapped (open_mapped) so that an
+          analysis only pages in the rows and columns it uses: time_range
+          finds a time window with a binary search, and select scans one
+          column in chunks, so memory stays bounded for any file size. Text
+          columns are stored as numbers: 'OK'/'NO' as 1/0, '-' as nan, and
+          the data file indicator as 1 (start oscillation), -1 (stop) or 0.
+"""
+import os
+import json
+import numpy as np
+
+#==============================================================================
+MAGIC = 'SEEBECK RAW 1\n'
+HEADER_SIZE = 1024 # bytes, records start here
+record_type = '<f8'
+
+# Columns and legacy csv layout of each kind of store
+layouts = {
+    'status': {
+        'title': 'System Status',
+        'fields': ['time', 'sampletempA', 'samplesetpointA', 'blocktempA', 'stabilityA',
+                   'sampletempB', 'samplesetpointB', 'blocktempB', 'stabilityB',
+                   'chromelvoltageraw', 'chromelvoltagecalc', 'alumelvoltageraw', 'alumelvoltagecalc',
+                   'tolerance', 'stability'],
+        'headers': 'time (s), sampletempA (C), samplesetpointA (C), blocktempA (C), stabilityA (C/min), sampletempB (C), samplesetpointB (C), blocktempB (C), stabilityB (C/min),'
+                   'chromelvoltageraw (uV), chromelvoltagecalc (uV), alumelvoltageraw(C), alumelvoltagecalc (uV), tolerance, stability\n',
+        },
+    'data': {
+        'title': 'Seebeck Data File',
+        'fields': ['time', 'tempA', 'tempB', 'avgT', 'dT', 'Vchromel', 'Valumel', 'indicator'],
+        'headers': 'time (s), tempA (C), tempB (C), avgtemp (C), deltatemp (C), Vchromel (uV), Valumel (uV), indicator\n',
+        },
+    # Data.csv of programs/SeebeckCLI3
+    'cli3': {
+        'title': None,
+        'fields': ['time', 'tempA', 'tempB', 'avgT', 'dT', 'Vch', 'Val'],
+        'headers': 'time (s),tempA (C),tempB (C),avgtemp (C),deltatemp (C),Vchromel (uV),Valumel (uV)\n',
+        },
+    # PID_Data.csv of programs/SeebeckCLI3
+    'pid': {
+        'title': None,
+        'fields': ['time', 'sampletempA', 'blocktempA', 'setpointA',
+                   'sampletempB', 'blocktempB', 'setpointB', 'avgT', 'dT'],
+        'headers': 'time,sampletempA,blocktempA,setpointA,sampletempB,blocktempB,setpointB,avgT,dT\n',
+        },
+    # Data.csv of program_roomtemp/RT_SeebeckGUIv1
+    'roomtemp': {
+        'title': None,
+        'fields': ['ttempA', 'tempA', 'ttempB', 'tempB', 'tVlow', 'Vlow', 'tVhigh', 'Vhigh',
+                   'tVhigh2', 'Vhigh2', 'tVlow2', 'Vlow2', 'ttempB2', 'tempB2', 'ttempA2', 'tempA2'],
+        'headers': 'time (s),tempA (C),time (s),tempB (C),time (s),Vlow (uV),time (s),Vhigh (uV),time (s),Vhigh2 (uV),time (s),Vlow2 (uV),time (s),tempB2 (C),time (s),tempA2 (C)\n',
+        },
+    }
+
+flags = {'OK': 1.0, 'NO': 0.0, '-': np.nan}
+indicators = {'start': 1.0, 'stop': -1.0, 'none': 0.0}
+
+#------------------------------------------------------------------------------
+def encode(value):
+    """ Number to store for a value written to the csv files. """
+    if isinstance(value, basestring):
+        return flags[value]
+    #end if
+    return float(value)
+#end def
+
+#------------------------------------------------------------------------------
+def dtype(fields):
+    return np.dtype([(str(name), record_type) for name in fields])
+#end def
+
+###############################################################################
+class RawStore:
+    ''' Appends rows of one layout to a binary store. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, path, layout, start='', resume=False):
+        """
+        Creates the store at path, or with resume=True carries on appending to
+        an existing one (a partial last record is dropped).
+        """
+        self.path = path
+        self.layout = layout
+        self.fields = layouts[layout]['fields']
+        if resume and os.path.exists(path):
+            header = read_header(path)
+            if header['layout'] != layout:
+                raise ValueError("%s is a %s store, not %s" % (path, header['layout'], layout))
+            #end if
+            self.file = open(path, 'r+b')
+            self.file.truncate(HEADER_SIZE + count(path, header)*dtype(self.fields).itemsize)
+            self.file.seek(0, os.SEEK_END)
+            return
+        #end if
+        header = json.dumps({'layout': layout, 'fields': self.fields, 'start': str(start)})
+        header = MAGIC + header
+        if len(header) >= HEADER_SIZE:
+            raise ValueError("raw store header too long")
+        #end if
+        self.file = open(path, 'wb')
+        self.file.write(header + ' '*(HEADER_SIZE - len(header) - 1) + '\n')
+        self.file.flush()
+    #end init
+
+    #--------------------------------------------------------------------------
+    def append(self, row):
+        row = np.asarray([encode(value) for value in row], dtype=record_type)
+        if len(row) != len(self.fields):
+            raise ValueError("%s row has %d values, expected %d" % (self.layout, len(row), len(self.fields)))
+        #end if
+        self.file.write(row.tostring())
+        self.file.flush()
+    #end def
+
+    #--------------------------------------------------------------------------
+    def sync(self):
+        """ Waits until the appended rows are on the disk. """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    #end def
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        self.file.close()
+    #end def
+
+#end class
+###############################################################################
+
+#------------------------------------------------------------------------------
+def read_header(path):
+    """ The layout, fields and start time of a store, as a dictionary. """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    #end with
+    if not header.startswith(MAGIC):
+        raise ValueError("%s is not a raw data store" % (path))
+    #end if
+    return json.loads(header[len(MAGIC):].strip())
+#end def
+
+#------------------------------------------------------------------------------
+def count(path, header=None):
+    """ Number of complete records in a store. """
+    if header is None:
+        header = read_header(path)
+    #end if
+    return (os.path.getsize(path) - HEADER_SIZE) // dtype(header['fields']).itemsize
+#end def
+
+#------------------------------------------------------------------------------
+def read(path):
+    """ Returns the header and all complete records as a structured array. """
+    header = read_header(path)
+    with open(path, 'rb') as f:
+        f.seek(HEADER_SIZE)
+        data = np.fromfile(f, dtype=dtype(header['fields']), count=count(path, header))
+    #end with
+    return header, data
+#end def
+
+#------------------------------------------------------------------------------
+def open_mapped(path):
+    """
+    Returns the header and the complete records as a read only memory-mapped
+    structured array; nothing is read until it is used.
+    """
+    header = read_header(path)
+    n = count(path, header)
+    if n == 0:
+        return header, np.zeros(0, dtype(header['fields']))
+    #end if
+    data = np.memmap(path, dtype=dtype(header['fields']), mode='r', offset=HEADER_SIZE, shape=(n,))
+    return header, data
+#end def
+
+#------------------------------------------------------------------------------
+def last_time(path, field='time'):
+    """ Time of the last complete record of a store, 0 if it has none. """
+    if not os.path.exists(path):
+        return 0.0
+    #end if
+    header, data = open_mapped(path)
+    if len(data) == 0:
+        return 0.0
+    #end if
+    return float(data[field][-1])
+#end def
+
+#------------------------------------------------------------------------------
+def time_range(data, tmin=None, tmax=None, field='time'):
+    """
+    Slice of the records with tmin <= time <= tmax. The time stamps increase,
+    so only the pages touched by the binary search are read.
+    """
+    t = data[field]
+    start = 0 if tmin is None else np.searchsorted(t, tmin, side='left')
+    stop = len(t) if tmax is None else np.searchsorted(t, tmax, side='right')
+    return slice(start, stop)
+#end def
+
+#------------------------------------------------------------------------------
+def select(data, field, low, high, chunk=1048576):
+    """
+    Indices of the records with low <= field <= high (e.g. an avgT range),
+    found by scanning the column 'chunk' records at a time.
+    """
+    found = []
+    for start in xrange(0, len(data), chunk):
+        column = np.asarray(data[field][start:start+chunk])
+        found.append(start + np.flatnonzero((column >= low) & (column <= high)))
+    #end for
+    if not found:
+        return np.zeros(0, int)
+    #end if
+    return np.concatenate(found)
+#end def
@@ -4,7 +4,13 @@ Created on 26-02-2016
 Bobby McKinney
 PID initial program
 """
-import omegacn7500
+import instrument_sim
+if instrument_sim.enabled:
+    # SEEBECK_SIMULATE=1 runs against simulated instruments
+    omegacn7500 = instrument_sim
+else:
+    import omegacn7500
+#end if
 import time
 
 def PIDrun(pid1,pid2,pid3,pid4):
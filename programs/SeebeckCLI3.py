@@ -5,11 +5,18 @@ Created: 2016-02-09
 @author: Bobby McKinney (bobbymckinney@gmail.com)
 """
 import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
-import minimalmodbus as modbus # For communicating with the cn7500s
-import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
-import visa # pyvisa, essential for communicating with the Keithley
+import instrument_sim
+if instrument_sim.enabled:
+    # SEEBECK_SIMULATE=1 runs against simulated instruments
+    modbus = omegacn7500 = visa = instrument_sim
+else:
+    import minimalmodbus as modbus # For communicating with the cn7500s
+    import omegacn7500 # Driver for cn7500s under minimalmodbus, adds a few easy commands
+    import visa # pyvisa, essential for communicating with the Keithley
+#end if
 import time
 from datetime import datetime # for getting the current date and time
 import exceptions
@@ -20,10 +27,27 @@ from SeebeckProcessingContinuous import SeebeckContinuousProcessing
 #from PIDprogram_import import PID_Program_import
 from PIDprogramrun import PIDrun
 from PIDprogramstop import PIDstop
+from pid_bus import PIDBus
+from acquisition import AcquisitionScheduler
+from thermocouple import voltage_correction
+from raw_store import RawStore
+from checkpoint import Checkpoint, rebuild
 
 #==============================================================================
 version = '1.0 (2016-02-25)'
 
+# Time (s) between forcing the Data.raw/PID_Data.raw checkpoints onto the disk
+sync_interval = 900
+
+# Lists of Main restored from each field of the checkpoint logs by --resume
+checkpoint_lists = {
+    'data': {'time': 'time_list', 'tempA': 'TA_list', 'tempB': 'TB_list', 'avgT': 'avgT_list',
+             'dT': 'dT_list', 'Vch': 'Vch_list', 'Val': 'Val_list'},
+    'pid': {'time': 'pidtime_list', 'sampletempA': 'pidAsample_list', 'blocktempA': 'pidAblock_list',
+            'setpointA': 'pidAsetpoint_list', 'sampletempB': 'pidBsample_list', 'blocktempB': 'pidBblock_list',
+            'setpointB': 'pidBsetpoint_list', 'avgT': 'pidavgT_list', 'dT': 'piddT_list'},
+    }
+
 # Keeps Windows from complaining that the port is already open:
 modbus.CLOSE_PORT_AFTER_EACH_CALL = True
 
@@ -64,6 +88,80 @@ class Keithley_2700:
         return data # Fetches Reading
     #end def
 
+    #--------------------------------------------------------------------------
+    def configure_scan(self, channels, passes=2):
+        """
+        Program the internal scan list once so that a single trigger reads
+        every channel 'passes' times into the buffer.
+        """
+        self.scan_channels = channels
+        self.scan_count = len(channels)*passes
+        self.ctrl.write(":INITiate:CONTinuous OFF")
+        self.ctrl.write(":TRIGger:SOURce IMMediate")
+        self.ctrl.write(":TRIGger:COUNt 1")
+        self.ctrl.write(":SAMPle:COUNt %d" % (self.scan_count)) # One sample per channel per pass
+        self.ctrl.write(":ROUTe:SCAN:INTernal (@ %s)" % (','.join(channels))) # Specify Channels
+        self.ctrl.write(":ROUTe:SCAN:TSOurce IMMediate")
+        self.ctrl.write(":ROUTe:SCAN:LSELect INTernal") # Use the internal scan list
+        self.ctrl.write(":FORMat:ELEMents READing, TSTamp, CHANnel")
+        self.ctrl.write(":TRACe:TSTamp:FORMat ABSolute") # Timestamps relative to first reading
+        self.ctrl.write(":TRACe:POINts %d" % (self.scan_count))
+        self.ctrl.write(":TRACe:FEED SENSe1")
+    #end def
+
+    #--------------------------------------------------------------------------
+    def scan(self):
+        """
+        Trigger the scan list once and read the whole buffer.
+        Returns a dictionary of channel: [(timestamp, reading), ...] with the
+        timestamps in seconds from the first reading of the scan.
+        """
+        while True:
+            try:
+                self.ctrl.write(":TRACe:CLEar")
+                self.ctrl.write(":TRACe:FEED:CONTrol NEXT")
+                self.ctrl.write(":INITiate") # Trigger the scan
+                self.ctrl.query("*OPC?") # Returns once the scan has completed
+                data = self.ctrl.query(":TRACe:DATA?")
+                readings = self.parse_scan(data)
+                break
+            except ValueError as VE:
+                print VE
+            except IOError as IE:
+                print IE
+        #end while
+        return readings
+    #end def
+
+    #--------------------------------------------------------------------------
+    def parse_scan(self, data):
+        """
+        Split the buffer into (reading, timestamp, channel) triplets. Each
+        element has its units appended (e.g. '+1.2E-06VDC,+0.412SECS,107INTCHAN')
+        """
+        elements = str(data).strip().split(',')
+        if len(elements) != 3*self.scan_count:
+            raise ValueError('incomplete scan: %d elements' % (len(elements)))
+        #end if
+        readings = {}
+        for channel in self.scan_channels:
+            readings[channel] = []
+        #end for
+        for n in range(0, len(elements), 3):
+            value = float(self.strip_units(elements[n]))
+            stamp = float(self.strip_units(elements[n+1]))
+            channel = str(int(self.strip_units(elements[n+2])))
+            readings[channel].append((stamp, value))
+        #end for
+        return readings
+    #end def
+
+    #--------------------------------------------------------------------------
+    def strip_units(self, element):
+        """ Remove the unit suffix (VDC, C, SECS, INTCHAN) from a buffer element """
+        return element.strip().rstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ#')
+    #end def
+
     #--------------------------------------------------------------------------
     def openAllChannels(self):
         self.ctrl.write("ROUTe:OPEN:ALL")
@@ -101,19 +199,30 @@ class PID(omegacn7500.OmegaCN7500):
 
 ###############################################################################
 class Main:
-    def __init__(self):
+    def __init__(self, resume=None):
+        """
+        Starts a new run, or with resume set to the folder of a run that
+        crashed carries on with it: the data so far is read back from the
+        checkpoint logs and the new rows are appended to the same files. The
+        cn7500s keep running their program without the computer, so it is not
+        restarted.
+        """
         self.Setup()
         
-        self.Get_User_Input()
-        self.open_files()
-        
-        
-        #start the PID program
-        PIDrun(self.sampleApid,self.sampleBpid,self.blockApid,self.blockBpid)
+        if resume is None:
+            self.Get_User_Input()
+            self.open_files()
+            
+            #start the PID program
+            PIDrun(self.sampleApid,self.sampleBpid,self.blockApid,self.blockBpid)
+        #end if
+        else:
+            self.Get_Profile()
+            self.reopen_files(resume)
+        #end else
         
         self.abort = 0
         self.start = time.time()
-        self.backuptime = time.time()
         self.pidtime = time.time()
         self.time = time.time() - self.start
         self.delay = 0.1
@@ -136,23 +245,30 @@ class Main:
         self.pidBsetpoint_list = []
         self.pidavgT_list = []
         self.piddT_list = []
+        if resume is not None:
+            self.restore(resume)
+        #end if
         
-        self.pid_measurement()
-        self.safety_check()
+        # Separate worker threads for the Modbus and GPIB buses
+        self.acquisition = AcquisitionScheduler(['pid', 'keithley'])
         
         try:
+            self.pid_measurement(self.acquisition.acquire({'pid': self.read_pid})['pid'])
+            self.safety_check()
             while True:
-                self.seebeck_measurement()
-                self.write_data_to_file()
+                # The pid is read while the Keithley scans, whenever it is due
+                jobs = {'keithley': self.k2700.scan}
                 if time.time() - self.pidtime > 120:
-                    self.pid_measurement()
+                    jobs['pid'] = self.read_pid
+                #end if
+                samples = self.acquisition.acquire(jobs)
+                self.seebeck_measurement(samples['keithley'])
+                self.write_data_to_file()
+                if 'pid' in samples:
+                    self.pid_measurement(samples['pid'])
                     self.safety_check()
                     self.pidtime = time.time()
                 #end if
-                if time.time() - self.backuptime > 900:
-                    self.create_backup_file()
-                    self.backuptime = time.time()
-                #end if
                 if self.abort == 1:
                     print '\n****\nprogram ended\nsaving files at current location\n****\n'
                     break
@@ -161,6 +277,10 @@ class Main:
         #end try
         except KeyboardInterrupt:
             print '\n****\nprogram ended\nsaving files at current location\n****\n'
+        #end except
+        finally:
+            self.acquisition.stop()
+        #end finally
         self.save_files()
         print "Huzzah! Your program finished! You are awesome, sir or maam!"
         PIDstop(self.sampleApid,self.sampleBpid,self.blockApid,self.blockBpid)
@@ -180,6 +300,9 @@ class Main:
         self.sampleBpid = PID('/dev/cu.usbserial', 2) # Bottom heater
         self.blockApid = PID('/dev/cu.usbserial', 3) # Top block
         self.blockBpid = PID('/dev/cu.usbserial', 4) # Top block
+        # All four controllers share one serial line:
+        self.pidbus = PIDBus([('sampleA', self.sampleApid), ('sampleB', self.sampleBpid),
+                              ('blockA', self.blockApid), ('blockB', self.blockBpid)])
 
 
         """
@@ -195,6 +318,9 @@ class Main:
         # Sets the the acquisition rate of the measurements
         self.k2700.ctrl.write(":SENSe1:VOLTage:DC:NPLCycles 5, (@ 107,108)") # Sets integration period based on frequency
         self.k2700.ctrl.write(":SENSe1:TEMPerature:NPLCycles 5, (@ 117,118)")
+        # TA, TB, Vch, Val, Val, Vch, TB, TA per trigger: the paired readings
+        # share one time centre, so a linear drift cancels in their averages
+        self.k2700.configure_scan(['117','118','107','108','108','107','118','117'], passes=1)
     #end def
     #--------------------------------------------------------------------------
     def Get_User_Input(self):
@@ -207,6 +333,11 @@ class Main:
             self.folder_name = 'Seebeck_Data %s.%s.%s' % (date[0:13], date[14:16], date[17:19])
         #end if
         self.make_new_folder(self.folder_name)
+        self.Get_Profile()
+    #end def
+    
+    #--------------------------------------------------------------------------
+    def Get_Profile(self):
         while True:
             try:
                 choices1 = '\n1: 200C\n2: 225C\n3: 250C\n4: 275C\n5: 300C\n6: 325C\n7: 350C\n8: 375C\n9: 400C\n10: 425C\n11: 450C\n12: 475C\n13: 500C\n'
@@ -305,6 +436,7 @@ class Main:
 
         dataheaders = 'time (s),tempA (C),tempB (C),avgtemp (C),deltatemp (C),Vchromel (uV),Valumel (uV)\n'
         self.datafile.write(dataheaders)
+        self.datastore = RawStore('Data.raw', 'cli3', begin) # full precision copy of Data.csv
 
         statusheaders1 = 'time (s),tempA1 (C),tempA2 (C),tempB1 (C),tempB2 (C),'
         statusheaders2 = 'chromelvoltagecalc1 (uV),chromelvoltagecalc2 (uV),chromelvoltagecalc1 (uV),chromelvoltagecalc2 (uV)\n'
@@ -312,6 +444,44 @@ class Main:
         
         pidheaders = 'time,sampletempA,blocktempA,setpointA,sampletempB,blocktempB,setpointB,avgT,dT\n'
         self.pidfile.write(pidheaders)
+
+        # write-ahead logs of every sample, see checkpoint.rebuild
+        self.pidstore = RawStore('PID_Data.raw', 'pid', begin)
+        self.checkpoint = Checkpoint({'data': self.datastore, 'pid': self.pidstore}, sync_interval)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def reopen_files(self, folder):
+        """ Opens the files of the run in folder to append to them. """
+        self.filePath = folder
+        os.chdir(self.filePath)
+        self.datafile = append_lines('Data.csv')
+        self.statusfile = append_lines('Status.csv')
+        self.pidfile = append_lines('PID_Data.csv')
+        self.datastore = RawStore('Data.raw', 'cli3', resume=True)
+        self.pidstore = RawStore('PID_Data.raw', 'pid', resume=True)
+        self.checkpoint = Checkpoint({'data': self.datastore, 'pid': self.pidstore}, sync_interval)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def restore(self, folder):
+        """
+        Fills the data lists from the checkpoint logs of the run in folder
+        and moves the start of the clock back, so the time carries on from
+        the last row.
+        """
+        lists = rebuild(folder)
+        last = 0
+        for stream in lists:
+            for field in checkpoint_lists[stream]:
+                setattr(self, checkpoint_lists[stream][field], lists[stream][field])
+            #end for
+            if lists[stream]['time']:
+                last = max(last, lists[stream]['time'][-1])
+            #end if
+        #end for
+        self.start -= last
+        print 'resumed at %.1f s with %d data and %d pid rows' % (last, len(self.time_list), len(self.pidtime_list))
     #end def
 
     #--------------------------------------------------------------------------
@@ -333,53 +503,27 @@ class Main:
     #end def
 
     #--------------------------------------------------------------------------
-    def pid_measurement(self):
+    def read_pid(self):
+        # One register read per controller for pv and setpoint, plus the run state of the sample heaters
+        return self.pidbus.snapshot(running=['sampleA','sampleB'])
+    #end def
+
+    #--------------------------------------------------------------------------
+    def pid_measurement(self, sample):
         print '\ntake data from pid controller'
-        while True:
-            try:
-                time.sleep(0.1)
-                # Take temp data
-                self.sampletempA = float(self.sampleApid.get_pv())
-                self.samplesetpointA = float(self.sampleApid.get_setpoint())
-                self.blocktempA = float(self.blockApid.get_pv())
-                break
-            #end try
-            except IOError:
-                print IOError
-            #end except
-        #end while
-        self.time_pidA = time.time() - self.start
+        snapshot = sample.data
+        self.sampletempA = snapshot.pv['sampleA']
+        self.samplesetpointA = snapshot.setpoint['sampleA']
+        self.blocktempA = snapshot.pv['blockA']
+        self.sampletempB = snapshot.pv['sampleB']
+        self.samplesetpointB = snapshot.setpoint['sampleB']
+        self.blocktempB = snapshot.pv['blockB']
+        self.pidArunning = snapshot.running['sampleA']
+        self.pidBrunning = snapshot.running['sampleB']
+        self.time_pidA = self.time_pidB = sample.time - self.start
         print "sampletempA: %.2f C\tblocktempA: %.2f\tsetpointA: %.2f C" % (self.sampletempA,self.blocktempA,self.samplesetpointA)
-        
-        time.sleep(self.delay)
-        while True:
-            try:
-                time.sleep(0.1)
-                # Take temp data
-                self.sampletempB = float(self.sampleBpid.get_pv())
-                self.samplesetpointB = float(self.sampleBpid.get_setpoint())
-                self.blocktempB = float(self.blockBpid.get_pv())
-                break
-            #end try
-            except IOError:
-                print IOError
-            #end except
-        #end while
-        self.time_pidB = time.time() - self.start
         print "sampletempB: %.2f C\tblocktempB: %.2f\tsetpointB: %.2f C" % (self.sampletempB,self.blocktempB,self.samplesetpointB)
-        
-        while True:
-            try:
-                time.sleep(0.1)
-                # Take temp data
-                self.pidArunning = self.sampleApid.is_running()
-                self.pidBrunning = self.sampleBpid.is_running()
-                break
-            #end try
-            except IOError:
-                print IOError
-            #end except
-        #end while
+
         if self.pidArunning == False and self.pidBrunning == False:
             self.abort = 1
         #end if
@@ -400,136 +544,64 @@ class Main:
         
         print 'write pid data to file\n'
         self.pidfile.write('%.2f,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f\n'%(Time,self.sampletempA,self.blocktempA,self.samplesetpointA,self.sampletempB,self.blocktempB,self.samplesetpointB,avgT,dT))
+        self.checkpoint.append('pid', [Time,self.sampletempA,self.blocktempA,self.samplesetpointA,self.sampletempB,self.blocktempB,self.samplesetpointB,avgT,dT])
     #end def
     
     #--------------------------------------------------------------------------
-    def seebeck_measurement(self):
+    def seebeck_measurement(self, sample):
         # Takes and writes to file the data on the Keithley
         # The only change between blocks like this one is the specific
         # channel on the Keithley that is being measured.
         t,ct = self.getTime()
         print '\ncurrent time: %s\nrun time: %s\n' % (ct, t)
         
-        self.TempA = float(self.k2700.fetch('117'))
-        self.time_TempA = time.time() - self.start
+        # One trigger reads every channel twice, in palindromic order, each with its own timestamp
+        self.time_scan = sample.start - self.start
+        readings = sample.data
+        (stamp_TempA, TempA), (stamp_TempA2, TempA2) = readings['117']
+        (stamp_TempB, TempB), (stamp_TempB2, TempB2) = readings['118']
+        (stamp_Vchromel, Vchromel), (stamp_Vchromel2, Vchromel2) = readings['107']
+        (stamp_Valumel, Valumel), (stamp_Valumel2, Valumel2) = readings['108']
+
+        self.TempA = float(TempA)
+        self.time_TempA = self.time_scan + stamp_TempA
         print "temp A: %f C" % (self.TempA)
 
-        time.sleep(self.delay)
-
-        self.TempB = float(self.k2700.fetch('118'))
-        self.time_TempB = time.time() - self.start
+        self.TempB = float(TempB)
+        self.time_TempB = self.time_scan + stamp_TempB
         print "temp B: %f C" % (self.TempB)
 
-        time.sleep(self.delay)
-
-        self.Vchromelraw = float(self.k2700.fetch('107'))*10**6
-        self.Vchromelcalc = self.voltage_Correction(self.Vchromelraw,self.TempA,self.TempB, 'chromel')
-        self.time_Vchromel = time.time() - self.start
+        self.Vchromelraw = float(Vchromel)*10**6
+        self.Vchromelcalc = voltage_correction(self.Vchromelraw,self.TempA,self.TempB, 'chromel')
+        self.time_Vchromel = self.time_scan + stamp_Vchromel
         print "voltage (Ch): %f uV" % (self.Vchromelcalc)
 
-        time.sleep(self.delay)
-
-        self.Valumelraw = float(self.k2700.fetch('108'))*10**6
-        self.Valumelcalc = self.voltage_Correction(self.Valumelraw,self.TempA,self.TempB, 'alumel')
-        self.time_Valumel = time.time() - self.start
+        self.Valumelraw = float(Valumel)*10**6
+        self.Valumelcalc = voltage_correction(self.Valumelraw,self.TempA,self.TempB, 'alumel')
+        self.time_Valumel = self.time_scan + stamp_Valumel
         print "voltage (Al): %f uV" % (self.Valumelcalc)
 
-        time.sleep(self.delay)
-
-        self.Valumelraw2 = float(self.k2700.fetch('108'))*10**6
-        self.Valumelcalc2 = self.voltage_Correction(self.Valumelraw2,self.TempA,self.TempB, 'alumel')
-        self.time_Valumel2 = time.time() - self.start
+        self.Valumelraw2 = float(Valumel2)*10**6
+        self.Valumelcalc2 = voltage_correction(self.Valumelraw2,self.TempA,self.TempB, 'alumel')
+        self.time_Valumel2 = self.time_scan + stamp_Valumel2
         print "voltage (Al): %f uV" % (self.Valumelcalc2)
 
-        time.sleep(self.delay)
-
-        self.Vchromelraw2 = float(self.k2700.fetch('107'))*10**6
-        self.Vchromelcalc2 = self.voltage_Correction(self.Vchromelraw2,self.TempA,self.TempB, 'chromel')
-        self.time_Vchromel2 = time.time() - self.start
+        self.Vchromelraw2 = float(Vchromel2)*10**6
+        self.Vchromelcalc2 = voltage_correction(self.Vchromelraw2,self.TempA,self.TempB, 'chromel')
+        self.time_Vchromel2 = self.time_scan + stamp_Vchromel2
         print "voltage (Ch): %f uV" % (self.Vchromelcalc2)
 
-        time.sleep(self.delay)
-
-        self.TempB2 = float(self.k2700.fetch('118'))
-        self.time_TempB2 = time.time() - self.start
+        self.TempB2 = float(TempB2)
+        self.time_TempB2 = self.time_scan + stamp_TempB2
         print "temp B: %f C" % (self.TempB2)
 
-        time.sleep(self.delay)
-
-        self.TempA2 = float(self.k2700.fetch('117'))
-        self.time_TempA2 = time.time() - self.start
+        self.TempA2 = float(TempA2)
+        self.time_TempA2 = self.time_scan + stamp_TempA2
         print "temp A: %f C" % (self.TempA2)
         
         self.time = ( self.time_TempA + self.time_TempB + self.time_Vchromel + self.time_Valumel + self.time_Valumel2 + self.time_Vchromel2 + self.time_TempB2 + self.time_TempA2 ) / 8
     #end def
 
-    #--------------------------------------------------------------------------
-    def voltage_Correction(self, raw_voltage, tempA, tempB, side):
-        ''' raw_data must be in uV '''
-        # Kelvin conversion for polynomial correction.
-        dT = tempA - tempB
-        avgT = (tempA + tempB)/2 + 273.15
-
-        # Correction for effect from Thermocouple Seebeck
-        out = self.alpha(avgT, side)*dT - raw_voltage
-
-        return out
-    #end def
-
-    #--------------------------------------------------------------------------
-    def alpha(self, x, side):
-        ''' x = avgT
-            alpha in uV/K
-        '''
-        ### If Chromel, taken from Chromel_Seebeck.txt
-        if side == 'chromel':
-            if ( x >= 270 and x < 700):
-                alpha = -2467.61114613*x**0 + 55.6028987953*x**1 + \
-                        -0.552110359087*x**2 + 0.00320554346691*x**3 + \
-                        -1.20477254034e-05*x**4 + 3.06344710205e-08*x**5 + \
-                        -5.33914758601e-11*x**6 + 6.30044607727e-14*x**7 + \
-                        -4.8197269477e-17*x**8 + 2.15928374212e-20*x**9 + \
-                        -4.30421084091e-24*x**10
-            #end if
-            elif ( x >= 700 and x < 1599):
-                alpha = 1165.13254764*x**0 + -9.49622421414*x**1 + \
-                        0.0346344390853*x**2 + -7.27785048931e-05*x**3 + \
-                        9.73981855547e-08*x**4 + -8.64369652227e-11*x**5 + \
-                        5.10080771762e-14*x**6 + -1.93318725171e-17*x**7 + \
-                        4.27299905603e-21*x**8 + -4.19761748937e-25*x**9
-            #end if
-            else:
-                print "Error in voltage correction, out of range."
-        #end if (Chromel)
-
-        ### If Alumel, taken from Alumel_Seebeck.txt
-        elif side == 'alumel':
-            if ( x >= 270 and x < 570):
-                alpha = -3465.28789643*x**0 + 97.4007289124*x**1 + \
-                        -1.17546754681*x**2 + 0.00801252041119*x**3 + \
-                        -3.41263237031e-05*x**4 + 9.4391002358e-08*x**5 + \
-                        -1.69831949233e-10*x**6 + 1.91977765586e-13*x**7 + \
-                        -1.2391854625e-16*x**8 + 3.48576207577e-20*x**9
-            #end if
-            elif ( x >= 570 and x < 1599):
-                alpha = 254.644633774*x**0 + -2.17639940109*x**1 + \
-                        0.00747127856327*x**2 + -1.41920634198e-05*x**3 + \
-                        1.61971537881e-08*x**4 + -1.14428153299e-11*x**5 + \
-                        4.969263632e-15*x**6 + -1.27526741699e-18*x**7 + \
-                        1.80403838088e-22*x**8 + -1.23699936952e-26*x**9
-            #end if
-            else:
-                print "Error in voltage correction, out of range."
-        #end if (Alumel)
-
-        else:
-            print "Error in voltage correction."
-        #end else
-
-        return alpha
-
-    #end def
-
     #--------------------------------------------------------------------------
     def write_data_to_file(self):
         self.statusfile.write('%.1f,'%(self.time))
@@ -546,6 +618,7 @@ class Main:
         self.datafile.write('%.3f,' %(self.time))
         self.datafile.write('%.4f,%.4f,%.4f,%.4f,' % (ta, tb, avgt, dt) )
         self.datafile.write('%.6f,%.6f\n' % (vchromel,valumel))
+        self.checkpoint.append('data', [self.time, ta, tb, avgt, dt, vchromel, valumel])
         
         self.time_list.append(self.time)
         self.TA_list.append(ta)
@@ -608,34 +681,11 @@ class Main:
         #end if
     #end def
     
-    #--------------------------------------------------------------------------
-    def create_backup_file(self):
-        print '\n***\ncreate backup file\n***\n'
-        backup_folder = self.filePath + '/Seebeck Backup Files/'
-        if not os.path.exists(backup_folder):
-            os.makedirs(backup_folder)
-        #end if
-        tempfile = open('Seebeck Backup Files/databackup_%.0f.csv'%self.time ,'w')
-        tempfile.write('databackup,%.0f\n' % self.time )
-        tempfile.write('time,tempA,tempB,avgT,dT,Vch,Val\n')
-        for i in range(len(self.time_list)):
-            tempfile.write('%.3f,%.4f,%.4f,%.4f,%.4f,%.6f,%.6f\n'%(self.time_list[i],self.TA_list[i],self.TB_list[i],self.avgT_list[i],self.dT_list[i],self.Vch_list[i],self.Val_list[i]))
-        #end for
-        tempfile.close()
-        
-        tempfile2 = open('Seebeck Backup Files/pidbackup_%.0f.csv'%self.time ,'w')
-        tempfile2.write('pidbackup,%.0f\n' % self.time )
-        tempfile2.write('time,sampletempA,blocktempA,setpointA,sampletempB,blocktempB,setpointB,avgT,dT\n')
-        for i in range(len(self.pidtime_list)):
-            tempfile2.write('%.3f,%.4f,%.4f,%.4f,%.4f,%.4f,%.4f,%.6f,%.6f\n'%(self.pidtime_list[i],self.pidAsample_list[i],self.pidAblock_list[i],self.pidAsetpoint_list[i],self.pidBsample_list[i],self.pidBblock_list[i],self.pidBsetpoint_list[i],self.pidavgT_list[i],self.piddT_list[i]))
-        #end for
-        tempfile2.close()
-    #end def
-
     #--------------------------------------------------------------------------
     def save_files(self):
         print('\nSave Files\n')
         self.datafile.close()
+        self.checkpoint.close()
         self.statusfile.close()
         self.pidfile.close()
     #end def
@@ -704,7 +754,25 @@ class Main:
 #end class
 ###############################################################################
 
+#------------------------------------------------------------------------------
+def append_lines(path):
+    """
+    Opens a csv file to append to, after dropping a last line that was only
+    partly written.
+    """
+    f = open(path, 'r+')
+    text = f.read()
+    f.seek(text.rfind('\n') + 1)
+    f.truncate()
+    return f
+#end def
+
 #==============================================================================
 if __name__=='__main__':
-    runprogram = Main()
+    # python SeebeckCLI3.py [--resume <run folder>]
+    if sys.argv[1:2] == ['--resume']:
+        runprogram = Main(resume=sys.argv[2])
+    else:
+        runprogram = Main()
+    #end if
 #end if
\ No newline at end of file
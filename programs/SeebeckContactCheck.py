@@ -4,8 +4,14 @@ Created on 26-02-2016
 Bobby McKinney
 PID initial program
 """
-import omegacn7500
-import visa
+import instrument_sim
+if instrument_sim.enabled:
+    # SEEBECK_SIMULATE=1 runs against simulated instruments
+    omegacn7500 = visa = instrument_sim
+else:
+    import omegacn7500
+    import visa
+#end if
 import time
 
 #ResourceManager for visa instrument control
@@ -7,11 +7,14 @@ Created: 2016-02-09
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-import minimalmodbus as modbus # For communicating with the cn7500s
 import time
 from datetime import datetime # for getting the current date and time
 import exceptions
 
+from data_file import load_data
+from regression import windows, window_sum, window_reduce, window_fit
+from plot_queue import PlotPool
+
 #==============================================================================
 version = '1.0 (2016-02-09)'
 
@@ -30,65 +33,18 @@ class SeebeckContinuousProcessing:
 
         self.get_data()
         self.plotnumber = 0
+        self.plots = PlotPool() # renders the plots in parallel
         
         self.tol = 10
-        self.mintemp = min(self.avgT)
-        self.maxtemp = max(self.avgT)
-        self.maxindex = self.avgT.index(self.maxtemp)
+        self.plotspacing = 5.0 # C between saved plots
+        self.mintemp = np.min(self.avgT)
+        self.maxtemp = np.max(self.avgT)
+        self.maxindex = int(np.argmax(self.avgT))
         self.endindex = len(self.time)
 
-        for self.index in range(self.maxindex):
-            if (self.avgT[self.index] > (self.mintemp + self.tol)) and (self.avgT[self.index] < (self.maxtemp - self.tol)):
-                print 'current index: ', self.index
-                currenttemp = self.avgT[self.index]
-                self.timecalclist = []
-                self.avgTcalclist = []
-                self.dTcalclist = []
-                self.Vchromelcalclist = []
-                self.Valumelcalclist = []
-
-                for i in range(self.maxindex):
-                    if (self.avgT[i] > (currenttemp - self.tol)) and (self.avgT[i] < (currenttemp + self.tol)):
-                        self.timecalclist.append(self.time[i])
-                        self.avgTcalclist.append(self.avgT[i])
-                        self.dTcalclist.append(self.dT[i])
-                        self.Vchromelcalclist.append(self.Vch[i])
-                        self.Valumelcalclist.append(self.Val[i])
-                    #end if
-                    elif (self.avgT[i] > (currenttemp + self.tol)):
-                        break
-                    #end elif
-                #end for
-                self.process_data()
-                self.plotnumber += 1
-            #end if
-        #end for
-        for self.index in range(self.maxindex,self.endindex):
-            if (self.avgT[self.index] > (self.mintemp + self.tol)) and (self.avgT[self.index] < (self.maxtemp - self.tol)):
-                print 'current index: ', self.index
-                currenttemp = self.avgT[self.index]
-                self.timecalclist = []
-                self.avgTcalclist = []
-                self.dTcalclist = []
-                self.Vchromelcalclist = []
-                self.Valumelcalclist = []
-
-                for i in range(self.maxindex,self.index):
-                    if (self.avgT[i] > (currenttemp - self.tol)) and (self.avgT[i] < (currenttemp + self.tol)):
-                        self.timecalclist.append(self.time[i])
-                        self.avgTcalclist.append(self.avgT[i])
-                        self.dTcalclist.append(self.dT[i])
-                        self.Vchromelcalclist.append(self.Vch[i])
-                        self.Valumelcalclist.append(self.Val[i])
-                    #end if
-                    elif (self.avgT[i] < (currenttemp - self.tol)):
-                        break
-                    #end elif
-                #end for
-                self.process_data()
-                self.plotnumber += 1
-            #end if
-        #end for
+        # ramp up to the highest temperature, then back down
+        self.process_data(0, self.maxindex)
+        self.process_data(self.maxindex, self.endindex)
         self.save_file()
     #end def
 
@@ -102,137 +58,94 @@ class SeebeckContinuousProcessing:
     
     #--------------------------------------------------------------------------
     def get_data(self):
-        self.data = self.datafile.readlines()
-        self.start = self.data.pop(0)
-        self.quantities = self.data.pop(0).split(',')
-        self.time = []
-        self.tempA = []
-        self.tempB = []
-        self.avgT = []
-        self.dT = []
-        self.Vch = []
-        self.Val = []
-        
-        for d in self.data:
-            self.time.append( float(d.split(',')[0]) )
-            self.tempA.append( float(d.split(',')[1]) )
-            self.tempB.append( float(d.split(',')[2]) )
-            self.avgT.append( float(d.split(',')[3]) )
-            self.dT.append( float(d.split(',')[4]) )
-            self.Vch.append( float(d.split(',')[5]) )
-            self.Val.append( float(d.split(',')[6]) )
-        #end for
+        self.start, self.quantities, self.data = load_data(self.datafile)
+        self.time = self.data['time']
+        self.tempA = self.data['tempA']
+        self.tempB = self.data['tempB']
+        self.avgT = self.data['avgT']
+        self.dT = self.data['dT']
+        self.Vch = self.data['Vch']
+        self.Val = self.data['Val']
         print "length of data: ", len(self.avgT)
     #end def    
     #--------------------------------------------------------------------------
-    def process_data(self):
+    def process_data(self, start, stop):
+        """
+        Fits every sample between start and stop against the samples of the
+        same ramp within +/- tol of its average temperature.
+        """
         print '\n***\n'
         print 'process data to get seebeck coefficient'
-        time = np.average(self.timecalclist)
-        avgT = np.average(self.avgTcalclist)
-        minavgT = min(self.avgTcalclist)
-        maxavgT = max(self.avgTcalclist)
-        
-        dTchromellist = self.dTcalclist
-        dTalumellist = self.dTcalclist
-        mindT = min(self.dTcalclist)
-        maxdT = max(self.dTcalclist)
-
-        results_chromel = {}
-        results_alumel = {}
-
-        coeffs_chromel = np.polyfit(dTchromellist, self.Vchromelcalclist, 1)
-        coeffs_alumel = np.polyfit(dTalumellist,self.Valumelcalclist,1)
-        # Polynomial Coefficients
-        polynomial_chromel = coeffs_chromel.tolist()
-        polynomial_alumel = coeffs_alumel.tolist()
-
-        seebeck_chromel = polynomial_chromel[0]
-        offset_chromel = polynomial_chromel[1]
-        seebeck_alumel = polynomial_alumel[0]
-        offset_alumel = polynomial_alumel[1]
-        print 'seebeck (chromel): %.3f uV/K'%(seebeck_chromel)
-        print 'seebeck (alumel): %.3f uV/K'%(seebeck_alumel)
+        avgT = self.avgT[start:stop]
+        if len(avgT) == 0:
+            return
+        #end if
+        order, lo, hi = windows(avgT, self.tol)
+
+        # sorted by avgT
+        sortedtime = self.time[start:stop][order]
+        sortedavgT = avgT[order]
+        sorteddT = self.dT[start:stop][order]
+        sortedVch = self.Vch[start:stop][order]
+        sortedVal = self.Val[start:stop][order]
+
+        # only windows that fit inside the measured range, in time order
+        inside = np.flatnonzero((sortedavgT > (self.mintemp + self.tol)) & (sortedavgT < (self.maxtemp - self.tol)))
+        inside = inside[np.argsort(order[inside], kind='mergesort')]
+        if len(inside) == 0:
+            return
+        #end if
+        lo = lo[inside]
+        hi = hi[inside]
+        n = hi - lo
+
+        time = window_sum(sortedtime, lo, hi)/n
+        avgTs = window_sum(sortedavgT, lo, hi)/n
+        minavgT = sortedavgT[lo]
+        maxavgT = sortedavgT[hi-1]
+        mindT = window_reduce(np.minimum, sorteddT, lo, hi)
+        maxdT = window_reduce(np.maximum, sorteddT, lo, hi)
+
+        seebeck_chromel, offset_chromel, rsquared_chromel, stderr_chromel = window_fit(sorteddT, sortedVch, lo, hi)
+        seebeck_alumel, offset_alumel, rsquared_alumel, stderr_alumel = window_fit(sorteddT, sortedVal, lo, hi)
+        print 'windows fitted: ', len(inside)
+        print 'seebeck (chromel): %.3f to %.3f uV/K'%(np.nanmin(seebeck_chromel), np.nanmax(seebeck_chromel))
+        print 'seebeck (alumel): %.3f to %.3f uV/K'%(np.nanmin(seebeck_alumel), np.nanmax(seebeck_alumel))
         print '\n***\n'
 
-        # Calculate coefficient of determination (r-squared):
-        p_chromel = np.poly1d(coeffs_chromel)
-        p_alumel = np.poly1d(coeffs_alumel)
-        # fitted values:
-        yhat_chromel = p_chromel(dTchromellist)
-        yhat_alumel = p_alumel(dTalumellist)
-        # mean of values:
-        ybar_chromel = np.sum(self.Vchromelcalclist)/len(self.Vchromelcalclist)
-        ybar_alumel = np.sum(self.Valumelcalclist)/len(self.Valumelcalclist)
-        # regression sum of squares:
-        ssreg_chromel = np.sum((yhat_chromel-ybar_chromel)**2)   # or sum([ (yihat - ybar)**2 for yihat in yhat])
-        ssreg_alumel = np.sum((yhat_alumel-ybar_alumel)**2)
-        # total sum of squares:
-        sstot_chromel = np.sum((self.Vchromelcalclist - ybar_chromel)**2)
-        sstot_alumel = np.sum((self.Valumelcalclist - ybar_alumel)**2)    # or sum([ (yi - ybar)**2 for yi in y])
-
-        rsquared_chromel = ssreg_chromel / sstot_chromel
-        rsquared_alumel = ssreg_alumel / sstot_alumel
-
-        self.seebeckfile.write('%.3f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f\n'%(time,avgT,minavgT,maxavgT,mindT,maxdT,seebeck_chromel,offset_chromel,rsquared_chromel,seebeck_alumel,offset_alumel,rsquared_alumel))
-
-        fitchromel = {}
-        fitalumel = {}
-        fitchromel['polynomial'] = polynomial_chromel
-        fitalumel['polynomial'] = polynomial_alumel
-        fitchromel['r-squared'] = rsquared_chromel
-        fitalumel['r-squared'] = rsquared_alumel
-        celsius = u"\u2103"
-        
-        if self.index % 25 == 0:
-            self.create_plot(dTalumellist,dTchromellist,self.Valumelcalclist,self.Vchromelcalclist,fitalumel,fitchromel,str(self.plotnumber)+'_'+str(avgT)+ 'C')
-        #end if
+        results = np.column_stack((time,avgTs,minavgT,maxavgT,mindT,maxdT,seebeck_chromel,offset_chromel,rsquared_chromel,seebeck_alumel,offset_alumel,rsquared_alumel))
+        np.savetxt(self.seebeckfile, results, fmt=['%.3f'] + ['%.5f']*11, delimiter=',')
+
+        # save a plot each time the window moves on by plotspacing
+        step = np.floor(avgTs/self.plotspacing)
+        for k in np.flatnonzero(np.concatenate(([True], np.diff(step) != 0))):
+            window = slice(lo[k], hi[k])
+            fitchromel = {}
+            fitalumel = {}
+            fitchromel['polynomial'] = [seebeck_chromel[k], offset_chromel[k]]
+            fitalumel['polynomial'] = [seebeck_alumel[k], offset_alumel[k]]
+            fitchromel['r-squared'] = rsquared_chromel[k]
+            fitalumel['r-squared'] = rsquared_alumel[k]
+            self.create_plot(sorteddT[window],sorteddT[window],sortedVal[window],sortedVch[window],fitalumel,fitchromel,str(self.plotnumber)+'_'+str(avgTs[k])+ 'C')
+            self.plotnumber += 1
+        #end for
     #end def
-    
+
     #--------------------------------------------------------------------------
     def create_plot(self, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel, title):
-        print 'create seebeck plot'
-        dpi = 400
-
-        plt.ioff()
-
-        # Create Plot:
-        fig = plt.figure(self.plotnumber, dpi=dpi)
-        ax = fig.add_subplot(111)
-        ax.grid()
-        ax.set_title(title)
-        ax.set_xlabel("dT (K)")
-        ax.set_ylabel("dV (uV)")
-
-        # Plot data points:
-        ax.scatter(xalumel, yalumel, color='r', marker='.', label="alumel Voltage")
-        ax.scatter(xchromel, ychromel, color='b', marker='.', label="chromel Voltage")
-
-        # Overlay linear fits:
-        coeffsalumel = fitalumel['polynomial']
-        coeffschromel = fitchromel['polynomial']
-        p_alumel = np.poly1d(coeffsalumel)
-        p_chromel = np.poly1d(coeffschromel)
-        xp = np.linspace(min(xalumel+xchromel), max(xalumel+xchromel), 5000)
-        alumel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffsalumel[0], coeffsalumel[1])
-        chromel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffschromel[0], coeffschromel[1])
-        ax.plot(xp, p_alumel(xp), '-', c='#FF9900', label="alumel Voltage Fit\n %s" % alumel_eq)
-        ax.plot(xp, p_chromel(xp), '-', c='g', label="chromel Voltage Fit\n %s" % chromel_eq)
-
-        ax.legend(loc='upper left', fontsize='10')
-
-        # Save:
+        print 'queue seebeck plot'
         plot_folder = self.filePath + '/Seebeck Plots/'
         if not os.path.exists(plot_folder):
             os.makedirs(plot_folder)
+        #end if
 
-        fig.savefig('%s.png' % (plot_folder + title) , dpi=dpi)
-
-        plt.close()
+        # rendered in the background by the plot pool
+        self.plots.submit('%s.png' % (plot_folder + title), title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel)
     #end def
 
     #--------------------------------------------------------------------------
     def save_file(self):
+        self.plots.close()
         print('\nSave Files\n')
         self.seebeckfile.close()
     #end def
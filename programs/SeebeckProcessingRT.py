@@ -7,11 +7,14 @@ Created: 2016-02-09
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-import minimalmodbus as modbus # For communicating with the cn7500s
 import time
 from datetime import datetime # for getting the current date and time
 import exceptions
 
+from data_file import load_data
+from regression import fit_seebeck
+from plot_queue import PlotPool
+
 #==============================================================================
 version = '1.0 (2016-02-09)'
 
@@ -30,27 +33,17 @@ class SeebeckProcessingRT:
 
         self.get_data()
         self.plotnumber = 0
+        self.plots = PlotPool() # renders the plots in parallel
         self.tolerance = 3.0
         
-        index = 0
-        
         print 'measure temp: ', self.measuretemp
-        self.timecalclist = []
-        self.avgTcalclist = []
-        self.dTcalclist = []
-        self.Vchromelcalclist = []
-        self.Valumelcalclist = []
-        
         # bin around an average temp and calculate seebeck
-        for i in range(0,len(self.time)):
-            if (self.avgT[i] > (self.measuretemp-self.tolerance)) and (self.avgT[i] < (self.measuretemp+self.tolerance)):
-                self.timecalclist.append(self.time[i])
-                self.avgTcalclist.append(self.avgT[i])
-                self.dTcalclist.append(self.dT[i])
-                self.Vchromelcalclist.append(self.Vch[i])
-                self.Valumelcalclist.append(self.Val[i])
-            #end if
-        #end for
+        index = np.flatnonzero(np.abs(self.avgT - self.measuretemp) < self.tolerance)
+        self.timecalclist = self.time[index]
+        self.avgTcalclist = self.avgT[index]
+        self.dTcalclist = self.dT[index]
+        self.Vchromelcalclist = self.Vch[index]
+        self.Valumelcalclist = self.Val[index]
         self.process_data()
         self.save_file()
     #end def
@@ -107,26 +100,14 @@ class SeebeckProcessingRT:
     
     #--------------------------------------------------------------------------
     def get_data(self):
-        self.data = self.datafile.readlines()
-        self.start = self.data.pop(0)
-        self.quantities = self.data.pop(0).split(',')
-        self.time = []
-        self.tempA = []
-        self.tempB = []
-        self.avgT = []
-        self.dT = []
-        self.Vch = []
-        self.Val = []
-        
-        for d in self.data:
-            self.time.append( float(d.split(',')[0]) )
-            self.tempA.append( float(d.split(',')[1]) )
-            self.tempB.append( float(d.split(',')[2]) )
-            self.avgT.append( float(d.split(',')[3]) )
-            self.dT.append( float(d.split(',')[4]) )
-            self.Vch.append( float(d.split(',')[5]) )
-            self.Val.append( float(d.split(',')[6]) )
-        #end for
+        self.start, self.quantities, self.data = load_data(self.datafile)
+        self.time = self.data['time']
+        self.tempA = self.data['tempA']
+        self.tempB = self.data['tempB']
+        self.avgT = self.data['avgT']
+        self.dT = self.data['dT']
+        self.Vch = self.data['Vch']
+        self.Val = self.data['Val']
         print "length of data: ", len(self.avgT)
     #end def    
     #--------------------------------------------------------------------------
@@ -139,42 +120,15 @@ class SeebeckProcessingRT:
         dTchromellist = self.dTcalclist
         dTalumellist = self.dTcalclist
 
-        results_chromel = {}
-        results_alumel = {}
-
-        coeffs_chromel = np.polyfit(dTchromellist, self.Vchromelcalclist, 1)
-        coeffs_alumel = np.polyfit(dTalumellist,self.Valumelcalclist,1)
-        # Polynomial Coefficients
-        polynomial_chromel = coeffs_chromel.tolist()
-        polynomial_alumel = coeffs_alumel.tolist()
-
-        seebeck_chromel = polynomial_chromel[0]
-        offset_chromel = polynomial_chromel[1]
-        seebeck_alumel = polynomial_alumel[0]
-        offset_alumel = polynomial_alumel[1]
-        print 'seebeck (chromel): %.3f uV/K'%(seebeck_chromel)
-        print 'seebeck (alumel): %.3f uV/K'%(seebeck_alumel)
+        chromel, alumel = fit_seebeck(dTchromellist, self.Vchromelcalclist, self.Valumelcalclist)
+        seebeck_chromel, offset_chromel, rsquared_chromel, stderr_chromel = chromel
+        seebeck_alumel, offset_alumel, rsquared_alumel, stderr_alumel = alumel
+        polynomial_chromel = [seebeck_chromel, offset_chromel]
+        polynomial_alumel = [seebeck_alumel, offset_alumel]
+        print 'seebeck (chromel): %.3f +/- %.3f uV/K'%(seebeck_chromel, stderr_chromel)
+        print 'seebeck (alumel): %.3f +/- %.3f uV/K'%(seebeck_alumel, stderr_alumel)
         print '\n***\n'
 
-        # Calculate coefficient of determination (r-squared):
-        p_chromel = np.poly1d(coeffs_chromel)
-        p_alumel = np.poly1d(coeffs_alumel)
-        # fitted values:
-        yhat_chromel = p_chromel(dTchromellist)
-        yhat_alumel = p_alumel(dTalumellist)
-        # mean of values:
-        ybar_chromel = np.sum(self.Vchromelcalclist)/len(self.Vchromelcalclist)
-        ybar_alumel = np.sum(self.Valumelcalclist)/len(self.Valumelcalclist)
-        # regression sum of squares:
-        ssreg_chromel = np.sum((yhat_chromel-ybar_chromel)**2)   # or sum([ (yihat - ybar)**2 for yihat in yhat])
-        ssreg_alumel = np.sum((yhat_alumel-ybar_alumel)**2)
-        # total sum of squares:
-        sstot_chromel = np.sum((self.Vchromelcalclist - ybar_chromel)**2)
-        sstot_alumel = np.sum((self.Valumelcalclist - ybar_alumel)**2)    # or sum([ (yi - ybar)**2 for yi in y])
-
-        rsquared_chromel = ssreg_chromel / sstot_chromel
-        rsquared_alumel = ssreg_alumel / sstot_alumel
-
         self.seebeckfile.write('%.3f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f,%.5f\n'%(time,avgT,seebeck_chromel,offset_chromel,rsquared_chromel,seebeck_alumel,offset_alumel,rsquared_alumel))
 
         fitchromel = {}
@@ -190,48 +144,19 @@ class SeebeckProcessingRT:
     
     #--------------------------------------------------------------------------
     def create_plot(self, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel, title):
-        print 'create seebeck plot'
-        dpi = 400
-
-        plt.ioff()
-
-        # Create Plot:
-        fig = plt.figure(self.plotnumber, dpi=dpi)
-        ax = fig.add_subplot(111)
-        ax.grid()
-        ax.set_title(title)
-        ax.set_xlabel("dT (K)")
-        ax.set_ylabel("dV (uV)")
-
-        # Plot data points:
-        ax.scatter(xalumel, yalumel, color='r', marker='.', label="alumel Voltage")
-        ax.scatter(xchromel, ychromel, color='b', marker='.', label="chromel Voltage")
-
-        # Overlay linear fits:
-        coeffsalumel = fitalumel['polynomial']
-        coeffschromel = fitchromel['polynomial']
-        p_alumel = np.poly1d(coeffsalumel)
-        p_chromel = np.poly1d(coeffschromel)
-        xp = np.linspace(min(xalumel+xchromel), max(xalumel+xchromel), 5000)
-        alumel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffsalumel[0], coeffsalumel[1])
-        chromel_eq = 'dV = %.2f*(dT) + %.2f' % (coeffschromel[0], coeffschromel[1])
-        ax.plot(xp, p_alumel(xp), '-', c='#FF9900', label="alumel Voltage Fit\n %s" % alumel_eq)
-        ax.plot(xp, p_chromel(xp), '-', c='g', label="chromel Voltage Fit\n %s" % chromel_eq)
-
-        ax.legend(loc='upper left', fontsize='10')
-
-        # Save:
+        print 'queue seebeck plot'
         plot_folder = self.filePath + '/Seebeck Plots/'
         if not os.path.exists(plot_folder):
             os.makedirs(plot_folder)
+        #end if
 
-        fig.savefig('%s.png' % (plot_folder + title) , dpi=dpi)
-
-        plt.close()
+        # rendered in the background by the plot pool
+        self.plots.submit('%s.png' % (plot_folder + title), title, xalumel, xchromel, yalumel, ychromel, fitalumel, fitchromel)
     #end def
 
     #--------------------------------------------------------------------------
     def save_file(self):
+        self.plots.close()
         print('\nSave Files\n')
         self.seebeckfile.close()
     #end def
@@ -7,31 +7,13 @@ PID initial program
 import os
 import time
 import matplotlib.pyplot as plt
+import seebeck_reference
 
 def TypeKimport():
-    fileAl = open('Alumel_Seebeck.csv','r')
-    dataAl = fileAl.readlines()
-    fileAl.close()
-    dataAl.pop(0)
-    tempAl = []
-    seebeckAl = []
-    for line in dataAl:
-        tempAl.append(float(line.split(',')[0]))
-        seebeckAl.append(float(line.split(',')[1]))
-    #end for
-    
-    fileCh = open('Chromel_Seebeck.csv','r')
-    dataCh = fileCh.readlines()
-    fileCh.close()
-    dataCh.pop(0)
-    tempCh = []
-    seebeckCh = []
-    for line in dataCh:
-        tempCh.append(float(line.split(',')[0]))
-        seebeckCh.append(float(line.split(',')[1]))
-    #end for
-
-    return tempAl,seebeckAl,tempCh,seebeckCh
+    alumel = seebeck_reference.table('alumel')
+    chromel = seebeck_reference.table('chromel')
+    return list(alumel.temp),list(alumel.seebeck),list(chromel.temp),list(chromel.seebeck)
+#end def
 
 
 if __name__=='__main__':
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : acquisition
+Description: Runs the reads on each instrument bus in its own worker thread so
+             that the cn7500 Modbus polling overlaps the Keithley GPIB scan.
+Comments: Each job is a callable that performs one complete read on its bus
+          (e.g. pidbus.snapshot or k2700.scan). Finished reads are put on a
+          shared queue as timestamped Samples. Exceptions raised by a job are
+          re-raised by collect in the calling thread, so the callers keep
+          their existing error handling. collect waits on the queue in short
+          timeouts: a Queue.get without one can not be interrupted in
+          Python 2, so Ctrl-C would not stop a program whose bus job stalls.
+"""
+import time
+import Queue
+from threading import Thread
+
+#==============================================================================
+poll_interval = 0.5 # s, longest collect waits on the queue before checking for Ctrl-C
+stop_timeout = 5.0 # s, stop waits this long for each worker to finish its job
+
+###############################################################################
+class Sample:
+    ''' Result of one job on one bus, with the times it started and ended. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, bus, data, start, end, error=None):
+        self.bus = bus
+        self.data = data
+        self.start = start
+        self.end = end
+        self.time = (start + end)/2.0 # midpoint of the transaction
+        self.error = error
+    #end init
+
+#end class
+###############################################################################
+
+###############################################################################
+class BusWorker(Thread):
+    ''' Executes the jobs of one bus in order. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, bus, samples):
+        Thread.__init__(self)
+        self.bus = bus
+        self.samples = samples
+        self.jobs = Queue.Queue()
+        self.daemon = True
+        self.start()
+    #end init
+
+    #--------------------------------------------------------------------------
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            #end if
+            start = time.time()
+            try:
+                data = job()
+                error = None
+            except Exception as e:
+                data = None
+                error = e
+            #end except
+            self.samples.put(Sample(self.bus, data, start, time.time(), error))
+        #end while
+    #end def
+
+#end class
+###############################################################################
+
+###############################################################################
+class AcquisitionScheduler:
+    ''' One worker thread per bus, all feeding one sample queue. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, buses):
+        self.samples = Queue.Queue()
+        self.workers = {}
+        for bus in buses:
+            self.workers[bus] = BusWorker(bus, self.samples)
+        #end for
+        self.pending = {} # samples that arrived for a bus nobody is collecting yet
+    #end init
+
+    #--------------------------------------------------------------------------
+    def trigger(self, bus, job):
+        """ Queue a job on a bus and return immediately. """
+        self.workers[bus].jobs.put(job)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def collect(self, buses):
+        """
+        Wait for the next sample from each of the buses and return them as a
+        dictionary of bus: Sample.
+        """
+        samples = {}
+        for bus in buses:
+            if self.pending.get(bus):
+                samples[bus] = self.pending[bus].pop(0)
+            #end if
+        #end for
+        while len(samples) < len(buses):
+            try:
+                sample = self.samples.get(timeout=poll_interval)
+            except Queue.Empty:
+                continue
+            #end except
+            if sample.bus in buses and sample.bus not in samples:
+                samples[sample.bus] = sample
+            #end if
+            else:
+                self.pending.setdefault(sample.bus, []).append(sample)
+            #end else
+        #end while
+        for sample in samples.values():
+            if sample.error is not None:
+                raise sample.error
+            #end if
+        #end for
+        return samples
+    #end def
+
+    #--------------------------------------------------------------------------
+    def acquire(self, jobs):
+        """
+        Start every job in 'jobs' (a dictionary of bus: callable) at once and
+        wait until all of them have finished.
+        """
+        for bus in jobs:
+            self.trigger(bus, jobs[bus])
+        #end for
+        return self.collect(jobs.keys())
+    #end def
+
+    #--------------------------------------------------------------------------
+    def stop(self):
+        """
+        Ends the workers once their current jobs are done. A worker stuck in
+        a job is left behind (it is a daemon thread) after stop_timeout.
+        """
+        for bus in self.workers:
+            self.workers[bus].jobs.put(None)
+        #end for
+        for bus in self.workers:
+            self.workers[bus].join(stop_timeout)
+        #end for
+    #end def
+
+#end class
+###############################################################################
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : binning
+Description: Splits a measurement into the segments held at each setpoint of a
+             temperature profile, for the processing programs.
+Comments: Every sample is labelled with the nearest setpoint if it is within
+          the tolerance of it (|avgT - temp| < tolerance), in one vectorized
+          pass. Runs of equal labels are found with np.diff/np.flatnonzero.
+          Runs of the same setpoint that are only separated by a few out of
+          band samples (a noise spike, at most max_gap) are joined, so one
+          stray point no longer cuts a hold short. The profile is then
+          matched to the runs in time order, so a temperature that is
+          visited on the way up and on the way down gets one segment for
+          each visit.
+"""
+import numpy as np
+
+#==============================================================================
+max_gap = 5 # out of band samples allowed inside one segment
+
+#------------------------------------------------------------------------------
+def label(avgT, temps, tolerance):
+    """
+    Index into temps of the setpoint each sample is held at, or -1 if it is
+    not within the tolerance of any of them. temps must be sorted.
+    """
+    avgT = np.asarray(avgT, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    if len(temps) == 1:
+        nearest = np.zeros(len(avgT), int)
+    #end if
+    else:
+        upper = np.clip(np.searchsorted(temps, avgT), 1, len(temps) - 1)
+        lower = upper - 1
+        nearest = np.where(avgT - temps[lower] <= temps[upper] - avgT, lower, upper)
+    #end else
+    return np.where(np.abs(avgT - temps[nearest]) < tolerance, nearest, -1)
+#end def
+
+#------------------------------------------------------------------------------
+def runs(labels, max_gap=max_gap):
+    """ start, stop and label of each run of samples at one setpoint. """
+    labels = np.asarray(labels)
+    inside = np.flatnonzero(labels >= 0)
+    if len(inside) == 0:
+        return np.zeros(0, int), np.zeros(0, int), np.zeros(0, int)
+    #end if
+
+    # A new run starts wherever the setpoint changes between in band samples
+    # or more than max_gap samples are out of band
+    new = (np.diff(labels[inside]) != 0) | (np.diff(inside) > max_gap + 1)
+    first = np.concatenate(([0], np.flatnonzero(new) + 1))
+    last = np.concatenate((first[1:] - 1, [len(inside) - 1]))
+    return inside[first], inside[last] + 1, labels[inside[first]]
+#end def
+
+#------------------------------------------------------------------------------
+def segments(avgT, measureList, tolerance, max_gap=max_gap):
+    """
+    Returns a list of (temp, index) for the setpoints in measureList, in
+    order, where index holds the sample indices of that visit. Setpoints that
+    were never reached are left out.
+    """
+    temps = np.unique(measureList)
+    labels = label(avgT, temps, tolerance)
+    starts, stops, run_labels = runs(labels, max_gap)
+
+    found = []
+    position = 0 # first run not yet used
+    for temp in measureList:
+        k = np.searchsorted(temps, temp)
+        later = np.flatnonzero(run_labels[position:] == k)
+        if len(later) == 0:
+            continue
+        #end if
+        n = position + later[0]
+        start, stop = starts[n], stops[n]
+        found.append((temp, start + np.flatnonzero(labels[start:stop] == k)))
+        position = n + 1
+    #end for
+    return found
+#end def
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : checkpoint
+Description: Crash-safe logging of the samples of a run, in place of the
+             periodic full backup files.
+Comments: Every sample is appended to a write-ahead log (a raw_store file, one
+          per stream: Data.raw, PID_Data.raw) as it is taken. Only the new
+          row is written, so the cost per sample is constant and there is one
+          file per stream instead of a new backup of the whole run every 15
+          minutes. The logs are flushed to the OS on every row and fsynced to
+          disk every 'interval' seconds. After a crash, rebuild reads the logs
+          of a run folder back into lists; a partly written last row is
+          ignored. SeebeckCLI3 --resume <run folder> uses it to carry on with
+          the run.
+"""
+import os
+import time
+
+import raw_store
+
+#==============================================================================
+streams = {'data': 'Data.raw', 'pid': 'PID_Data.raw'}
+
+###############################################################################
+class Checkpoint:
+    ''' Appends rows to the write-ahead logs of a run. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, stores, interval=900):
+        """
+        stores is a dictionary of stream name: RawStore, interval the time
+        (s) between fsyncs.
+        """
+        self.stores = stores
+        self.interval = interval
+        self.synced = time.time()
+    #end init
+
+    #--------------------------------------------------------------------------
+    def append(self, stream, row):
+        self.stores[stream].append(row)
+        if time.time() - self.synced > self.interval:
+            self.sync()
+        #end if
+    #end def
+
+    #--------------------------------------------------------------------------
+    def sync(self):
+        """ Forces the logs onto the disk. """
+        for stream in self.stores:
+            self.stores[stream].sync()
+        #end for
+        self.synced = time.time()
+    #end def
+
+    #--------------------------------------------------------------------------
+    def close(self):
+        self.sync()
+        for stream in self.stores:
+            self.stores[stream].close()
+        #end for
+    #end def
+
+#end class
+###############################################################################
+
+#------------------------------------------------------------------------------
+def rebuild(folder):
+    """
+    Reads the logs of the run in folder back into memory. Returns a
+    dictionary of stream: {field: list of values}.
+    """
+    lists = {}
+    for stream in streams:
+        path = os.path.join(folder, streams[stream])
+        if not os.path.exists(path):
+            continue
+        #end if
+        header, data = raw_store.read(path)
+        lists[stream] = dict([(name, data[name].tolist()) for name in header['fields']])
+    #end for
+    return lists
+#end def
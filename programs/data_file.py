@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : data_file
+Description: Reads the Data.csv written by SeebeckCLI3 into one structured
+             NumPy array for the processing programs.
+Comments: If the Data.raw store written alongside the csv exists, load_data
+          memory-maps it instead, so only the rows and columns that are used
+          are read from disk. Otherwise the csv is read in chunks of lines and
+          each chunk is parsed in one call to np.fromstring, so every value is
+          parsed once and stored as a float64 (8 bytes) instead of a Python
+          float in a list. A last line without a newline (the run was stopped
+          mid-write) is dropped.
+"""
+import os
+import itertools
+import numpy as np
+
+import raw_store
+
+#==============================================================================
+columns = ['time', 'tempA', 'tempB', 'avgT', 'dT', 'Vch', 'Val']
+dtype = np.dtype([(name, float) for name in columns])
+
+#------------------------------------------------------------------------------
+def parse_lines(lines):
+    """ Parses a list of stripped data lines into a structured array. """
+    values = np.fromstring(','.join(lines), dtype=float, sep=',')
+    if len(values) != len(lines)*len(columns):
+        # Let loadtxt find and report the bad line
+        values = np.loadtxt(lines, delimiter=',', ndmin=2)
+        if values.shape[1] != len(columns):
+            raise ValueError("Data file has %d columns, expected %d." % (values.shape[1], len(columns)))
+        #end if
+    #end if
+    return values.reshape(-1, len(columns)).view(dtype).ravel()
+#end def
+
+#------------------------------------------------------------------------------
+def read_data(datafile, chunk=100000):
+    """
+    datafile is an open Data.csv. Returns the start time line, the list of
+    column headers and the data as a structured array with the fields in
+    'columns' (data['avgT'] etc.).
+    """
+    start = datafile.readline()
+    quantities = datafile.readline().split(',')
+
+    blocks = []
+    while True:
+        lines = list(itertools.islice(datafile, chunk))
+        if not lines:
+            break
+        #end if
+        if not lines[-1].endswith('\n'):
+            lines.pop()
+        #end if
+        lines = [line.strip() for line in lines if line.strip()]
+        if lines:
+            blocks.append(parse_lines(lines))
+        #end if
+    #end while
+
+    if blocks:
+        data = np.concatenate(blocks)
+    #end if
+    else:
+        data = np.zeros(0, dtype)
+    #end else
+    return start, quantities, data
+#end def
+
+#------------------------------------------------------------------------------
+def load_data(datafile, timerange=None):
+    """
+    datafile is an open Data.csv. Returns the same as read_data, from the
+    memory-mapped Data.raw next to it if there is one. timerange = (tmin, tmax)
+    keeps only the rows taken between those times (s).
+    """
+    raw = os.path.splitext(datafile.name)[0] + '.raw'
+    if os.path.exists(raw):
+        header, data = raw_store.open_mapped(raw)
+        start = 'Start Time: ' + header['start'] + '\n'
+        quantities = raw_store.layouts[header['layout']]['headers'].split(',')
+    #end if
+    else:
+        start, quantities, data = read_data(datafile)
+    #end else
+    if timerange is not None:
+        data = data[raw_store.time_range(data, *timerange)]
+    #end if
+    return start, quantities, data
+#end def
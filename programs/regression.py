@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : regression
+Description: Closed form least squares lines from running sums, for fitting
+             the thermocouple voltages against dT.
+Comments: The slope, offset, R^2 and slope standard error of a straight line
+          only depend on n, Σx, Σy, Σxy, Σx² and Σy². fit_seebeck computes
+          them for both wires and any number of bins (rows of a 2D array,
+          padded with nan by pad_rows) in one vectorized pass. For the
+          continuous profiles the samples are sorted by avgT and cumulative
+          sums are taken once, so the sums of every window of the sorted data
+          (and so its fit) are a difference of two entries. x and y are
+          centred before summing to keep the differences accurate over long
+          runs.
+"""
+import numpy as np
+
+#------------------------------------------------------------------------------
+def fit_sums(n, sx, sy, sxx, sxy, syy):
+    """
+    Least squares line through points with the given sums (numbers or arrays).
+    Returns slope, offset, r-squared and the standard error of the slope.
+    """
+    n = np.asarray(n, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'): # nan for fewer than 2 points
+        Sxx = sxx - sx*sx/n
+        Sxy = sxy - sx*sy/n
+        Syy = syy - sy*sy/n
+        slope = Sxy/Sxx
+        offset = (sy - slope*sx)/n
+        rsquared = Sxy*Sxy/(Sxx*Syy)
+        stderr = np.sqrt(np.maximum(Syy - slope*Sxy, 0)/(n - 2)/Sxx)
+    #end with
+    return slope, offset, rsquared, stderr
+#end def
+
+#------------------------------------------------------------------------------
+def pad_rows(rows):
+    """
+    Stacks 1D arrays of different lengths (e.g. the samples of each bin) into
+    a 2D array, one per row, padded with nan at the end.
+    """
+    rows = [np.asarray(row, dtype=float) for row in rows]
+    width = max([len(row) for row in rows] + [0])
+    padded = np.empty((len(rows), width))
+    padded.fill(np.nan)
+    for i, row in enumerate(rows):
+        padded[i, :len(row)] = row
+    #end for
+    return padded
+#end def
+
+#------------------------------------------------------------------------------
+def fit_lines(x, y):
+    """
+    Fits y against x along the last axis. x and y are 1D (one bin) or 2D
+    (bins x points, rows padded with nan). Returns slope, offset, r-squared
+    and standard error, as numbers for 1D input or arrays with one value per
+    bin.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    n = valid.sum(axis=-1)
+
+    # centre each bin on its mean so the sums stay accurate
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mx = np.where(valid, x, 0).sum(axis=-1)/n
+        my = np.where(valid, y, 0).sum(axis=-1)/n
+    #end with
+    xc = np.where(valid, x - np.expand_dims(mx, -1), 0)
+    yc = np.where(valid, y - np.expand_dims(my, -1), 0)
+    slope, offset, rsquared, stderr = fit_sums(n, xc.sum(axis=-1), yc.sum(axis=-1),
+                                               (xc*xc).sum(axis=-1), (xc*yc).sum(axis=-1),
+                                               (yc*yc).sum(axis=-1))
+    offset = offset + my - slope*mx
+    if x.ndim == 1:
+        return float(slope), float(offset), float(rsquared), float(stderr)
+    #end if
+    return slope, offset, rsquared, stderr
+#end def
+
+#------------------------------------------------------------------------------
+def fit_seebeck(dT, Vchromel, Valumel):
+    """
+    Seebeck fits of both wires against dT, for one bin (1D) or many (2D, from
+    pad_rows), in a single call of fit_lines. Returns (slope, offset,
+    r-squared, standard error) for chromel and for alumel, as numbers for one
+    bin or arrays with one value per bin.
+    """
+    dT = np.asarray(dT, dtype=float)
+    fits = fit_lines([dT, dT], [Vchromel, Valumel]) # wires stacked on a new first axis
+    if dT.ndim == 1:
+        fits = [fit.tolist() for fit in fits]
+    #end if
+    chromel = tuple(fit[0] for fit in fits)
+    alumel = tuple(fit[1] for fit in fits)
+    return chromel, alumel
+#end def
+
+#------------------------------------------------------------------------------
+def windows(key, width):
+    """
+    Sorts the samples by key. Returns the sort order and, for every sample in
+    sorted order, the slice lo:hi of the sorted samples whose key is within
+    +/- width of its own (strictly). width must be positive so that every
+    window holds at least its own sample.
+    """
+    if width <= 0:
+        raise ValueError('window width must be positive, got %g' % (width))
+    #end if
+    order = np.argsort(key, kind='mergesort')
+    s = np.asarray(key)[order]
+    lo = np.searchsorted(s, s - width, side='right')
+    hi = np.searchsorted(s, s + width, side='left')
+    return order, lo, hi
+#end def
+
+#------------------------------------------------------------------------------
+def window_sum(values, lo, hi):
+    """ Sum of values[lo:hi] for every pair of lo, hi. """
+    total = np.concatenate(([0.0], np.cumsum(values)))
+    return total[hi] - total[lo]
+#end def
+
+#------------------------------------------------------------------------------
+def window_reduce(ufunc, values, lo, hi):
+    """ ufunc.reduce of values[lo:hi] for every pair of lo, hi (hi > lo). """
+    lo = np.asarray(lo)
+    hi = np.asarray(hi)
+    if len(values) == 0:
+        raise ValueError('window_reduce of an empty array')
+    #end if
+    if lo.shape != hi.shape:
+        raise ValueError('lo and hi differ in length: %d, %d' % (lo.size, hi.size))
+    #end if
+    if np.any(hi <= lo) or np.any(lo < 0) or np.any(hi > len(values)):
+        raise ValueError('every window must hold at least one value of the array')
+    #end if
+    values = np.concatenate((values, values[-1:])) # reduceat needs index < len
+    index = np.column_stack((lo, hi)).ravel()
+    return ufunc.reduceat(values, index)[::2]
+#end def
+
+#------------------------------------------------------------------------------
+def window_fit(x, y, lo, hi):
+    """
+    Fits y against x over every window x[lo:hi], y[lo:hi].
+    Returns slope, offset, r-squared and standard error arrays.
+    """
+    mx = np.mean(x)
+    my = np.mean(y)
+    xc = x - mx
+    yc = y - my
+    n = hi - lo
+    slope, offset, rsquared, stderr = fit_sums(n, window_sum(xc, lo, hi), window_sum(yc, lo, hi),
+                                               window_sum(xc*xc, lo, hi), window_sum(xc*yc, lo, hi),
+                                               window_sum(yc*yc, lo, hi))
+    return slope, offset + my - slope*mx, rsquared, stderr
+#end def
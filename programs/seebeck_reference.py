@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : seebeck_reference
+Description: Tabulated Seebeck coefficient of the thermocouple and lead wires,
+             read from the <Wire>_Seebeck.csv files in this folder.
+Comments: Each table (one header line, then temp (C), seebeck (uV/K)) is sorted,
+          points at the same temperature are averaged, and the result is saved
+          as <Wire>_Seebeck.npy next to the csv; the csv is only parsed again
+          when it is newer than the .npy. The table is then resampled onto an
+          evenly spaced grid, so a lookup is an index calculation and one
+          linear interpolation instead of a search or a polynomial. A new wire
+          only needs a new <Wire>_Seebeck.csv.
+
+          The tables cover 2.3 to 1197 C (chromel), 3.5 to 1196 C (alumel)
+          and -202 to 21 C (copper, the copper_seebeck_calc data); alpha
+          raises ValueError outside them rather than extrapolate. Over their
+          range the chromel and alumel tables differ from the polynomial fits
+          in thermocouple.py by up to 0.38 and 0.84 uV/K (0.14 and 0.25 uV/K
+          rms). The acquisition and processing programs all still correct
+          the voltages with thermocouple.py, so that every program gives the
+          same result for the same data; moving them to the tables has to be
+          done for all of them at once.
+"""
+import os
+import glob
+import numpy as np
+
+#==============================================================================
+directory = os.path.dirname(os.path.abspath(__file__))
+suffix = '_Seebeck.csv'
+step = 0.1 # C, spacing of the lookup grid
+
+###############################################################################
+class ReferenceTable:
+    ''' Seebeck coefficient of one wire against temperature. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, wire, path=None, step=step):
+        if path is None:
+            path = os.path.join(directory, wire.capitalize() + suffix)
+        #end if
+        self.wire = wire
+        self.path = path
+        self.temp, self.seebeck = self.load()
+
+        # Evenly spaced lookup table
+        self.step = step
+        self.start = self.temp[0]
+        n = int(np.ceil((self.temp[-1] - self.start)/step)) + 1
+        self.grid = self.start + step*np.arange(n)
+        self.table = np.interp(self.grid, self.temp, self.seebeck)
+        self.stop = self.grid[-1]
+    #end init
+
+    #--------------------------------------------------------------------------
+    def load(self):
+        """ Returns the cleaned (temp, seebeck) columns, from the cache if it is current. """
+        cache = os.path.splitext(self.path)[0] + '.npy'
+        if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(self.path):
+            data = np.load(cache)
+            return data[0], data[1]
+        #end if
+
+        raw = np.loadtxt(self.path, delimiter=',', skiprows=1, usecols=(0, 1), ndmin=2)
+
+        # Digitized tables are not strictly increasing; average repeated temperatures
+        temp, index = np.unique(raw[:,0], return_inverse=True)
+        seebeck = np.bincount(index, weights=raw[:,1])/np.bincount(index)
+
+        try:
+            np.save(cache, np.vstack((temp, seebeck)))
+        except IOError:
+            pass # read only folder, parse the csv again next time
+        #end try
+        return temp, seebeck
+    #end def
+
+    #--------------------------------------------------------------------------
+    def alpha(self, T):
+        """
+        T in C, a number or an array
+        alpha in uV/K
+        """
+        T = np.asarray(T, dtype=float)
+        if np.any(T < self.start) or np.any(T > self.stop) or np.isnan(T).any():
+            raise ValueError("Error in voltage correction, out of range.")
+        #end if
+        position = (T - self.start)/self.step
+        i = np.minimum(position.astype(int), len(self.table) - 2)
+        fraction = position - i
+        out = self.table[i] + fraction*(self.table[i+1] - self.table[i])
+        if out.ndim == 0:
+            return float(out)
+        #end if
+        return out
+    #end def
+
+#end class
+###############################################################################
+
+#==============================================================================
+tables = {} # wire: ReferenceTable, each table is loaded once
+
+#------------------------------------------------------------------------------
+def wires():
+    """ Names of the wires with a table in this folder. """
+    return sorted([os.path.basename(path)[:-len(suffix)].lower()
+                   for path in glob.glob(os.path.join(directory, '*' + suffix))])
+#end def
+
+#------------------------------------------------------------------------------
+def table(wire):
+    wire = wire.lower()
+    if wire not in tables:
+        tables[wire] = ReferenceTable(wire)
+    #end if
+    return tables[wire]
+#end def
+
+#------------------------------------------------------------------------------
+def alpha(T, wire):
+    """
+    T in K, a number or an array
+    alpha in uV/K
+    """
+    return table(wire).alpha(np.asarray(T, dtype=float) - 273.15)
+#end def
+
+#------------------------------------------------------------------------------
+def voltage_correction(raw, tempA, tempB, wire):
+    """
+    raw must be in uV, tempA and tempB in C; numbers or arrays of equal length
+    """
+    tempA = np.asarray(tempA, dtype=float)
+    tempB = np.asarray(tempB, dtype=float)
+
+    dT = tempA - tempB
+    avgT = (tempA + tempB)/2
+
+    # Correction for effect from Thermocouple Seebeck
+    return table(wire).alpha(avgT)*dT - raw
+#end def
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Created: 2026-10-18
+
+__Title__ : thermal_model
+Description: Lumped thermal model of the two sides of the stage, fitted to the
+             PID_Data.csv files of earlier runs, and a simulator to try
+             temperature profiles without the furnace.
+Comments: Each side is a heater in the block, the block and the sample:
+
+              dTblock/dt  = max(kp*(setpoint - Tsample) + kl*(setpoint - Tamb), 0)
+                            - kbs*(Tblock - Tsample) - kb*(Tblock - Tamb)
+              dTsample/dt = ksb*(Tblock - Tsample) - ks*(Tsample - Tamb)
+
+          The first term is the heater driven by the PID: proportional to the
+          error, plus the power that holds a setpoint against the losses (the
+          integral part of the PID), never negative (heating only). The model
+          is linear in the coefficients, so a least squares fit of the rates
+          of change measured while heating gives a first guess. PID_Data is
+          only logged every couple of minutes, too coarse for good rates, so
+          the guess is then refined by simulating the runs from their logged
+          setpoints and fitting the simulated temperatures to the logged ones
+          (damped Gauss-Newton on the log of the coefficients, which keeps
+          them positive). A coefficient that starts near zero can not recover
+          in log space, so coefficients the first guess gets negative or
+          tiny start from the median of the others, and the fit is also
+          started from all coefficients at that median; the better of the
+          two is kept. integrate steps any number of coefficient sets or
+          profiles at once with numpy, which is what makes that fit, and
+          trying a 30 hour profile, take seconds. simulate prints, for each
+          step of a profile, how long the samples take to settle in it.
+
+          usage: python thermal_model.py fit <model.json> <folder> ...
+                 python thermal_model.py simulate <model.json> <profile.csv>
+          profile.csv is a controller program (step minutes, setpoint A, setpoint B).
+"""
+import os
+import sys
+import json
+import numpy as np
+
+import raw_store
+
+#==============================================================================
+ambient = 25.0 # C
+time_step = 5.0 # s, simulation step
+sides = ['A', 'B']
+coefficients = ['kp', 'kl', 'kbs', 'kb', 'ksb', 'ks']
+smallest = 1e-6 # 1/s, coefficients of the first guess below this are replaced
+iterations = 100 # most steps of the refinement
+tolerance = 1e-5 # relative change of the coefficients that ends the refinement
+
+###############################################################################
+class ThermalModel:
+    ''' Coefficients (1/s) of both sides of the stage. '''
+    #--------------------------------------------------------------------------
+    def __init__(self, params, ambient=ambient):
+        """ params is {side: {coefficient: value}}. """
+        self.params = params
+        self.ambient = ambient
+    #end init
+
+    #--------------------------------------------------------------------------
+    def simulate(self, setpoints, dt=time_step, block=None, sample=None):
+        """
+        Steps the model through setpoints, an array of (2 sides, steps) or
+        (2 sides, profiles, steps), dt seconds apart. Starts from block and
+        sample temperatures (default ambient) and returns the block and
+        sample temperatures at every step, same shape as setpoints.
+        """
+        setpoints = np.asarray(setpoints, dtype=float)
+        column = (2,) + (1,)*(setpoints.ndim - 2)
+        k = [np.array([self.params[side][name] for side in sides]).reshape(column) for name in coefficients]
+        return integrate(k, setpoints, dt, self.ambient, block, sample)
+    #end def
+
+    #--------------------------------------------------------------------------
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump({'ambient': self.ambient, 'params': self.params}, f, indent=1)
+        #end with
+    #end def
+
+#end class
+###############################################################################
+
+#------------------------------------------------------------------------------
+def integrate(k, setpoints, dt, Tamb, block=None, sample=None):
+    """
+    Forward Euler integration of the model. k is the list of coefficients
+    (in the order of 'coefficients'), each a number or an array broadcasting
+    with setpoints[..., 0]; returns the block and sample temperatures.
+    """
+    kp, kl, kbs, kb, ksb, ks = k
+    shape = np.broadcast(setpoints[..., 0], *k).shape
+    Tb = np.empty(shape + setpoints.shape[-1:])
+    Ts = np.empty(shape + setpoints.shape[-1:])
+    b = np.zeros(shape) + (Tamb if block is None else block)
+    s = np.zeros(shape) + (Tamb if sample is None else sample)
+    for i in xrange(setpoints.shape[-1]):
+        Tb[..., i] = b
+        Ts[..., i] = s
+        sp = setpoints[..., i]
+        heater = np.maximum(kp*(sp - s) + kl*(sp - Tamb), 0)
+        db = heater - kbs*(b - s) - kb*(b - Tamb)
+        ds = ksb*(b - s) - ks*(s - Tamb)
+        b = b + dt*db
+        s = s + dt*ds
+    #end for
+    return Tb, Ts
+#end def
+
+#------------------------------------------------------------------------------
+def load(path):
+    with open(path, 'r') as f:
+        saved = json.load(f)
+    #end with
+    params = dict([(str(side), dict([(str(name), value) for name, value in saved['params'][side].items()]))
+                   for side in saved['params']])
+    return ThermalModel(params, saved['ambient'])
+#end def
+
+#------------------------------------------------------------------------------
+def read_pid_data(path):
+    """
+    The time, sample, block and setpoint columns of a PID_Data.csv, from the
+    PID_Data.raw store next to it if there is one.
+    """
+    store = os.path.splitext(path)[0] + '.raw'
+    if os.path.exists(store):
+        header, data = raw_store.read(store)
+        return dict([(name, data[name]) for name in header['fields']])
+    #end if
+    data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    names = raw_store.layouts['pid']['fields']
+    return dict([(name, data[:, i]) for i, name in enumerate(names)])
+#end def
+
+#------------------------------------------------------------------------------
+def find(folders, name='PID_Data.csv'):
+    """ Every PID_Data.csv in and below the folders. """
+    paths = []
+    for folder in folders:
+        for root, dirs, files in os.walk(folder):
+            if name in files:
+                paths.append(os.path.join(root, name))
+            #end if
+        #end for
+    #end for
+    return sorted(paths)
+#end def
+
+#------------------------------------------------------------------------------
+def regressors(data, side, Tamb):
+    """ Rates of change and the terms of the model for one side of one run. """
+    t = data['time']
+    Ts = data['sampletemp' + side]
+    Tb = data['blocktemp' + side]
+    sp = data['setpoint' + side]
+    if len(t) < 3:
+        return None
+    #end if
+    dTs = np.gradient(Ts, t)
+    dTb = np.gradient(Tb, t)
+    # below the setpoint the heater is certainly on, the term is not clipped
+    heating = sp >= Ts
+    block_terms = np.column_stack((sp - Ts, sp - Tamb, -(Tb - Ts), -(Tb - Tamb)))[heating]
+    sample_terms = np.column_stack((Tb - Ts, -(Ts - Tamb)))
+    return dTb[heating], block_terms, dTs, sample_terms
+#end def
+
+#------------------------------------------------------------------------------
+def resample(data, side, dt):
+    """
+    The logged setpoints of one side every dt seconds, and the steps of the
+    readings. The controller programs ramp the setpoint between steps, so
+    it is interpolated linearly between the readings.
+    """
+    t = data['time'] - data['time'][0]
+    grid = np.arange(0, t[-1] + dt, dt)
+    readings = np.minimum(np.round(t/dt).astype(int), len(grid) - 1)
+    return np.interp(grid, t, data['setpoint' + side]), readings
+#end def
+
+#------------------------------------------------------------------------------
+def residuals(k, runs, side, Tamb, dt):
+    """
+    Simulated minus logged block and sample temperatures of one side of all
+    the runs, for each coefficient set of k (arrays of sets).
+    """
+    errors = []
+    for data in runs:
+        setpoints, readings = resample(data, side, dt)
+        Tb, Ts = integrate(k, setpoints, dt, Tamb,
+                           data['blocktemp' + side][0], data['sampletemp' + side][0])
+        errors.append(Tb[..., readings] - data['blocktemp' + side])
+        errors.append(Ts[..., readings] - data['sampletemp' + side])
+    #end for
+    return np.concatenate(errors, axis=-1)
+#end def
+
+#------------------------------------------------------------------------------
+def refine(guess, runs, side, Tamb, dt=time_step):
+    """
+    Adjusts the coefficients of one side so simulating the runs reproduces
+    the logged temperatures. All the finite difference columns of the
+    Jacobian are simulated at once. Returns the coefficients and the sum of
+    the squared residuals.
+    """
+    p = np.log(guess)
+    h = 1e-3
+    damping = 1e-3
+    sets = p + np.vstack((np.zeros(len(p)), h*np.eye(len(p))))
+    with np.errstate(over='ignore', invalid='ignore'):
+        r = residuals(list(np.exp(sets).T), runs, side, Tamb, dt)
+    #end with
+    cost = np.sum(r[0]**2)
+    for n in xrange(iterations):
+        J = ((r[1:] - r[0])/h).T
+        A = np.dot(J.T, J)
+        g = np.dot(J.T, r[0])
+        step = np.linalg.solve(A + damping*np.diag(np.diag(A) + 1e-12), -g)
+        trial = p + step
+        sets = trial + np.vstack((np.zeros(len(p)), h*np.eye(len(p))))
+        # too large a step can make the integration blow up, it then fails the test below
+        with np.errstate(over='ignore', invalid='ignore'):
+            r_trial = residuals(list(np.exp(sets).T), runs, side, Tamb, dt)
+            trial_cost = np.sum(r_trial[0]**2)
+        #end with
+        if not trial_cost < cost:
+            damping *= 10
+            continue
+        #end if
+        done = np.max(np.abs(step)) < tolerance
+        p, r, cost = trial, r_trial, trial_cost
+        damping = max(damping/10, 1e-6)
+        if done:
+            break
+        #end if
+    #end for
+    return np.exp(p), cost
+#end def
+
+#------------------------------------------------------------------------------
+def starts(guess):
+    """
+    Starting points of the refinement: the first guess with its negative or
+    tiny coefficients set to the median of the others, and every coefficient
+    at that median.
+    """
+    usable = guess > smallest
+    typical = np.median(guess[usable]) if usable.any() else 1e-3
+    return [np.where(usable, guess, typical), np.ones(len(guess))*typical]
+#end def
+
+#------------------------------------------------------------------------------
+def fit(paths, Tamb=ambient):
+    """ Fits a ThermalModel to the PID_Data.csv files in paths. """
+    runs = [data for data in [read_pid_data(path) for path in paths] if len(data['time']) >= 3]
+    params = {}
+    for side in sides:
+        dTb, block_terms, dTs, sample_terms = [], [], [], []
+        for data in runs:
+            terms = regressors(data, side, Tamb)
+            if terms is None:
+                continue
+            #end if
+            dTb.append(terms[0])
+            block_terms.append(terms[1])
+            dTs.append(terms[2])
+            sample_terms.append(terms[3])
+        #end for
+        if not dTb:
+            raise ValueError("no PID data to fit")
+        #end if
+        block = np.linalg.lstsq(np.concatenate(block_terms), np.concatenate(dTb), rcond=None)[0]
+        sample = np.linalg.lstsq(np.concatenate(sample_terms), np.concatenate(dTs), rcond=None)[0]
+        fits = [refine(start, runs, side, Tamb) for start in starts(np.concatenate((block, sample)))]
+        k, cost = min(fits, key=lambda fit: fit[1])
+        params[side] = dict(zip(coefficients, [float(x) for x in k]))
+    #end for
+    return ThermalModel(params, Tamb)
+#end def
+
+#------------------------------------------------------------------------------
+def profile_setpoints(path, dt=time_step, start=ambient):
+    """
+    The setpoints of a controller program (step minutes, setpoint A,
+    setpoint B per line) every dt seconds, as an array of (2, steps), and
+    the step each point belongs to. Like the cn7500, each step ramps from
+    the previous setpoint (start for the first) to its own over its time.
+    """
+    program = np.loadtxt(path, delimiter=',', ndmin=2)
+    ends = np.cumsum(program[:, 0]*60)
+    t = np.arange(0, ends[-1], dt)
+    corners = np.concatenate(([0], ends))
+    setpoints = [np.interp(t, corners, np.concatenate(([start], program[:, column]))) for column in (1, 2)]
+    step = np.minimum(np.searchsorted(ends, t, side='right'), len(program) - 1)
+    return np.array(setpoints), step
+#end def
+
+#------------------------------------------------------------------------------
+def settle_times(Ts, setpoints, step, within=1.0, dt=time_step):
+    """
+    Seconds from the start of each step of a profile until both simulated
+    sample temperatures stay within 'within' (C) of their setpoints to the
+    end of the step; nan for a step in which they never do.
+    """
+    away = np.any(np.abs(Ts - setpoints) > within, axis=0)
+    times = []
+    for i in xrange(step[-1] + 1):
+        points = np.flatnonzero(step == i)
+        last = np.flatnonzero(away[points])
+        if len(last) == 0:
+            times.append(0.0)
+        elif last[-1] == len(points) - 1:
+            times.append(float('nan'))
+        else:
+            times.append((last[-1] + 1)*dt)
+        #end if
+    #end for
+    return np.array(times)
+#end def
+
+#==============================================================================
+if __name__=='__main__':
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] not in ('fit', 'simulate'):
+        print __doc__
+        sys.exit(1)
+    #end if
+    if args[0] == 'fit':
+        paths = find(args[2:])
+        model = fit(paths)
+        model.save(args[1])
+        print 'fitted %d runs' % (len(paths))
+        for side in sides:
+            print side + ': ' + ', '.join(['%s=%.3g' % (name, model.params[side][name]) for name in coefficients])
+        #end for
+    else:
+        model = load(args[1])
+        setpoints, step = profile_setpoints(args[2])
+        Tb, Ts = model.simulate(setpoints)
+        settled = settle_times(Ts, setpoints, step)
+        print 'step, minutes, setpoint A, sample A, setpoint B, sample B (end of step), settled after (min)'
+        for i in xrange(step[-1] + 1):
+            k = np.flatnonzero(step == i)[-1]
+            print '%d, %.0f, %.1f, %.1f, %.1f, %.1f, %.1f' % (i, (k + 1)*time_step/60,
+                                                             setpoints[0, k], Ts[0, k], setpoints[1, k], Ts[1, k],
+                                                             settled[i]/60)
+        #end for
+    #end if
+#end if